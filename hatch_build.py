@@ -0,0 +1,31 @@
+# Wheel build hook: ships a token-lean compiled copy of the Weaviate reference
+# (see woodhouse/reference_compiler.py) as woodhouse/references/weaviate.min.py.
+import importlib.util
+import shutil
+import tempfile
+from pathlib import Path
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+
+class CustomBuildHook(BuildHookInterface):
+    def initialize(self, version, build_data):
+        if version == "editable":
+            return  # Compiled at runtime instead
+        package = Path(self.root) / "src" / "woodhouse"
+        # Loaded by path: the package's dependencies aren't installed at build time
+        spec = importlib.util.spec_from_file_location(
+            "reference_compiler", package / "reference_compiler.py"
+        )
+        compiler = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(compiler)
+
+        self.temp_dir = tempfile.mkdtemp()
+        compiled_path = Path(self.temp_dir) / "weaviate.min.py"
+        source = (package / "references" / "weaviate.py").read_text()
+        compiled_path.write_text(compiler.compile_reference(source))
+        build_data["force_include"][str(compiled_path)] = "woodhouse/references/weaviate.min.py"
+
+    def finalize(self, version, build_data, artifact_path):
+        if getattr(self, "temp_dir", None):
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
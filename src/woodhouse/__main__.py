@@ -1,8 +1,24 @@
 import click
 import logging
-from woodhouse.notebooks import strip_solutions_from_notebook
-from woodhouse.images import crunch_images
+import glob
+import sys
+import time
+from woodhouse.notebooks import (
+    strip_solutions_from_notebook,
+    crunch_notebooks,
+    prune_notebook_outputs,
+    transform_notebook,
+    watch_notebooks,
+    write_notebook_artifacts,
+    ARTIFACT_NAMES,
+    TRANSFORMS,
+)
+from woodhouse.git_filter import run_filter_process, run_single_file
+from woodhouse.verify import verify_notebooks
+from woodhouse.images import CrunchNotFoundError, crunch_images, audit_images, print_audit_report, format_bytes
 from woodhouse.code import code
+from woodhouse.telemetry import stats
+from woodhouse.weaviate_cli import weaviate
 from pathlib import Path
 
 logging.getLogger("anthropic").setLevel(logging.WARNING)
@@ -20,28 +36,100 @@ def notebook():
     pass
 
 
+def derived_notebook_path(file_path, output_dir, template=ARTIFACT_NAMES["student"]):
+    """Maps 'name-complete.ipynb' to the template (e.g. '{name}.ipynb') in output_dir."""
+    name = file_path.name.removesuffix("-complete.ipynb")
+    return output_dir / template.format(name=name)
+
+
 @notebook.command("strip-answers")
 @click.argument("input_path")
 @click.argument("output_path", required=False)
-def strip_answers(input_path, output_path):
-    """Strip solution blocks from a Jupyter notebook."""
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running and regenerate student notebooks when a source changes.",
+)
+@click.option(
+    "--student-name",
+    default=ARTIFACT_NAMES["student"],
+    show_default=True,
+    help="Directory mode: student notebook name. {name} is the name without '-complete'.",
+)
+@click.option(
+    "--answers-name",
+    default=ARTIFACT_NAMES["answers"],
+    show_default=True,
+    help="Directory mode: solutions-only answer key name. Empty to skip.",
+)
+@click.option(
+    "--instructor-name",
+    default=ARTIFACT_NAMES["instructor"],
+    show_default=True,
+    help="Directory mode: complete notebook with outputs cleared. Empty to skip.",
+)
+def strip_answers(input_path, output_path, watch, student_name, answers_name, instructor_name):
+    """Strip solution blocks from a Jupyter notebook.
+
+    Given a directory, every '*-complete.ipynb' in it is loaded once and turned
+    into a student notebook, an answer key and a clean instructor copy.
+    """
     input_path = Path(input_path)
     output_path = Path(output_path) if output_path else None
 
+    if watch and not input_path.is_dir():
+        click.echo("Error: --watch requires a directory as input_path.", err=True)
+        return
+
     if input_path.is_dir():
         if not output_path:
             output_path = input_path
         output_path.mkdir(parents=True, exist_ok=True)
+        templates = {
+            "student": student_name,
+            "answers": answers_name,
+            "instructor": instructor_name,
+        }
+
+        def artifact_paths(file_path):
+            return {
+                artifact: derived_notebook_path(file_path, output_path, template)
+                for artifact, template in templates.items()
+                if template
+            }
+
+        processed = 0
+        updated = 0
         for file_path in input_path.glob("*-complete.ipynb"):
-            output_filename = file_path.name.replace("-complete.ipynb", ".ipynb")
-            output_file_path = output_path / output_filename
-            print(f"Processing {file_path} -> {output_file_path}")
-            strip_solutions_from_notebook(str(file_path), str(output_file_path))
+            paths = artifact_paths(file_path)
+            print(f"Processing {file_path} -> {', '.join(str(p) for p in paths.values())}")
+            written = write_notebook_artifacts(file_path, paths)
+            processed += len(written)
+            updated += sum(written.values())
+        print(f"Updated {updated} of {processed} notebooks")
+
+        if watch:
+            def regenerate(file_path):
+                print(f"Changed {file_path}", flush=True)
+                try:
+                    written = write_notebook_artifacts(file_path, artifact_paths(file_path))
+                except Exception as e:
+                    # Usually a half-written file; the next save will retry
+                    click.echo(f"Error processing {file_path}: {e}", err=True)
+                    return
+                for artifact, changed in written.items():
+                    if changed:
+                        print(f"  Updated {artifact} notebook", flush=True)
+
+            print(f"Watching {input_path} for changes (Ctrl+C to stop)...", flush=True)
+            try:
+                watch_notebooks(input_path, regenerate)
+            except KeyboardInterrupt:
+                pass
     else:
         if not output_path:
             if input_path.name.endswith("-complete.ipynb"):
-                output_filename = input_path.name.replace("-complete.ipynb", ".ipynb")
-                output_path = input_path.parent / output_filename
+                output_path = derived_notebook_path(input_path, input_path.parent)
             else:
                 click.echo(
                     "Error: When input is a single file not ending in '-complete.ipynb', "
@@ -52,17 +140,260 @@ def strip_answers(input_path, output_path):
 
         if not output_path.parent.exists():
             output_path.parent.mkdir(parents=True, exist_ok=True)
-        strip_solutions_from_notebook(str(input_path), str(output_path))
+        if not strip_solutions_from_notebook(str(input_path), str(output_path)):
+            print(f"{output_path} is already up to date")
+
+
+@notebook.command("git-filter")
+@click.option(
+    "--process",
+    is_flag=True,
+    help="Speak git's long-running filter protocol (filter.<driver>.process).",
+)
+def git_filter(process):
+    """Git clean filter that strips solution blocks from staged notebooks.
+
+    With --process, a single process serves every file in a git operation.
+    Without it, one notebook is read from stdin and written to stdout.
+    """
+    if process:
+        run_filter_process(sys.stdin.buffer, sys.stdout.buffer)
+    else:
+        run_single_file(sys.stdin.buffer, sys.stdout.buffer)
+
+
+@notebook.command("verify")
+@click.argument("patterns", nargs=-1, required=True)
+@click.option("--kernels", default=4, show_default=True, help="Kernels to run in parallel.")
+@click.option("--timeout", default=60, show_default=True, help="Per-cell timeout in seconds.")
+@click.option("--kernel-name", default="python3", show_default=True)
+def verify(patterns, kernels, timeout, kernel_name):
+    """Executes notebooks in parallel and reports failing cells.
+
+    Student notebooks are run up to the first '# ADD YOUR CODE HERE'
+    placeholder; complete notebooks are run end to end.
+    """
+    paths = sorted(
+        {Path(p) for pattern in patterns for p in glob.glob(pattern, recursive=True) if p.endswith(".ipynb")}
+    )
+    if not paths:
+        click.echo("No notebooks found.")
+        return
+
+    def report(result):
+        status = "OK  " if result.ok else "FAIL"
+        click.echo(f"{status} {result.seconds:6.1f} s  {result.path} ({result.cells_run} cells)")
+        for failure in result.failures:
+            click.echo(f"       cell {failure.index}: {failure.ename}: {failure.evalue}")
+        if result.error:
+            click.echo(f"       {result.error}")
+
+    start = time.perf_counter()
+    results = verify_notebooks(paths, kernels, timeout, kernel_name, on_result=report)
+    failed = sum(1 for result in results if not result.ok)
+    click.echo(
+        f"{len(results) - failed} passed, {failed} failed in {time.perf_counter() - start:.1f} s"
+    )
+    if failed:
+        sys.exit(1)
+
+
+def transform_options(func):
+    """Adds one --<name> flag per registered notebook transform."""
+    for name, transform in reversed(TRANSFORMS.items()):
+        help_text = (transform.__doc__ or "").strip() or name.replace("-", " ").capitalize() + "."
+        func = click.option(f"--{name}", is_flag=True, help=help_text)(func)
+    return func
+
+
+@notebook.command("transform")
+@click.argument("input_path")
+@click.argument("output_path", required=False)
+@click.option(
+    "--in-place",
+    is_flag=True,
+    help="Without OUTPUT_PATH, overwrite the input notebooks (never '-complete' sources with --strip-solutions).",
+)
+@transform_options
+def transform(input_path, output_path, in_place, **flags):
+    """Applies several cell transforms to notebooks in a single read/write pass.
+
+    Given a directory and no OUTPUT_PATH, --strip-solutions writes each
+    '*-complete.ipynb' to its student notebook alongside it, as strip-answers
+    does. Other notebooks are only overwritten with --in-place.
+    """
+    names = [name for name in TRANSFORMS if flags[name.replace("-", "_")]]
+    if not names:
+        click.echo("Error: choose at least one transform, e.g. --strip-solutions.", err=True)
+        return
+
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else None
+    strip = "strip-solutions" in names
+
+    def is_complete(file_path):
+        return file_path.name.endswith("-complete.ipynb")
+
+    def target_for(file_path, output_dir):
+        # Never strip the solutions out of a '-complete' source in place
+        if strip and is_complete(file_path):
+            return derived_notebook_path(file_path, output_dir)
+        return output_dir / file_path.name
+
+    if not output_path and not in_place and not (strip and (input_path.is_dir() or is_complete(input_path))):
+        click.echo(
+            "Error: specify output_path, or --in-place to overwrite the input notebooks.",
+            err=True,
+        )
+        return
+
+    if input_path.is_dir():
+        if output_path:
+            output_path.mkdir(parents=True, exist_ok=True)
+        sources = sorted(input_path.glob("*.ipynb"))
+        if not output_path and not in_place:
+            sources = [file_path for file_path in sources if is_complete(file_path)]
+        jobs = [(file_path, target_for(file_path, output_path or input_path)) for file_path in sources]
+        # Student notebooks about to be regenerated from their '-complete' source
+        targets = {target for source, target in jobs if source != target}
+        jobs = [(source, target) for source, target in jobs if source not in targets]
+    else:
+        jobs = [(input_path, output_path or target_for(input_path, input_path.parent))]
+
+    totals = {}
+    updated = 0
+    for source, target in jobs:
+        print(f"Processing {source} -> {target}")
+        changed, timings = transform_notebook(source, target, names)
+        updated += changed
+        for step, seconds in timings.items():
+            totals[step] = totals.get(step, 0.0) + seconds
+    print(f"Updated {updated} of {len(jobs)} notebooks")
+
+    click.echo("--- Timing ---")
+    for step, seconds in totals.items():
+        click.echo(f"{step:<24} {seconds * 1000:8.1f} ms")
+
+
+@notebook.command("crunch-images")
+@click.argument("pattern")
+@click.option("--workers", default=4, show_default=True, help="Notebooks to process in parallel.")
+def crunch_notebook_images(pattern, workers):
+    """Compresses PNG images embedded in notebooks, in place."""
+    paths = [p for p in glob.glob(pattern, recursive=True) if p.endswith(".ipynb")]
+    if not paths:
+        click.echo(f"No notebooks found matching pattern: {pattern}")
+        return
+
+    total_before = 0
+    total_after = 0
+    updated = 0
+    failed = 0
+    try:
+        for result in crunch_notebooks(paths, workers=workers):
+            if "error" in result:
+                failed += 1
+                click.echo(f"Error processing {result['path']}: {result['error']}", err=True)
+                continue
+            updated += result["updated"]
+            total_before += result["original_bytes"]
+            total_after += result["crunched_bytes"]
+            click.echo(
+                f"{result['path']}: {result['replaced']}/{result['images']} images shrunk, "
+                f"{format_bytes(result['original_bytes'])} -> "
+                f"{format_bytes(result['crunched_bytes'])} "
+                f"(load {result['load_seconds']:.2f} s, save {result['save_seconds']:.2f} s)"
+            )
+    except CrunchNotFoundError:
+        click.echo(
+            "Error: 'crunch' command not found. Is it installed and in your PATH?",
+            err=True,
+        )
+        return
+    click.echo(
+        f"Total: {format_bytes(total_before)} -> {format_bytes(total_after)} "
+        f"saved {format_bytes(total_before - total_after)}"
+    )
+    click.echo(f"Updated {updated} of {len(paths)} notebooks")
+    if failed:
+        click.echo(f"{failed} notebooks failed", err=True)
+        sys.exit(1)
+
+
+@notebook.command("prune-outputs")
+@click.argument("input_path")
+@click.argument("output_path", required=False)
+@click.option(
+    "--max-output-bytes",
+    default=100_000,
+    show_default=True,
+    help="Outputs larger than this are removed or externalized.",
+)
+@click.option(
+    "--externalize",
+    is_flag=True,
+    help="Write large outputs to files next to the notebook and link to them.",
+)
+def prune_outputs(input_path, output_path, max_output_bytes, externalize):
+    """Drops large outputs from notebooks while keeping small ones."""
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else None
+
+    if input_path.is_dir():
+        if output_path:
+            output_path.mkdir(parents=True, exist_ok=True)
+        jobs = [
+            (file_path, (output_path or input_path) / file_path.name)
+            for file_path in sorted(input_path.glob("*.ipynb"))
+        ]
+    else:
+        jobs = [(input_path, output_path or input_path)]
+
+    total_before = 0
+    total_after = 0
+    updated = 0
+    for source, target in jobs:
+        result = prune_notebook_outputs(source, target, max_output_bytes, externalize)
+        total_before += result["before_bytes"]
+        total_after += result["after_bytes"]
+        updated += result["updated"]
+        click.echo(
+            f"{result['path']}: {format_bytes(result['before_bytes'])} -> "
+            f"{format_bytes(result['after_bytes'])} ({result['pruned']} outputs "
+            f"{'externalized' if externalize else 'removed'})"
+        )
+    if len(jobs) > 1:
+        click.echo(f"Total: {format_bytes(total_before)} -> {format_bytes(total_after)}")
+    click.echo(f"Updated {updated} of {len(jobs)} notebooks")
 
 
 @cli.command()
 @click.argument("pattern")
-def crunch(pattern):
+@click.option("--max-width", type=int, help="Downscale images wider than this (px).")
+@click.option("--max-height", type=int, help="Downscale images taller than this (px).")
+def crunch(pattern, max_width, max_height):
     """Compresses PNG files using crunch and renames them."""
-    crunch_images(pattern)
+    crunch_images(pattern, max_width=max_width, max_height=max_height)
+
+
+@cli.group()
+def images():
+    """Image-related tools."""
+    pass
+
+
+@images.command("audit")
+@click.argument("pattern")
+@click.option("--top", default=20, show_default=True, help="Number of files to list.")
+def audit(pattern, top):
+    """Estimates crunch savings for PNG files by reading only their headers."""
+    audits = audit_images(pattern)
+    print_audit_report(audits, top=top)
 
 
 cli.add_command(code)
+cli.add_command(stats)
+cli.add_command(weaviate)
 
 if __name__ == "__main__":
     cli()
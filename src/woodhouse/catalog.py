@@ -0,0 +1,157 @@
+# In-process keyword search (BM25) over the bundled Weaviate examples and the
+# sections of the reference code, so common prompts can be answered locally.
+import functools
+import importlib.resources
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from woodhouse.templates import example_files, render_text
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from give how i in into is it me my of on or "
+    "please show some that the this to use using want with write example code python weaviate".split()
+)
+# Words in titles and descriptions count this many times more than words in code
+TITLE_WEIGHT = 3
+BM25_K1 = 1.2
+BM25_B = 0.75
+# A match is strong if it contains this share of the (non-stopword) query terms
+# and scores at least MIN_STRONG_SCORE
+MIN_TERM_COVERAGE = 0.6
+MIN_STRONG_SCORE = 4.0
+
+SECTION_BANNER = re.compile(r"^# =+$")
+
+
+@dataclass
+class CatalogEntry:
+    title: str
+    source: str
+    text: str
+    description: str = ""
+
+
+@dataclass
+class CatalogMatch:
+    entry: CatalogEntry
+    score: float
+    coverage: float
+
+    @property
+    def strong(self) -> bool:
+        return self.coverage >= MIN_TERM_COVERAGE and self.score >= MIN_STRONG_SCORE
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        # Crude plural folding, so "collections" matches "collection"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def example_entry(path) -> CatalogEntry:
+    """An example file, described by its name and the title block of its docstring."""
+    text = render_text(path.read_text())
+    title = path.stem.split("_", 1)[-1].replace("_", " ")
+    description = ""
+    docstring = re.search(r'"""(.*?)"""', text, re.DOTALL)
+    if docstring:
+        lines = [line.strip() for line in docstring.group(1).splitlines()]
+        description = " ".join(line for line in lines if line and not set(line) <= {"="})
+    return CatalogEntry(title, path.name, text, description)
+
+
+def reference_entries(text: str, source: str = "references/weaviate.py") -> list[CatalogEntry]:
+    """
+    Splits the reference code into snippets: each starts at a comment line after a
+    blank line ('# Insert a single object') and runs to the next one. Snippets are
+    described by their comment and the numbered section they are in.
+    """
+    entries = []
+    section = ""
+    title = None
+    body = []
+
+    def flush():
+        code = "\n".join(body).strip()
+        if title and code:
+            entries.append(CatalogEntry(title, source, code, section))
+
+    previous = ""
+    for line in text.splitlines():
+        if SECTION_BANNER.match(line):
+            flush()
+            title, body = None, []
+        elif re.match(r"^# \d+\. ", line):
+            section = line[2:].split(". ", 1)[1].title()
+        elif line.startswith("# ") and not previous.strip() and not line.startswith("# For more"):
+            flush()
+            title, body = line[2:].strip(), [line]
+        elif title is not None:
+            body.append(line)
+        previous = line
+    flush()
+    return entries
+
+
+class Catalog:
+    """A BM25 index over catalog entries."""
+
+    def __init__(self, entries: list[CatalogEntry]):
+        self.entries = entries
+        self.postings = defaultdict(list)  # token -> [(entry index, weighted term frequency)]
+        self.lengths = []
+        for index, entry in enumerate(entries):
+            counts = Counter(tokenize(entry.text))
+            for token in tokenize(f"{entry.title} {entry.description}"):
+                counts[token] += TITLE_WEIGHT
+            for token, count in counts.items():
+                self.postings[token].append((index, count))
+            self.lengths.append(sum(counts.values()))
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0
+        n = len(entries)
+        self.idf = {
+            token: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for token, postings in self.postings.items()
+        }
+
+    def search(self, query: str, limit: int = 3) -> list[CatalogMatch]:
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        scores = defaultdict(float)
+        matched = defaultdict(int)
+        for term in terms:
+            for index, tf in self.postings.get(term, ()):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[index] / self.average_length)
+                scores[index] += self.idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+                matched[index] += 1
+        ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+        return [
+            CatalogMatch(self.entries[index], scores[index], matched[index] / len(terms))
+            for index in ranked
+        ]
+
+    def best_match(self, query: str) -> CatalogMatch | None:
+        """The top match if it is strong enough to answer the query on its own."""
+        matches = self.search(query, limit=1)
+        if matches and matches[0].strong:
+            return matches[0]
+        return None
+
+
+@functools.cache
+def load_catalog() -> Catalog:
+    """Indexes the bundled examples and reference code (once per process)."""
+    package = importlib.resources.files("woodhouse")
+    entries = [example_entry(path) for path in example_files()]
+    entries += reference_entries((package / "references" / "weaviate.py").read_text())
+    return Catalog(entries)
@@ -1,18 +1,66 @@
+import ast
 import asyncio
+import functools
+import os
+import re
 import click
 import questionary
+import time
 import importlib.resources
 from pathlib import Path
 from pydantic_ai import Agent
+from pydantic_ai.exceptions import AgentRunError
 from pydantic_ai.models.anthropic import AnthropicModel
+from woodhouse.catalog import load_catalog
+from woodhouse.fake_anthropic import Cassette, FakeAnthropicServer
+from woodhouse.reference_compiler import compile_reference
+from woodhouse.templates import (
+    DATA_TYPES,
+    VECTORIZERS,
+    TemplateError,
+    example_files,
+    load_template,
+    render_text,
+)
+from woodhouse.telemetry import format_seconds, percentile, record_run
 
+DEFAULT_MODEL = "claude-3-5-sonnet-latest"
+# Tried first; answers that fail the local checks are escalated to DEFAULT_MODEL
+FAST_MODEL = "claude-3-5-haiku-latest"
+
+# Prompts mentioning several of these, or long prompts, go straight to DEFAULT_MODEL
+COMPLEX_PROMPT_HINTS = (
+    "multi-tenan", "tenant", "replication", "backup", "rbac", "migrat", "rerank",
+    "named vector", "multi-vector", "multivector", "quantiz", "async", "cross-reference",
+    "generative", "hybrid", "aggregate", "filter", "batch",
+)
+COMPLEX_PROMPT_WORDS = 60
+
+# Candidate i of a concurrent generation uses temperature i (cycling)
+CANDIDATE_TEMPERATURES = (0.0, 0.5, 1.0)
+
+CODE_BLOCK_PATTERN = re.compile(r"```(?:python|py)?[ \t]*\n(.*?)```", re.DOTALL)
+
+# Ask Anthropic to cache the (large) system prompt and the conversation so far,
+# so follow-up turns in a session only pay for the new messages
+CACHE_SETTINGS = {"anthropic_cache_instructions": True, "anthropic_cache_messages": True}
+
+
+@functools.cache
+def load_reference() -> str:
+    """
+    Reads the token-lean Weaviate reference code shipped with the package (once per
+    process). Wheels include it precompiled; from a source checkout it is compiled here.
+    """
+    references = importlib.resources.files("woodhouse") / "references"
+    compiled = references / "weaviate.min.py"
+    if compiled.is_file():
+        return compiled.read_text()
+    return compile_reference((references / "weaviate.py").read_text())
 
-async def generate_weaviate_code_from_prompt(prompt: str) -> str:
-    """Generate Weaviate code from a prompt using Pydantic AI."""
-    reference_path = importlib.resources.files("woodhouse") / "references" / "weaviate.py"
-    reference_code = reference_path.read_text()
 
-    system_prompt = f"""You are a Weaviate code generation assistant.
+def build_system_prompt(reference_code: str) -> str:
+    return f"""You are a Weaviate code generation assistant.
     Generate a Python code example based on the user's prompt.
     THe following is a correct, up-to-date Weaviate reference code.
     Use this as context. If the required example is not in the reference code,
@@ -24,11 +72,259 @@ async def generate_weaviate_code_from_prompt(prompt: str) -> str:
     ---
     """
 
-    model = AnthropicModel('claude-3-5-sonnet-latest')
-    agent = Agent(model, system_prompt=system_prompt)
 
-    result = await agent.run(prompt)
-    return result.output
+@functools.cache
+def get_agent(model_name: str = DEFAULT_MODEL) -> Agent:
+    """Returns a shared agent per model, so its HTTP connection pool is reused."""
+    model = AnthropicModel(model_name)
+    return Agent(
+        model,
+        system_prompt=build_system_prompt(load_reference()),
+        model_settings=CACHE_SETTINGS,
+    )
+
+
+@functools.cache
+def reference_api() -> frozenset[str]:
+    """Module, class, function and attribute names used in the reference code."""
+    names = set()
+    for node in ast.walk(ast.parse(load_reference())):
+        if isinstance(node, ast.Attribute):
+            names.add(node.attr)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.add(node.module)
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+    return frozenset(names)
+
+
+def is_complex_prompt(prompt: str) -> bool:
+    lowered = prompt.lower()
+    hints = sum(hint in lowered for hint in COMPLEX_PROMPT_HINTS)
+    return hints >= 2 or len(prompt.split()) > COMPLEX_PROMPT_WORDS
+
+
+def extract_code_blocks(text: str) -> list[str]:
+    return [block for block in CODE_BLOCK_PATTERN.findall(text) if block.strip()]
+
+
+def attribute_chain(node):
+    """Returns (root name, [attributes]) for e.g. client.collections.get, else None."""
+    attributes = []
+    while isinstance(node, ast.Attribute):
+        attributes.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        return node.id, attributes[::-1]
+    return None
+
+
+def check_generated_code(output: str, api=None) -> list[str]:
+    """
+    Local checks on a generated answer: it contains Python code that parses, and
+    the Weaviate names it uses appear in the reference code.
+    Returns a list of problems; empty if the answer passes.
+    """
+    api = reference_api() if api is None else api
+    blocks = extract_code_blocks(output)
+    if not blocks:
+        return ["no Python code block in the answer"]
+
+    problems = []
+    for block in blocks:
+        try:
+            tree = ast.parse(block)
+        except SyntaxError as e:
+            problems.append(f"code does not parse: {e.msg} (line {e.lineno})")
+            continue
+
+        # Names bound to the Weaviate client library, plus the conventional client variable
+        roots = {"client"}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name.split(".")[0] == "weaviate":
+                        roots.add((alias.asname or alias.name).split(".")[0])
+            elif isinstance(node, ast.ImportFrom) and (node.module or "").startswith("weaviate"):
+                if node.module not in api:
+                    problems.append(f"unknown module {node.module}")
+                for alias in node.names:
+                    if alias.name not in api:
+                        problems.append(f"unknown name {node.module}.{alias.name}")
+                    roots.add(alias.asname or alias.name)
+
+        # Check each chain once, from its outermost attribute
+        inner = {id(node.value) for node in ast.walk(tree) if isinstance(node, ast.Attribute)}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Attribute) and id(node) not in inner:
+                chain = attribute_chain(node)
+                if chain and chain[0] in roots:
+                    unknown = [attr for attr in chain[1] if attr not in api]
+                    if unknown:
+                        problems.append(f"unknown API {chain[0]}.{'.'.join(chain[1])}")
+    return list(dict.fromkeys(problems))
+
+
+class WeaviateCodeSession:
+    """A multi-turn code generation conversation that keeps its message history."""
+
+    def __init__(self, agent: Agent | None = None, log_path=None, candidates: int = 1):
+        self.agent = agent or get_agent()
+        self.history = []
+        self.log_path = log_path
+        # More than 1 runs that many generations per prompt, see ask_first_valid
+        self.candidates = candidates
+        self.last_run = None
+
+    async def run(self, agent: Agent, prompt: str, check=None, model_settings=None, **log_fields):
+        """
+        Runs one prompt on agent and logs it. check(output), if given, returns a
+        list of problems; the first is logged as the reason the answer was rejected.
+        Returns (output, all messages, problems).
+        """
+        start = time.perf_counter()
+        ttft = None
+        # Streamed so the time to first token can be measured
+        async with agent.run_stream(
+            prompt, message_history=self.history, model_settings=model_settings
+        ) as result:
+            async for _ in result.stream_text(delta=True):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+            output = await result.get_output()
+        latency = time.perf_counter() - start
+
+        messages = result.all_messages()
+        problems = check(output) if check else []
+        if problems:
+            log_fields["rejected"] = problems[0]
+        self.last_run = record_run(
+            agent.model.model_name,
+            result.usage,
+            ttft,
+            latency,
+            log_path=self.log_path,
+            turn=len(messages) // 2,
+            **log_fields,
+        )
+        return output, messages, problems
+
+    async def ask(self, prompt: str) -> str:
+        """Sends a prompt, or a refinement of the previous answer, and returns the output."""
+        if self.candidates > 1:
+            output, _ = await self.ask_first_valid(prompt, [self.agent])
+            return output
+        output, self.history, _ = await self.run(self.agent, prompt)
+        return output
+
+    async def ask_first_valid(self, prompt: str, agents: list[Agent], check=check_generated_code):
+        """
+        Runs self.candidates generations concurrently, cycling through agents and
+        CANDIDATE_TEMPERATURES, and keeps the first answer that passes check.
+        The other generations are cancelled. If none passes, the first answer to
+        finish is kept. Returns (output, agent that produced it).
+        """
+        variants = [
+            (agents[i % len(agents)], CANDIDATE_TEMPERATURES[i % len(CANDIDATE_TEMPERATURES)])
+            for i in range(self.candidates)
+        ]
+
+        async def candidate(i, agent, temperature):
+            result = await self.run(
+                agent,
+                prompt,
+                check=check,
+                model_settings={"temperature": temperature},
+                candidate=i,
+            )
+            return result, agent
+
+        tasks = [asyncio.create_task(candidate(i, *variant)) for i, variant in enumerate(variants)]
+        fallback = None
+        error = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    (output, messages, problems), agent = await next_done
+                except Exception as e:
+                    error = e
+                    continue
+                if not problems:
+                    self.history = messages
+                    return output, agent
+                fallback = fallback or (output, messages, agent)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if fallback is None:
+            raise error
+        output, self.history, agent = fallback
+        return output, agent
+
+
+class RoutedCodeSession(WeaviateCodeSession):
+    """
+    A session that answers with a fast model, and escalates to a stronger one
+    for complex prompts or when the fast answer fails check_generated_code.
+    """
+
+    def __init__(
+        self,
+        agent: Agent | None = None,
+        strong_agent: Agent | None = None,
+        log_path=None,
+        candidates: int = 1,
+    ):
+        super().__init__(agent or get_agent(FAST_MODEL), log_path, candidates)
+        self.strong_agent = strong_agent or get_agent(DEFAULT_MODEL)
+        self.requests = 0
+        self.escalations = 0
+        # (model name, escalation reason or None) of the last answer
+        self.last_route = None
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.requests if self.requests else 0.0
+
+    async def ask(self, prompt: str) -> str:
+        self.requests += 1
+        if self.candidates > 1:
+            # Race the fast and strong models instead of trying them in turn
+            output, agent = await self.ask_first_valid(prompt, [self.agent, self.strong_agent])
+            self.last_route = (agent.model.model_name, None)
+            return output
+
+        if is_complex_prompt(prompt):
+            reason = "complex prompt"
+        else:
+            output, messages, problems = await self.run(
+                self.agent, prompt, check=check_generated_code
+            )
+            if not problems:
+                self.history = messages
+                self.last_route = (self.agent.model.model_name, None)
+                return output
+            reason = problems[0]
+
+        self.escalations += 1
+        output, self.history, _ = await self.run(self.strong_agent, prompt, escalated=reason)
+        self.last_route = (self.strong_agent.model.model_name, reason)
+        return output
+
+
+def new_session(model: str | None = None, candidates: int = 1, log_path=None) -> WeaviateCodeSession:
+    """A session on a fixed model, or a routed fast/strong session if model is None."""
+    if model:
+        return WeaviateCodeSession(get_agent(model), log_path, candidates)
+    return RoutedCodeSession(log_path=log_path, candidates=candidates)
+
+
+async def generate_weaviate_code_from_prompt(prompt: str, candidates: int = 1) -> str:
+    """Generate Weaviate code from a prompt using Pydantic AI."""
+    return await new_session(candidates=candidates).ask(prompt)
 
 
 async def save_code_to_file(code_content: str, default_filename: str):
@@ -57,23 +353,139 @@ async def save_code_to_file(code_content: str, default_filename: str):
                 print("Save cancelled.")
 
 
+REFINE_CHOICE = "Refine this code"
+SAVE_CHOICE = "Save to a file and finish"
+DONE_CHOICE = "Finish"
+
+
+async def run_session(session: WeaviateCodeSession, prompt: str):
+    """Generates code, then lets the user refine it over several turns."""
+    while prompt:
+        generated_code = await session.ask(prompt)
+        print("--- Generated Code ---")
+        print(generated_code)
+        if isinstance(session, RoutedCodeSession):
+            model_name, reason = session.last_route
+            print(f"Model: {model_name}" + (f" (escalated: {reason})" if reason else ""))
+
+        action = await questionary.select(
+            "What next?", choices=[REFINE_CHOICE, SAVE_CHOICE, DONE_CHOICE]
+        ).ask_async()
+        if action == REFINE_CHOICE:
+            prompt = await questionary.text("What should change?").ask_async()
+        else:
+            if action == SAVE_CHOICE:
+                await save_code_to_file(generated_code, "generated.example.py")
+            prompt = None
+
+    if isinstance(session, RoutedCodeSession) and session.requests > 1:
+        print(
+            f"Escalated {session.escalations} of {session.requests} requests "
+            f"({session.escalation_rate:.0%})"
+        )
+
+
+USE_LOCAL_CHOICE = "Use this example"
+ASK_AI_CHOICE = "Ask the AI anyway"
+
+
+def example_filename(source: str) -> str:
+    """
+    Default file name for saving a catalog entry: '<stem>.example.py', so that
+    saving references/weaviate.py can't shadow the weaviate package.
+    """
+    return f"{Path(source).stem}.example.py"
+
+
+async def answer_locally(prompt: str) -> bool:
+    """
+    Shows a bundled example or reference snippet if one matches the prompt well.
+    Returns True if the user took it, False to go on and ask the AI.
+    """
+    match = load_catalog().best_match(prompt)
+    if match is None:
+        return False
+
+    entry = match.entry
+    print(f"--- Local match: {entry.title} ({entry.source}) ---")
+    print(entry.text)
+    action = await questionary.select(
+        "This example matches your request.", choices=[USE_LOCAL_CHOICE, ASK_AI_CHOICE]
+    ).ask_async()
+    if action == USE_LOCAL_CHOICE:
+        await save_code_to_file(entry.text, example_filename(entry.source))
+        return True
+    return action is None  # Cancelled (Ctrl-C): don't go on to the AI
+
+
 @click.group()
 def code():
     """Code-related tools."""
     pass
 
 
-@code.command()
-def weaviate():
+@code.group(invoke_without_command=True)
+@click.option(
+    "--model",
+    default=None,
+    help=f"Always use this model. By default, prompts go to {FAST_MODEL} "
+    f"and are escalated to {DEFAULT_MODEL} when needed.",
+)
+@click.option(
+    "--candidates",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Generate this many answers concurrently and keep the first valid one. "
+    "Uses more tokens for more predictable latency.",
+)
+@click.pass_context
+def weaviate(ctx, model, candidates):
     """Generate Weaviate code examples."""
-    asyncio.run(weaviate_async())
+    if ctx.invoked_subcommand is None:
+        asyncio.run(weaviate_async(model, candidates))
+
 
-async def weaviate_async():
+@weaviate.command()
+@click.argument("example")
+@click.option("--collection", help="Collection name.")
+@click.option("--vectorizer", type=click.Choice(list(VECTORIZERS)), help="Vectorizer module.")
+@click.option("--cloud/--local", default=None, help="Connect to Weaviate Cloud or a local instance.")
+@click.option(
+    "--property",
+    "properties",
+    multiple=True,
+    help="A property as name:type, e.g. year:int (repeatable). "
+    f"Types: {', '.join(DATA_TYPES)}.",
+)
+@click.option("-o", "--output", type=click.Path(dir_okay=False), help="Write to this file instead of stdout.")
+def render(example, collection, vectorizer, cloud, properties, output):
+    """
+    Renders an example with new parameters, instantly and without AI.
+
+    EXAMPLE is a name or number, such as 10. Unset parameters keep the example's defaults.
+    """
+    try:
+        template = load_template(example)
+        code_content = template.render(
+            collection=collection,
+            vectorizer=vectorizer,
+            cloud=cloud,
+            properties=",".join(properties) if properties else None,
+        )
+    except TemplateError as e:
+        raise click.UsageError(str(e))
+    if output:
+        Path(output).write_text(code_content)
+        print(f"Code saved to {output}")
+    else:
+        click.echo(code_content, nl=False)
+
+async def weaviate_async(model=None, candidates=1):
     """Generate Weaviate code examples."""
-    examples_path = importlib.resources.files("woodhouse") / "weaviate_examples"
-    example_files = sorted(list(examples_path.glob("*.py")) + list(examples_path.glob("*.yaml")))
+    files = example_files()
 
-    example_choices = [f.stem for f in example_files]
+    example_choices = [f.stem for f in files]
     ai_choice = "Ask AI to generate an example"
 
     selected_example = await questionary.select(
@@ -83,16 +495,131 @@ async def weaviate_async():
 
     if selected_example == ai_choice:
         prompt = await questionary.text("What would you like the AI to do?").ask_async()
-        if prompt:
-            generated_code = await generate_weaviate_code_from_prompt(prompt)
-            print("--- Generated Code ---")
-            print(generated_code)
-            await save_code_to_file(generated_code, "generated.example.py")
+        if prompt and not await answer_locally(prompt):
+            await run_session(new_session(model, candidates), prompt)
     elif selected_example:
-        for example_file in example_files:
+        for example_file in files:
             if example_file.stem == selected_example:
                 print(f"--- {example_file.name} ---")
-                content = example_file.read_text()
+                content = render_text(example_file.read_text())
                 print(content)
                 await save_code_to_file(content, example_file.name)
                 break
+
+
+BENCHMARK_PROMPTS = (
+    "Connect to a local Weaviate instance",
+    "Create a collection with a title and body property",
+    "Batch import 100 objects",
+    "Run a hybrid search with a filter",
+)
+
+
+async def benchmark_generation(prompts, runs, concurrency, model=None, candidates=1):
+    """
+    Runs prompts (cycling) runs times, at most concurrency at once, each in a new
+    session. Returns the end-to-end seconds of each successful run, and the error
+    of each run that failed once the client's retries ran out.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    seconds = []
+    errors = []
+
+    async def run(prompt):
+        async with semaphore:
+            session = new_session(model, candidates, log_path=os.devnull)
+            start = time.perf_counter()
+            try:
+                await session.ask(prompt)
+            except AgentRunError as e:
+                # API errors (e.g. injected 529s) and exhausted retries
+                errors.append(f"{type(e).__name__}: {e}")
+            else:
+                seconds.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(run(prompts[i % len(prompts)]) for i in range(runs)))
+    return seconds, errors
+
+
+def server_options(function):
+    """Options shared by the commands that start a fake Anthropic API."""
+    for option in reversed([
+        click.option("--cassette", type=click.Path(dir_okay=False), help="JSON file of recorded answers."),
+        click.option(
+            "--mode",
+            type=click.Choice(["fake", "replay", "record"]),
+            default=None,
+            help="Default: replay with --cassette, otherwise fake answers.",
+        ),
+        click.option("--latency", type=float, default=0.0, show_default=True, help="Seconds before the first byte."),
+        click.option("--chunk-delay", type=float, default=0.0, show_default=True, help="Seconds between streamed chunks."),
+        click.option("--error-rate", type=float, default=0.0, show_default=True, help="Share of requests failed with a 529."),
+    ]):
+        function = option(function)
+    return function
+
+
+def make_server(cassette, mode, latency, chunk_delay, error_rate, port=0) -> FakeAnthropicServer:
+    mode = mode or ("replay" if cassette else "fake")
+    return FakeAnthropicServer(
+        cassette=Cassette(cassette) if cassette else None,
+        mode=mode,
+        latency=latency,
+        chunk_delay=chunk_delay,
+        error_rate=error_rate,
+        port=port,
+    )
+
+
+@code.command("fake-api")
+@server_options
+@click.option("--port", type=int, default=8765, show_default=True)
+def fake_api(cassette, mode, latency, chunk_delay, error_rate, port):
+    """Serves a local fake of the Anthropic Messages API, until interrupted."""
+    server = make_server(cassette, mode, latency, chunk_delay, error_rate, port)
+    print(f"Serving a fake Anthropic API ({server.mode}) on {server.url}")
+    print(f"Use it with: export ANTHROPIC_BASE_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+@code.command()
+@server_options
+@click.option("--prompt", "prompts", multiple=True, help="Prompt to send (repeatable). Default: a small built-in set.")
+@click.option("--runs", type=click.IntRange(min=1), default=20, show_default=True)
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, show_default=True)
+@click.option("--model", default=None, help="Use one model instead of routing.")
+@click.option("--candidates", type=click.IntRange(min=1), default=1, show_default=True)
+def bench(cassette, mode, latency, chunk_delay, error_rate, prompts, runs, concurrency, model, candidates):
+    """Benchmarks code generation offline, against a local fake of the Anthropic API."""
+    with make_server(cassette, mode, latency, chunk_delay, error_rate) as server:
+        os.environ["ANTHROPIC_BASE_URL"] = server.url
+        os.environ.setdefault("ANTHROPIC_API_KEY", "fake-key")
+        start = time.perf_counter()
+        get_agent(model or FAST_MODEL)
+        setup_seconds = time.perf_counter() - start
+
+        seconds, errors = asyncio.run(
+            benchmark_generation(list(prompts or BENCHMARK_PROMPTS), runs, concurrency, model, candidates)
+        )
+        served = list(server.server_seconds)
+
+    print(f"Setup (reference + agent): {format_seconds(setup_seconds)}")
+    print(f"Runs: {runs} at concurrency {concurrency}, {len(server.requests)} API requests")
+    print(f"Failed runs: {len(errors)} of {runs} ({len(errors) / runs:.0%})")
+    if errors:
+        print(f"First error: {errors[0]}")
+    if not seconds:
+        return
+    total = percentile(seconds, 50)
+    server_time = percentile(served, 50)
+    print(
+        f"End to end: p50 {format_seconds(total)}, p95 {format_seconds(percentile(seconds, 95))}, "
+        f"max {format_seconds(max(seconds))}"
+    )
+    print(f"Fake API time: p50 {format_seconds(server_time)}")
+    print(f"Client overhead: p50 {format_seconds(total - server_time)}")
@@ -0,0 +1,185 @@
+# Generates docker-compose files for local Weaviate, tuned for a workload profile.
+# See https://docs.weaviate.io/deploy/configuration/env-vars for the settings.
+from dataclasses import dataclass, field, replace
+
+import yaml
+
+DEFAULT_IMAGE = "cr.weaviate.io/semitechnologies/weaviate:1.32.7"
+HTTP_PORT = 8080
+GRPC_PORT = 50051
+GOSSIP_PORT = 7100
+DATA_PORT = 7101
+RAFT_PORT = 8300
+RAFT_INTERNAL_RPC_PORT = 8301
+
+
+@dataclass
+class ComposeSettings:
+    image: str = DEFAULT_IMAGE
+    nodes: int = 1
+    # Minimum replication factor for new collections (multi-node only)
+    replication_factor: int | None = None
+    modules: list[str] = field(default_factory=list)
+    # Threads Go may use; None for all cores
+    gomaxprocs: int | None = None
+    # Let Weaviate size its caches to the container's memory and CPU limits
+    limit_resources: bool = False
+    async_indexing: bool = False
+    # Container limits, e.g. "8G" and 4.0; None for no limit
+    memory: str | None = None
+    cpus: float | None = None
+    lsm_access_strategy: str = "mmap"
+    memtables_flush_dirty_after_seconds: int | None = None
+    hnsw_max_log_size: str | None = None
+    query_defaults_limit: int = 25
+    query_maximum_results: int | None = None
+    disk_use_readonly_percentage: int | None = None
+    monitoring: bool = False
+
+
+PROFILES = {
+    # Stay out of the way of everything else on a dev machine
+    "laptop": ComposeSettings(
+        gomaxprocs=2,
+        limit_resources=True,
+        memory="4G",
+        cpus=2,
+    ),
+    # Import throughput: index vectors in the background, write larger HNSW
+    # commit logs and flush memtables less often
+    "bulk-ingest": ComposeSettings(
+        async_indexing=True,
+        limit_resources=True,
+        memory="16G",
+        memtables_flush_dirty_after_seconds=60,
+        hnsw_max_log_size="4GiB",
+        disk_use_readonly_percentage=95,
+    ),
+    # Query latency: index synchronously so results are complete, allow larger
+    # result sets and keep segments memory-mapped
+    "query-heavy": ComposeSettings(
+        limit_resources=True,
+        memory="16G",
+        query_maximum_results=100_000,
+        lsm_access_strategy="mmap",
+        monitoring=True,
+    ),
+}
+
+
+def memory_bytes(size: str) -> int:
+    """'8G' / '512M' / '4GiB' -> bytes."""
+    units = {"k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+    number = size.rstrip("BbIi")
+    unit = number[-1].lower()
+    if unit in units:
+        return int(float(number[:-1]) * units[unit])
+    return int(number)
+
+
+def go_memory_limit(memory: str) -> str:
+    """GOMEMLIMIT at 80% of the container limit, leaving headroom for non-heap memory."""
+    return f"{memory_bytes(memory) * 8 // 10 // 1024**2}MiB"
+
+
+def compose_memory_limit(memory: str) -> str:
+    """The limit in whole MiB, a form Compose accepts whatever units it was given in."""
+    return f"{memory_bytes(memory) // 1024**2}M"
+
+
+def node_environment(settings: ComposeSettings, index: int) -> dict:
+    env = {
+        "QUERY_DEFAULTS_LIMIT": settings.query_defaults_limit,
+        "AUTHENTICATION_ANONYMOUS_ACCESS_ENABLED": "true",
+        "PERSISTENCE_DATA_PATH": "/var/lib/weaviate",
+        "PERSISTENCE_LSM_ACCESS_STRATEGY": settings.lsm_access_strategy,
+        "ENABLE_API_BASED_MODULES": "true",
+        "CLUSTER_HOSTNAME": f"node{index}",
+    }
+    if settings.modules:
+        env["ENABLE_MODULES"] = ",".join(settings.modules)
+        vectorizers = [m for m in settings.modules if m.startswith(("text2vec-", "multi2vec-"))]
+        if vectorizers:
+            env["DEFAULT_VECTORIZER_MODULE"] = vectorizers[0]
+    if settings.gomaxprocs:
+        env["GOMAXPROCS"] = settings.gomaxprocs
+    if settings.limit_resources:
+        env["LIMIT_RESOURCES"] = "true"
+    if settings.memory:
+        env["GOMEMLIMIT"] = go_memory_limit(settings.memory)
+    if settings.async_indexing:
+        env["ASYNC_INDEXING"] = "true"
+    if settings.memtables_flush_dirty_after_seconds:
+        env["PERSISTENCE_MEMTABLES_FLUSH_DIRTY_AFTER_SECONDS"] = settings.memtables_flush_dirty_after_seconds
+    if settings.hnsw_max_log_size:
+        env["PERSISTENCE_HNSW_MAX_LOG_SIZE"] = settings.hnsw_max_log_size
+    if settings.query_maximum_results:
+        env["QUERY_MAXIMUM_RESULTS"] = settings.query_maximum_results
+    if settings.disk_use_readonly_percentage:
+        env["DISK_USE_READONLY_PERCENTAGE"] = settings.disk_use_readonly_percentage
+    if settings.monitoring:
+        env["PROMETHEUS_MONITORING_ENABLED"] = "true"
+
+    if settings.nodes > 1:
+        voters = [f"node{i}" for i in range(1, min(settings.nodes, 3) + 1)]
+        env.update({
+            "CLUSTER_GOSSIP_BIND_PORT": GOSSIP_PORT,
+            "CLUSTER_DATA_BIND_PORT": DATA_PORT,
+            "RAFT_PORT": RAFT_PORT,
+            "RAFT_INTERNAL_RPC_PORT": RAFT_INTERNAL_RPC_PORT,
+            "RAFT_JOIN": ",".join(voters),
+            "RAFT_BOOTSTRAP_EXPECT": len(voters),
+        })
+        if index > 1:
+            env["CLUSTER_JOIN"] = f"node1:{GOSSIP_PORT}"
+        if settings.replication_factor:
+            env["REPLICATION_MINIMUM_FACTOR"] = settings.replication_factor
+    # Compose wants environment values as strings
+    return {key: str(value) for key, value in env.items()}
+
+
+def build_compose(settings: ComposeSettings) -> dict:
+    """The compose file contents as a dict."""
+    if settings.replication_factor and settings.replication_factor > settings.nodes:
+        raise ValueError(
+            f"Replication factor {settings.replication_factor} needs at least as many nodes "
+            f"(got {settings.nodes})"
+        )
+    services = {}
+    volumes = {}
+    for index in range(1, settings.nodes + 1):
+        name = "weaviate" if settings.nodes == 1 else f"weaviate-node{index}"
+        volume = "weaviate_data" if settings.nodes == 1 else f"weaviate_data_node{index}"
+        service = {
+            "command": ["--host", "0.0.0.0", "--port", str(HTTP_PORT), "--scheme", "http"],
+            "image": settings.image,
+            # Each node on its own host ports: 8080/50051, 8081/50052, ...
+            "ports": [f"{HTTP_PORT + index - 1}:{HTTP_PORT}", f"{GRPC_PORT + index - 1}:{GRPC_PORT}"],
+            "volumes": [f"{volume}:/var/lib/weaviate"],
+            "restart": "on-failure:0",
+            "environment": node_environment(settings, index),
+        }
+        if settings.nodes > 1:
+            service["hostname"] = f"node{index}"
+            if index > 1:
+                service["depends_on"] = ["weaviate-node1"]
+        limits = {}
+        if settings.memory:
+            limits["memory"] = compose_memory_limit(settings.memory)
+        if settings.cpus:
+            limits["cpus"] = str(settings.cpus)
+        if limits:
+            service["deploy"] = {"resources": {"limits": limits}}
+        services[name] = service
+        volumes[volume] = None
+    return {"services": services, "volumes": volumes}
+
+
+def settings_for(profile: str | None = None, **overrides) -> ComposeSettings:
+    """A profile's settings (or the defaults), with non-None overrides applied."""
+    settings = PROFILES[profile] if profile else ComposeSettings()
+    return replace(settings, **{k: v for k, v in overrides.items() if v is not None})
+
+
+def render_compose(settings: ComposeSettings) -> str:
+    return "---\n" + yaml.safe_dump(build_compose(settings), sort_keys=False, default_flow_style=False)
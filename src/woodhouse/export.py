@@ -0,0 +1,220 @@
+# Exports a Weaviate collection to JSONL or Parquet files by paging through the REST
+# objects endpoint with a cursor. Tenants are exported in parallel, each to its own
+# file, and progress is checkpointed so an interrupted export can resume.
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from woodhouse.weaviate_http import request
+
+STATE_FILE = ".export-state.json"
+FORMATS = ("jsonl", "parquet")
+# Tenants in other states have to be activated before they can be read
+READABLE_TENANT_STATUSES = ("HOT", "ACTIVE")
+
+
+def to_row(obj: dict, include_vector: bool = False) -> dict:
+    """
+    Flattens an object into a record: id, then properties, then vector and
+    <name>_vector columns. This is the layout `woodhouse weaviate ingest` reads
+    with --id-field id --vector-field vector.
+    """
+    row = {"id": obj["id"], **obj.get("properties", {})}
+    if include_vector:
+        if obj.get("vector"):
+            row["vector"] = obj["vector"]
+        for name, vector in (obj.get("vectors") or {}).items():
+            row[f"{name}_vector"] = vector
+    return row
+
+
+class JsonlSink:
+    """Appends rows to a JSONL file; every page is a checkpoint."""
+
+    def __init__(self, stem: Path, position: dict | None = None):
+        self.path = stem.with_name(f"{stem.name}.jsonl")
+        self.file = open(self.path, "r+" if position and self.path.exists() else "w")
+        # Drop anything written after the last checkpoint
+        self.file.truncate((position or {}).get("offset", 0))
+        self.offset = self.file.seek(0, os.SEEK_END)
+
+    def write(self, rows) -> bool:
+        for row in rows:
+            self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+        self.offset = self.file.tell()
+        return True
+
+    def position(self) -> dict:
+        return {"offset": self.offset}
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """
+    Writes rows to numbered Parquet part files of up to rows_per_part rows. A part
+    is only readable once closed, so closing a part is the checkpoint.
+    """
+
+    def __init__(self, stem: Path, position: dict | None = None, rows_per_part: int = 100_000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Writing Parquet needs pyarrow: pip install 'woodhouse[parquet]'")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.stem = stem
+        self.rows_per_part = rows_per_part
+        self.parts = (position or {}).get("parts", 0)
+        # Remove parts left unfinished by an interrupted run
+        for part in stem.parent.glob(f"{stem.name}.part-*.parquet"):
+            if int(part.name.rsplit("-", 1)[1].split(".")[0]) >= self.parts:
+                part.unlink()
+        self.writer = None
+        self.rows = 0
+
+    def part_path(self, index: int) -> Path:
+        return self.stem.parent / f"{self.stem.name}.part-{index:05d}.parquet"
+
+    def close_part(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+            self.parts += 1
+            self.rows = 0
+
+    def write(self, rows) -> bool:
+        table = self.pa.Table.from_pylist(rows)
+        if self.writer and table.schema != self.writer.schema:
+            try:
+                table = table.cast(self.writer.schema)
+            except (ValueError, self.pa.ArrowInvalid, self.pa.ArrowNotImplementedError):
+                # New or differently-typed properties: start a part with the new schema
+                self.close_part()
+        if not self.writer:
+            self.writer = self.pq.ParquetWriter(self.part_path(self.parts), table.schema)
+        self.writer.write_table(table)
+        self.rows += len(rows)
+        if self.rows >= self.rows_per_part:
+            self.close_part()
+            return True
+        return False
+
+    def position(self) -> dict:
+        return {"parts": self.parts}
+
+    def close(self):
+        self.close_part()
+
+
+SINKS = {"jsonl": JsonlSink, "parquet": ParquetSink}
+
+
+class ExportState:
+    """Per-tenant cursors and file positions, saved to output/.export-state.json."""
+
+    def __init__(self, output: Path, settings: dict, restart: bool = False):
+        self.path = output / STATE_FILE
+        self.data = {"settings": settings, "tenants": {}}
+        if self.path.exists() and not restart:
+            saved = json.loads(self.path.read_text())
+            if saved["settings"] != settings:
+                raise ValueError(
+                    f"{output} holds an export with different settings ({saved['settings']}); "
+                    "use a new directory or restart"
+                )
+            self.data = saved
+
+    def tenant(self, tenant: str | None) -> dict:
+        return self.data["tenants"].setdefault(tenant or "", {"after": None, "count": 0, "done": False})
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=2))
+        os.replace(tmp, self.path)
+
+
+async def list_tenants(client, collection: str) -> list[str] | None:
+    """Readable tenant names, or None if the collection isn't multi-tenant."""
+    schema = (await request(client, "GET", f"/v1/schema/{collection}")).json()
+    if not (schema.get("multiTenancyConfig") or {}).get("enabled"):
+        return None
+    tenants = (await request(client, "GET", f"/v1/schema/{collection}/tenants")).json()
+    return sorted(t["name"] for t in tenants if t.get("activityStatus", "ACTIVE") in READABLE_TENANT_STATUSES)
+
+
+def output_stem(output: Path, collection: str, tenant: str | None) -> Path:
+    return output / (f"{collection}.{tenant}" if tenant else collection)
+
+
+async def export_tenant(
+    client, collection, tenant, sink, progress, state, page_size=1000, include_vector=False, on_page=None
+):
+    """Pages through one tenant (or a collection without tenants) into sink, from progress['after']."""
+    after = progress["after"]
+    count = progress["count"]
+    while True:
+        params = {"class": collection, "limit": page_size}
+        if after:
+            params["after"] = after
+        if tenant:
+            params["tenant"] = tenant
+        if include_vector:
+            params["include"] = "vector"
+        objects = (await request(client, "GET", "/v1/objects", params=params)).json().get("objects") or []
+        if not objects:
+            break
+        after = objects[-1]["id"]
+        count += len(objects)
+        if sink.write([to_row(obj, include_vector) for obj in objects]):
+            progress.update(after=after, count=count, **sink.position())
+            state.save()
+        if on_page:
+            on_page(tenant, len(objects))
+    sink.close()
+    progress.update(after=after, count=count, done=True, **sink.position())
+    state.save()
+
+
+async def export_collection(
+    client,
+    collection: str,
+    output,
+    format: str = "jsonl",
+    include_vector: bool = False,
+    tenants=None,
+    concurrency: int = 4,
+    page_size: int = 1000,
+    restart: bool = False,
+    on_page=None,
+) -> dict:
+    """
+    Exports a collection into the output directory, one file (or set of Parquet
+    parts) per tenant, with up to concurrency tenants at once. Memory stays
+    bounded by concurrency x page_size objects. Re-running with the same settings
+    resumes from the saved cursors. Returns {tenant or "": objects exported}.
+    """
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    state = ExportState(output, {"collection": collection, "format": format, "include_vector": include_vector}, restart)
+    if not tenants:
+        tenants = await list_tenants(client, collection) or [None]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(tenant):
+        progress = state.tenant(tenant)
+        if progress["done"]:
+            return
+        async with semaphore:
+            sink = SINKS[format](output_stem(output, collection, tenant), progress if progress["after"] else None)
+            try:
+                await export_tenant(client, collection, tenant, sink, progress, state, page_size, include_vector, on_page)
+            finally:
+                sink.close()
+
+    await asyncio.gather(*(run(tenant) for tenant in tenants))
+    return {tenant or "": state.tenant(tenant)["count"] for tenant in tenants}
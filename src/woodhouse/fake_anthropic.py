@@ -0,0 +1,322 @@
+# A local stand-in for the Anthropic Messages API, so code generation can be tested
+# and benchmarked offline. Point the client at it with ANTHROPIC_BASE_URL.
+#
+# Answers come from a responder function, or from a cassette of recorded answers.
+# In record mode, requests missing from the cassette are forwarded to the real API
+# and saved. Latency, streaming speed and errors (429/529/500) can be injected.
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+UPSTREAM_URL = "https://api.anthropic.com"
+ERROR_TYPES = {
+    429: "rate_limit_error",
+    500: "api_error",
+    529: "overloaded_error",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def request_text(request: dict) -> tuple[str, str]:
+    """The (system, messages) text of a Messages API request."""
+
+    def flatten(content):
+        if isinstance(content, str):
+            return content
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+    system = flatten(request.get("system", ""))
+    messages = "\n".join(flatten(message["content"]) for message in request.get("messages", []))
+    return system, messages
+
+
+def last_user_message(request: dict) -> str:
+    for message in reversed(request.get("messages", [])):
+        if message["role"] == "user":
+            content = message["content"]
+            if isinstance(content, str):
+                return content
+            return "".join(block.get("text", "") for block in content if block.get("type") == "text")
+    return ""
+
+
+def default_responder(request: dict) -> str:
+    """A short, valid answer that echoes the prompt."""
+    prompt = last_user_message(request).replace("\n", " ")
+    return (
+        f"Here is an example for: {prompt}\n\n"
+        "```python\nimport weaviate\n\nclient = weaviate.connect_to_local()\nclient.close()\n```"
+    )
+
+
+class Cassette:
+    """Recorded answers, keyed by a hash of the model, system prompt and messages."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.entries = json.loads(self.path.read_text()) if self.path.exists() else {}
+
+    @staticmethod
+    def key(request: dict) -> str:
+        relevant = {k: request.get(k) for k in ("model", "system", "messages", "tools")}
+        return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()[:32]
+
+    def get(self, request: dict) -> dict | None:
+        return self.entries.get(self.key(request))
+
+    def put(self, request: dict, entry: dict):
+        with self.lock:
+            self.entries[self.key(request)] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+
+
+def fetch_upstream(request: dict, headers: dict, upstream: str = UPSTREAM_URL) -> dict:
+    """Sends a (non-streamed) request to the real API; returns a cassette entry."""
+    body = json.dumps({**request, "stream": False}).encode()
+    forwarded = {
+        "content-type": "application/json",
+        "x-api-key": headers.get("x-api-key", ""),
+        "anthropic-version": headers.get("anthropic-version", "2023-06-01"),
+    }
+    if headers.get("anthropic-beta"):
+        forwarded["anthropic-beta"] = headers["anthropic-beta"]
+    upstream_request = urllib.request.Request(f"{upstream}/v1/messages", body, forwarded)
+    with urllib.request.urlopen(upstream_request) as response:
+        message = json.loads(response.read())
+    text = "".join(block.get("text", "") for block in message["content"])
+    return {"text": text, "usage": message.get("usage", {})}
+
+
+class FakeAnthropicServer:
+    """
+    Serves POST /v1/messages (streamed or not) on a background thread.
+
+    mode is "fake" (always use responder), "replay" (cassette only; unknown requests
+    fail with a 500 error) or "record" (cassette, else forward upstream and record).
+    latency delays the first byte, chunk_delay each streamed chunk. errors is a list
+    of HTTP statuses returned to the first requests; error_rate fails that share of
+    the remaining ones at random.
+    """
+
+    def __init__(
+        self,
+        responder=default_responder,
+        cassette: Cassette | None = None,
+        mode: str = "fake",
+        latency: float = 0.0,
+        chunk_delay: float = 0.0,
+        chunk_size: int = 16,
+        errors=(),
+        error_rate: float = 0.0,
+        error_status: int = 529,
+        seed: int = 0,
+        upstream: str = UPSTREAM_URL,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        if mode != "fake" and cassette is None:
+            raise ValueError(f"Mode {mode!r} needs a cassette")
+        self.responder = responder
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.errors = list(errors)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.upstream = upstream
+        self.lock = threading.Lock()
+        # Received request bodies, and the seconds spent serving each
+        self.requests = []
+        self.server_seconds = []
+        self.cached_prefixes = set()
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def next_error(self) -> int | None:
+        with self.lock:
+            if self.errors:
+                return self.errors.pop(0)
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+    def answer(self, request: dict, headers: dict) -> dict:
+        """A cassette-style entry {"text", "usage"} for the request."""
+        if self.mode == "fake":
+            return {"text": self.responder(request)}
+        entry = self.cassette.get(request)
+        if entry is None:
+            if self.mode == "replay":
+                raise LookupError("No recorded answer for this request")
+            entry = fetch_upstream(request, headers, self.upstream)
+            self.cassette.put(request, entry)
+        return entry
+
+    def usage(self, request: dict, text: str) -> dict:
+        """Token counts, simulating prompt caching of the system prompt."""
+        system, messages = request_text(request)
+        cache_read = cache_write = 0
+        if system and "cache_control" in json.dumps(request.get("system", "")):
+            with self.lock:
+                if system in self.cached_prefixes:
+                    cache_read = estimate_tokens(system)
+                else:
+                    cache_write = estimate_tokens(system)
+                    self.cached_prefixes.add(system)
+            input_tokens = estimate_tokens(messages)
+        else:
+            input_tokens = estimate_tokens(system + messages)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": estimate_tokens(text),
+            "cache_creation_input_tokens": cache_write,
+            "cache_read_input_tokens": cache_read,
+        }
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass  # Keep test and benchmark output clean
+
+            def send_json(self, status, payload, extra_headers=()):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(body)))
+                for name, value in extra_headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_error_json(self, status, message):
+                error_type = ERROR_TYPES.get(status, "api_error")
+                payload = {"type": "error", "error": {"type": error_type, "message": message}}
+                # Ask the client to retry quickly, to keep tests and benchmarks fast
+                self.send_json(status, payload, [("retry-after-ms", "10")])
+
+            def send_event(self, event, data):
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+                self.wfile.flush()
+
+            def do_POST(self):
+                start = time.perf_counter()
+                length = int(self.headers.get("content-length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.split("?")[0] != "/v1/messages":
+                    self.send_error_json(404, f"Unknown path {self.path}")
+                    return
+                with server.lock:
+                    server.requests.append(request)
+                if server.latency:
+                    time.sleep(server.latency)
+
+                status = server.next_error()
+                if status:
+                    self.send_error_json(status, "Injected error")
+                    return
+                try:
+                    entry = server.answer(request, dict(self.headers))
+                except Exception as e:
+                    self.send_error_json(500, f"{type(e).__name__}: {e}")
+                    return
+
+                text = entry["text"]
+                usage = {**server.usage(request, text), **entry.get("usage", {})}
+                message_id = f"msg_fake_{len(server.requests)}"
+                if request.get("stream"):
+                    self.stream_message(request, message_id, text, usage)
+                else:
+                    self.send_json(200, {
+                        "id": message_id,
+                        "type": "message",
+                        "role": "assistant",
+                        "model": request.get("model"),
+                        "content": [{"type": "text", "text": text}],
+                        "stop_reason": "end_turn",
+                        "stop_sequence": None,
+                        "usage": usage,
+                    })
+                with server.lock:
+                    server.server_seconds.append(time.perf_counter() - start)
+
+            def stream_message(self, request, message_id, text, usage):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("cache-control", "no-cache")
+                self.send_header("connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                self.send_event("message_start", {
+                    "type": "message_start",
+                    "message": {
+                        "id": message_id,
+                        "type": "message",
+                        "role": "assistant",
+                        "model": request.get("model"),
+                        "content": [],
+                        "stop_reason": None,
+                        "stop_sequence": None,
+                        "usage": {**usage, "output_tokens": 1},
+                    },
+                })
+                self.send_event("content_block_start", {
+                    "type": "content_block_start",
+                    "index": 0,
+                    "content_block": {"type": "text", "text": ""},
+                })
+                for start in range(0, len(text), server.chunk_size):
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                    self.send_event("content_block_delta", {
+                        "type": "content_block_delta",
+                        "index": 0,
+                        "delta": {"type": "text_delta", "text": text[start : start + server.chunk_size]},
+                    })
+                self.send_event("content_block_stop", {"type": "content_block_stop", "index": 0})
+                self.send_event("message_delta", {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": usage["output_tokens"]},
+                })
+                self.send_event("message_stop", {"type": "message_stop"})
+
+        return Handler
@@ -0,0 +1,242 @@
+# A small in-memory stand-in for the Weaviate REST API, so the `woodhouse weaviate`
+# data tools can be tested without a database. It implements only the endpoints
+# those tools use, and can inject latency and errors like fake_anthropic.
+import json
+import random
+import re
+import threading
+import time
+import uuid as uuid_module
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROUTES = []
+
+
+def route(method, pattern):
+    """Registers a FakeWeaviateServer method as the handler for method + path regex."""
+
+    def decorator(fn):
+        ROUTES.append((method, re.compile(f"^{pattern}$"), fn))
+        return fn
+
+    return decorator
+
+
+class FakeWeaviateServer:
+    """
+    Serves a subset of the Weaviate REST API from memory on a background thread.
+
+    collections maps a collection name to {"objects": {(tenant, uuid): object},
+    "tenants": {name: activity status}, "multi_tenancy": bool}, created on first
+    write like auto-schema; writing to a tenant makes the collection multi-tenant.
+
+    latency delays every request. errors is a list of HTTP statuses (or None for
+    success) returned to the first requests; error_rate fails that share of the
+    remaining ones. object_error_rate fails that share of objects within a batch.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        errors=(),
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        object_error_rate: float = 0.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.errors = list(errors)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.object_error_rate = object_error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.collections = {}
+        # (method, path) of every request received
+        self.requests = []
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def collection(self, name: str) -> dict:
+        return self.collections.setdefault(name, {"objects": {}, "tenants": {}, "multi_tenancy": False})
+
+    def objects(self, name: str, tenant: str | None = None) -> list[dict]:
+        with self.lock:
+            objects = self.collection(name)["objects"].values()
+            return [obj for obj in objects if tenant is None or obj.get("tenant") == tenant]
+
+    def next_error(self) -> int | None:
+        with self.lock:
+            if self.errors:
+                return self.errors.pop(0)
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+    @route("POST", "/v1/batch/objects")
+    def batch_objects(self, body, query):
+        results = []
+        with self.lock:
+            for obj in body.get("objects", []):
+                stored = {
+                    "class": obj["class"],
+                    "id": obj.get("id") or str(uuid_module.uuid4()),
+                    "properties": obj.get("properties", {}),
+                }
+                for key in ("vector", "vectors", "tenant"):
+                    if key in obj:
+                        stored[key] = obj[key]
+                result = {}
+                if self.object_error_rate and self.random.random() < self.object_error_rate:
+                    result = {"errors": {"error": [{"message": "injected object error"}]}}
+                else:
+                    collection = self.collection(obj["class"])
+                    if obj.get("tenant"):
+                        collection["multi_tenancy"] = True
+                        collection["tenants"].setdefault(obj["tenant"], "ACTIVE")
+                    collection["objects"][obj.get("tenant"), stored["id"]] = stored
+                results.append({**stored, "result": result})
+        return 200, results
+
+    @route("GET", "/v1/objects")
+    def list_objects(self, body, query):
+        name = query.get("class", [None])[0]
+        tenant = query.get("tenant", [None])[0]
+        after = query.get("after", [""])[0]
+        limit = int(query.get("limit", ["25"])[0])
+        with self.lock:
+            if name not in self.collections:
+                return 404, {"error": [{"message": f"Collection {name} not found"}]}
+            collection = self.collections[name]
+            if collection["multi_tenancy"] and collection["tenants"].get(tenant) not in ("ACTIVE", "HOT"):
+                return 422, {"error": [{"message": f"Tenant {tenant!r} not found or not active"}]}
+            objects = sorted(
+                (obj for (obj_tenant, _), obj in collection["objects"].items() if obj_tenant == tenant),
+                key=lambda obj: obj["id"],
+            )
+        page = [obj for obj in objects if obj["id"] > after][:limit]
+        if "vector" not in query.get("include", [""])[0]:
+            page = [{k: v for k, v in obj.items() if k not in ("vector", "vectors")} for obj in page]
+        return 200, {"objects": page, "totalResults": len(page)}
+
+    @route("GET", r"/v1/schema/(\w+)")
+    def get_schema(self, body, query, name):
+        with self.lock:
+            if name not in self.collections:
+                return 404, {"error": [{"message": f"Collection {name} not found"}]}
+            enabled = self.collections[name]["multi_tenancy"]
+        return 200, {"class": name, "multiTenancyConfig": {"enabled": enabled}}
+
+    @route("GET", r"/v1/schema/(\w+)/tenants")
+    def get_tenants(self, body, query, name):
+        with self.lock:
+            tenants = self.collection(name)["tenants"]
+            return 200, [{"name": tenant, "activityStatus": status} for tenant, status in tenants.items()]
+
+    @route("POST", r"/v1/schema/(\w+)/tenants")
+    def add_tenants(self, body, query, name):
+        with self.lock:
+            collection = self.collection(name)
+            existing = [t["name"] for t in body if t["name"] in collection["tenants"]]
+            if existing:
+                return 422, {"error": [{"message": f"tenant {existing[0]} already exists"}]}
+            collection["multi_tenancy"] = True
+            for tenant in body:
+                collection["tenants"][tenant["name"]] = tenant.get("activityStatus", "ACTIVE")
+        return 200, body
+
+    @route("PUT", r"/v1/schema/(\w+)/tenants")
+    def update_tenants(self, body, query, name):
+        with self.lock:
+            tenants = self.collection(name)["tenants"]
+            missing = [t["name"] for t in body if t["name"] not in tenants]
+            if missing:
+                return 422, {"error": [{"message": f"tenant {missing[0]} not found"}]}
+            for tenant in body:
+                tenants[tenant["name"]] = tenant["activityStatus"]
+        return 200, body
+
+    @route("POST", "/v1/graphql")
+    def graphql(self, body, query):
+        # Only enough of Get to benchmark against: the first `limit` objects
+        match = re.search(r"Get\s*{\s*(\w+)\s*\((.*)\)\s*{", body.get("query", ""), re.S)
+        if not match:
+            return 200, {"errors": [{"message": "Only Get queries are supported"}]}
+        name, arguments = match.groups()
+        limit = re.search(r"limit:\s*(\d+)", arguments)
+        objects = self.objects(name)[: int(limit.group(1)) if limit else 10]
+        found = [{**obj["properties"], "_additional": {"id": obj["id"]}} for obj in objects]
+        return 200, {"data": {"Get": {name: found}}}
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle_request(self, method):
+                url = urlparse(self.path)
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length)) if length else {}
+                with server.lock:
+                    server.requests.append((method, url.path))
+                if server.latency:
+                    time.sleep(server.latency)
+                status = server.next_error()
+                if status:
+                    self.send_json(status, {"error": [{"message": "injected error"}]})
+                    return
+                for route_method, pattern, handler in ROUTES:
+                    match = pattern.match(url.path)
+                    if route_method == method and match:
+                        status, payload = handler(server, body, parse_qs(url.query), *match.groups())
+                        self.send_json(status, payload)
+                        return
+                self.send_json(404, {"error": [{"message": f"No route for {method} {url.path}"}]})
+
+            def do_GET(self):
+                self.handle_request("GET")
+
+            def do_POST(self):
+                self.handle_request("POST")
+
+            def do_PUT(self):
+                self.handle_request("PUT")
+
+            def do_DELETE(self):
+                self.handle_request("DELETE")
+
+        return Handler
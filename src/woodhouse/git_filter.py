@@ -0,0 +1,127 @@
+# Git clean filter that strips solution blocks from notebooks as they are staged.
+# Implements git's long-running filter protocol (filter.<driver>.process), so one
+# warm Python process handles every notebook in a checkout or commit.
+# See https://git-scm.com/docs/gitattributes#_long_running_filter_process
+#
+# Example setup:
+#   git config filter.strip-answers.process "woodhouse notebook git-filter --process"
+#   git config filter.strip-answers.required true
+#   echo "*.ipynb filter=strip-answers" >> .gitattributes
+from woodhouse.notebooks import strip_solutions_from_text
+
+FLUSH = None
+# pkt-line length is 4 hex digits and includes those 4 bytes
+MAX_PACKET_DATA = 65516
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def read_packet(stream):
+    """Reads one pkt-line. Returns its payload as bytes, or FLUSH for '0000'."""
+    header = stream.read(4)
+    if not header:
+        raise EOFError
+    if len(header) < 4:
+        raise ProtocolError(f"Truncated pkt-line header: {header!r}")
+    length = int(header, 16)
+    if length == 0:
+        return FLUSH
+    if length < 4:
+        raise ProtocolError(f"Invalid pkt-line length: {length}")
+    payload = stream.read(length - 4)
+    if len(payload) < length - 4:
+        raise ProtocolError("Truncated pkt-line payload")
+    return payload
+
+
+def write_packet(stream, payload):
+    """Writes one pkt-line with the given bytes payload."""
+    stream.write(b"%04x" % (len(payload) + 4))
+    stream.write(payload)
+
+
+def write_flush(stream):
+    stream.write(b"0000")
+    stream.flush()
+
+
+def read_text_list(stream):
+    """Reads text pkt-lines up to the next flush packet, without trailing newlines."""
+    lines = []
+    while (packet := read_packet(stream)) is not FLUSH:
+        lines.append(packet.decode("utf-8").rstrip("\n"))
+    return lines
+
+
+def write_text_list(stream, lines):
+    for line in lines:
+        write_packet(stream, f"{line}\n".encode("utf-8"))
+    write_flush(stream)
+
+
+def read_content(stream):
+    """Reads binary pkt-lines up to the next flush packet."""
+    chunks = []
+    while (packet := read_packet(stream)) is not FLUSH:
+        chunks.append(packet)
+    return b"".join(chunks)
+
+
+def write_content(stream, content):
+    for start in range(0, len(content), MAX_PACKET_DATA):
+        write_packet(stream, content[start : start + MAX_PACKET_DATA])
+    write_flush(stream)
+
+
+def clean_notebook(content: bytes) -> bytes:
+    """The clean filter: notebook bytes in, student-safe notebook bytes out."""
+    return strip_solutions_from_text(content.decode("utf-8")).encode("utf-8")
+
+
+def handshake(stdin, stdout, capabilities=("clean",)):
+    """Performs the version and capability negotiation with git."""
+    welcome = read_text_list(stdin)
+    if "git-filter-client" not in welcome or "version=2" not in welcome:
+        raise ProtocolError(f"Unexpected handshake from git: {welcome}")
+    write_text_list(stdout, ["git-filter-server", "version=2"])
+
+    offered = {line.split("=", 1)[1] for line in read_text_list(stdin)}
+    write_text_list(stdout, [f"capability={c}" for c in capabilities if c in offered])
+
+
+def run_filter_process(stdin, stdout, filters=None):
+    """
+    Serves git filter requests on binary stdin/stdout until git closes the pipe.
+    filters maps a command name ('clean', 'smudge') to a bytes -> bytes function.
+    """
+    filters = filters or {"clean": clean_notebook}
+    handshake(stdin, stdout, capabilities=tuple(filters))
+
+    while True:
+        try:
+            headers = read_text_list(stdin)
+        except EOFError:
+            return
+        request = dict(line.split("=", 1) for line in headers)
+        content = read_content(stdin)
+
+        command = request.get("command")
+        try:
+            result = filters[command](content)
+        except Exception:
+            # Tell git this file failed; it decides whether that is fatal
+            write_text_list(stdout, ["status=error"])
+            continue
+
+        write_text_list(stdout, ["status=success"])
+        write_content(stdout, result)
+        # An empty list keeps the "success" status sent above
+        write_flush(stdout)
+
+
+def run_single_file(stdin, stdout):
+    """Fallback for filter.<driver>.clean: one notebook on stdin, cleaned to stdout."""
+    stdout.write(clean_notebook(stdin.read()))
+    stdout.flush()
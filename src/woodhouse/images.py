@@ -1,24 +1,335 @@
 import glob
+import os
+import struct
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
 import click
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
 
-def crunch_images(pattern: str):
+# Channels per PNG color type (IHDR field), used to estimate raw pixel bytes
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+PNG_COLOR_TYPE_NAMES = {
+    0: "gray",
+    2: "rgb",
+    3: "palette",
+    4: "gray+alpha",
+    6: "rgba",
+}
+
+# Rough share of the IDAT stream that crunch (pngquant + zopflipng) removes,
+# by color type. Truecolor images gain the most from quantization to a palette.
+EXPECTED_IDAT_SAVINGS = {0: 0.15, 2: 0.55, 3: 0.08, 4: 0.35, 6: 0.6}
+# Crunch time is dominated by zopfli, which scales with pixel count
+CRUNCH_SECONDS_PER_MEGAPIXEL = 1.5
+CRUNCH_SECONDS_PER_FILE = 0.1
+
+
+@dataclass
+class PngAudit:
+    """Header-level facts about a PNG file and the expected crunch savings."""
+
+    path: Path
+    size: int
+    width: int
+    height: int
+    bit_depth: int
+    color_type: int
+    idat_bytes: int
+    ancillary_bytes: int
+    already_optimized: bool
+    estimated_savings: int
+    estimated_seconds: float
+
+    @property
+    def megapixels(self) -> float:
+        return self.width * self.height / 1_000_000
+
+
+def read_png_chunks(path: Path):
+    """
+    Reads the IHDR fields and chunk table of a PNG without decoding pixel data.
+    Returns (ihdr, chunks) where chunks is a list of (type, length) tuples,
+    or None if the file is not a valid PNG.
+    """
+    chunks = []
+    ihdr = None
+    with open(path, "rb") as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk_type = struct.unpack(">I4s", header)
+            chunk_type = chunk_type.decode("latin-1")
+            chunks.append((chunk_type, length))
+            if chunk_type == "IHDR":
+                ihdr = struct.unpack(">IIBBBBB", f.read(13))
+                f.seek(4, 1)  # Skip the CRC
+            else:
+                f.seek(length + 4, 1)
+            if chunk_type == "IEND":
+                break
+    if ihdr is None:
+        return None
+    return ihdr, chunks
+
+
+def audit_png(path: Path) -> PngAudit | None:
+    """Estimates what crunch would save on a PNG, from its headers alone."""
+    try:
+        parsed = read_png_chunks(path)
+        size = path.stat().st_size
+    except (OSError, struct.error):
+        return None
+    if parsed is None:
+        return None
+
+    (width, height, bit_depth, color_type, _, _, _), chunks = parsed
+    idat_bytes = sum(length for chunk_type, length in chunks if chunk_type == "IDAT")
+    # Ancillary chunks have a lowercase first letter; crunch strips them
+    ancillary_bytes = sum(
+        length + 12 for chunk_type, length in chunks if chunk_type[0].islower()
+    )
+
+    channels = PNG_CHANNELS.get(color_type, 4)
+    raw_bytes = height * (1 + (width * channels * bit_depth + 7) // 8)
+    compression_ratio = idat_bytes / raw_bytes if raw_bytes else 1.0
+
+    # Paletted images without metadata are what crunch itself produces
+    already_optimized = (
+        color_type == 3 and ancillary_bytes == 0
+    ) or path.with_stem(f"{path.stem}-precrunch").exists()
+
+    idat_savings = EXPECTED_IDAT_SAVINGS.get(color_type, 0.3)
+    if bit_depth == 16:
+        idat_savings = max(idat_savings, 0.7)
+    if compression_ratio < 0.1:
+        # Already very well compressed (flat artwork etc); less to gain
+        idat_savings /= 2
+    if already_optimized:
+        idat_savings /= 4
+    estimated_savings = ancillary_bytes + int(idat_bytes * idat_savings)
+
+    megapixels = width * height / 1_000_000
+    estimated_seconds = (
+        CRUNCH_SECONDS_PER_FILE + megapixels * CRUNCH_SECONDS_PER_MEGAPIXEL
+    )
+
+    return PngAudit(
+        path=path,
+        size=size,
+        width=width,
+        height=height,
+        bit_depth=bit_depth,
+        color_type=color_type,
+        idat_bytes=idat_bytes,
+        ancillary_bytes=ancillary_bytes,
+        already_optimized=already_optimized,
+        estimated_savings=estimated_savings,
+        estimated_seconds=estimated_seconds,
+    )
+
+
+def audit_images(pattern: str, workers: int = 16) -> list[PngAudit]:
+    """
+    Audits all PNG files matching the pattern without decoding any pixels.
+    Returns the audits ranked by expected savings, largest first.
+    """
+    paths = [
+        Path(p)
+        for p in glob.glob(pattern, recursive=True)
+        if p.lower().endswith(".png") and not p.endswith("-precrunch.png")
+    ]
+    # Header reads are I/O bound, so threads help on large trees
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        audits = [a for a in executor.map(audit_png, paths) if a is not None]
+    audits.sort(key=lambda a: a.estimated_savings, reverse=True)
+    return audits
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Formats a byte count for humans, e.g. 1.4 MB."""
+    if abs(num_bytes) < 1024:
+        return f"{num_bytes:.0f} B"
+    for unit in ("KB", "MB", "GB", "TB"):
+        num_bytes /= 1024
+        if abs(num_bytes) < 1024:
+            break
+    return f"{num_bytes:.1f} {unit}"
+
+
+def print_audit_report(audits: list[PngAudit], top: int = 20):
+    """Prints a ranked table of the top files and totals for the whole set."""
+    if not audits:
+        click.echo("No PNG files found.")
+        return
+
+    click.echo(
+        f"{'Savings':>10}  {'Size':>10}  {'Pixels':>11}  {'Type':<16}  File"
+    )
+    for audit in audits[:top]:
+        color = PNG_COLOR_TYPE_NAMES.get(audit.color_type, "?")
+        kind = f"{color}/{audit.bit_depth}"
+        if audit.already_optimized:
+            kind += " *"
+        click.echo(
+            f"{format_bytes(audit.estimated_savings):>10}  "
+            f"{format_bytes(audit.size):>10}  "
+            f"{audit.width:>5}x{audit.height:<5}  "
+            f"{kind:<16}  {audit.path}"
+        )
+    if len(audits) > top:
+        click.echo(f"... and {len(audits) - top} more")
+
+    total_size = sum(a.size for a in audits)
+    total_savings = sum(a.estimated_savings for a in audits)
+    total_seconds = sum(a.estimated_seconds for a in audits)
+    optimized = sum(1 for a in audits if a.already_optimized)
+    click.echo("")
+    click.echo(f"Files: {len(audits)} ({optimized} look already optimized, marked *)")
+    click.echo(f"Total size: {format_bytes(total_size)}")
+    click.echo(
+        f"Estimated savings: {format_bytes(total_savings)} "
+        f"({total_savings / total_size:.0%})"
+    )
+    click.echo(
+        f"Estimated crunch time: {total_seconds:.0f} s ({total_seconds / 60:.1f} min)"
+    )
+
+
+@dataclass
+class CrunchResult:
+    """What happened to one file during crunch_images."""
+
+    path: Path
+    original_size: int
+    crunched_size: int
+    original_dimensions: tuple[int, int]
+    dimensions: tuple[int, int]
+
+    @property
+    def resized(self) -> bool:
+        return self.original_dimensions != self.dimensions
+
+
+def fit_dimensions(
+    width: int, height: int, max_width: int | None, max_height: int | None
+) -> tuple[int, int]:
+    """Scales (width, height) down to fit the limits, keeping the aspect ratio."""
+    scale = 1.0
+    if max_width and width > max_width:
+        scale = min(scale, max_width / width)
+    if max_height and height > max_height:
+        scale = min(scale, max_height / height)
+    if scale == 1.0:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def resize_image(source_path: Path, target_path: Path, size: tuple[int, int]):
+    """Downsamples an image in-process with a Lanczos filter."""
+    from PIL import Image
+
+    with Image.open(source_path) as image:
+        if image.mode == "P":
+            # Palette images can only be resampled with nearest-neighbour
+            image = image.convert("RGBA")
+        resized = image.resize(size, Image.Resampling.LANCZOS)
+        resized.save(target_path, format="PNG")
+
+
+class CrunchNotFoundError(FileNotFoundError):
+    """The crunch command isn't installed, as opposed to a missing input file."""
+
+
+def run_crunch(path: Path, verbose: bool = True) -> Path | None:
+    """
+    Runs crunch on a PNG and returns the path of the *-crunch output,
+    or None if crunch did not produce one. Raises CrunchNotFoundError if crunch
+    is not installed and subprocess.CalledProcessError if it failed.
+    """
+    try:
+        result = subprocess.run(
+            ["crunch", str(path)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError as e:
+        raise CrunchNotFoundError(e.errno, e.strerror, e.filename) from e
+    if verbose:
+        click.echo(result.stdout)
+        if result.stderr:
+            click.echo(result.stderr, err=True)
+
+    crunched_path = path.with_stem(f"{path.stem}-crunch")
+    if not crunched_path.exists():
+        click.echo(
+            f"Error: '{crunched_path}' not found after running crunch.",
+            err=True,
+        )
+        return None
+    return crunched_path
+
+
+def crunch_png_bytes(data: bytes) -> bytes:
+    """Runs crunch on in-memory PNG data and returns the crunched bytes."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "image.png"
+        path.write_bytes(data)
+        crunched_path = run_crunch(path, verbose=False)
+        if crunched_path is None:
+            return data
+        return crunched_path.read_bytes()
+
+
+def print_crunch_report(results: list[CrunchResult]):
+    """Prints before/after sizes and any resizing for crunched files."""
+    if not results:
+        return
+    click.echo("--- Crunch report ---")
+    for result in results:
+        line = (
+            f"{result.path}: {format_bytes(result.original_size)} -> "
+            f"{format_bytes(result.crunched_size)}"
+        )
+        if result.resized:
+            original_width, original_height = result.original_dimensions
+            width, height = result.dimensions
+            line += f" (resized from {original_width}x{original_height} to {width}x{height})"
+        click.echo(line)
+    original_total = sum(r.original_size for r in results)
+    crunched_total = sum(r.crunched_size for r in results)
+    click.echo(
+        f"Total: {format_bytes(original_total)} -> {format_bytes(crunched_total)} "
+        f"across {len(results)} files"
+    )
+
+
+def crunch_images(
+    pattern: str, max_width: int | None = None, max_height: int | None = None
+) -> list[CrunchResult]:
     """
     Compresses PNG files using crunch, renames original files to *-precrunch,
     and renames crunched files to the original filenames.
+    Images larger than max_width/max_height are downsampled before crunching.
     """
+    results = []
     try:
         files = glob.glob(pattern, recursive=True)
     except Exception as e:
         click.echo(f"Error with pattern '{pattern}': {e}", err=True)
-        return
+        return results
 
     if not files:
         click.echo(f"No files found matching pattern: {pattern}")
-        return
+        return results
 
     for file_path_str in files:
         original_path = Path(file_path_str)
@@ -34,26 +345,37 @@ def crunch_images(pattern: str):
             )
             continue
 
-        crunched_path = original_path.with_stem(f"{original_path.stem}-crunch")
-
         click.echo(f"Processing {original_path}...")
+        source_path = original_path
+        resized_path = None
         try:
-            # Run crunch
-            result = subprocess.run(
-                ["crunch", str(original_path)],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            click.echo(result.stdout)
-            if result.stderr:
-                click.echo(result.stderr, err=True)
+            original_size = original_path.stat().st_size
+            parsed = read_png_chunks(original_path)
+            if parsed is None:
+                click.echo(f"Skipping invalid PNG file: {original_path}", err=True)
+                continue
+            original_dimensions = parsed[0][:2]
+            dimensions = fit_dimensions(*original_dimensions, max_width, max_height)
 
-            if not crunched_path.exists():
+            if dimensions != original_dimensions:
+                # A fresh file next to the original (so crunch's output can be
+                # renamed over it), never one of the user's files
+                fd, name = tempfile.mkstemp(
+                    prefix=f".{original_path.stem}-", suffix=".png", dir=original_path.parent
+                )
+                os.close(fd)
+                resized_path = Path(name)
+                resize_image(original_path, resized_path, dimensions)
+                source_path = resized_path
                 click.echo(
-                    f"Error: '{crunched_path}' not found after running crunch.",
-                    err=True,
+                    f"Resized {original_path} from "
+                    f"{original_dimensions[0]}x{original_dimensions[1]} to "
+                    f"{dimensions[0]}x{dimensions[1]}"
                 )
+
+            # Run crunch
+            crunched_path = run_crunch(source_path)
+            if crunched_path is None:
                 continue
 
             # Rename original to -precrunch
@@ -64,12 +386,22 @@ def crunch_images(pattern: str):
             crunched_path.rename(original_path)
             click.echo(f"Renamed {crunched_path} to {original_path}")
 
+            results.append(
+                CrunchResult(
+                    path=original_path,
+                    original_size=original_size,
+                    crunched_size=original_path.stat().st_size,
+                    original_dimensions=original_dimensions,
+                    dimensions=dimensions,
+                )
+            )
+
         except FileNotFoundError:
             click.echo(
                 "Error: 'crunch' command not found. Is it installed and in your PATH?",
                 err=True,
             )
-            return  # No point in continuing if crunch isn't installed
+            break  # No point in continuing if crunch isn't installed
         except subprocess.CalledProcessError as e:
             click.echo(f"Error running crunch on {original_path}:", err=True)
             click.echo(e.stderr, err=True)
@@ -79,3 +411,13 @@ def crunch_images(pattern: str):
                 f"Error during file operations for {original_path}: {e}", err=True
             )
             continue
+        except struct.error:
+            # Truncated headers
+            click.echo(f"Skipping invalid PNG file: {original_path}", err=True)
+            continue
+        finally:
+            if resized_path:
+                resized_path.unlink(missing_ok=True)
+
+    print_crunch_report(results)
+    return results
@@ -0,0 +1,231 @@
+# Streams JSONL or Parquet files into a Weaviate collection through the REST batch
+# endpoint, with concurrent requests, adaptive batch sizes and retries.
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from woodhouse.weaviate_http import WeaviateRequestError, backoff_seconds, request
+
+# Namespace for deterministic object IDs, so re-running an import upserts
+# rather than duplicating objects
+ID_NAMESPACE = uuid.UUID("6b0f9d1e-3b8a-4c52-9a43-3d7c1e2f5a60")
+PARQUET_ROWS_PER_READ = 10_000
+
+
+def iter_records(path):
+    """Yields records (dicts) from a .jsonl/.ndjson or .parquet file, without loading it all."""
+    path = Path(path)
+    if path.suffix in (".jsonl", ".ndjson"):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Reading Parquet needs pyarrow: pip install 'woodhouse[parquet]'")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_ROWS_PER_READ):
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unsupported input {path.name}; use .jsonl, .ndjson or .parquet")
+
+
+def count_records(path) -> int:
+    """Records in a .jsonl/.ndjson or .parquet file; Parquet files store the count."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Reading Parquet needs pyarrow: pip install 'woodhouse[parquet]'")
+        return pq.ParquetFile(path).metadata.num_rows
+    return sum(1 for _ in iter_records(path))
+
+
+def to_object(record, collection, id_field=None, vector_field=None, named_vectors=None, tenant=None, vector=None):
+    """Turns an input record into a batch object; id and vector fields are taken out of the properties."""
+    properties = dict(record)
+    obj = {"class": collection}
+    if id_field:
+        obj["id"] = str(properties.pop(id_field))
+    if vector_field:
+        vector = properties.pop(vector_field)
+    if vector is not None:
+        obj["vector"] = [float(x) for x in vector]
+    if named_vectors:
+        obj["vectors"] = {name: [float(x) for x in properties.pop(column)] for name, column in named_vectors.items()}
+    obj["properties"] = properties
+    if "id" not in obj:
+        obj["id"] = str(uuid.uuid5(ID_NAMESPACE, json.dumps(properties, sort_keys=True, default=str)))
+    if tenant:
+        obj["tenant"] = tenant
+    return obj
+
+
+class BatchSizer:
+    """
+    Adapts the batch size to keep each request near target_seconds: grows while
+    requests are fast, halves when they are slow or the server pushes back.
+    """
+
+    def __init__(self, initial=100, minimum=10, maximum=1000, target_seconds=1.0):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+
+    def update(self, seconds):
+        if seconds < self.target_seconds / 2:
+            self.size = min(self.maximum, int(self.size * 1.5) + 1)
+        elif seconds > self.target_seconds:
+            self.shrink()
+
+    def shrink(self, status=None):
+        self.size = max(self.minimum, self.size // 2)
+
+
+class RateLimiter:
+    """A token bucket allowing rate objects per second on average."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, count):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= min(count, self.rate):
+                    self.tokens -= count
+                    return
+                await asyncio.sleep((min(count, self.rate) - self.tokens) / self.rate)
+
+
+@dataclass
+class IngestStats:
+    read: int = 0
+    imported: int = 0
+    retried: int = 0
+    batches: int = 0
+    # (object, error message) for objects that failed every attempt
+    failed: list = field(default_factory=list)
+    start: float = field(default_factory=time.perf_counter)
+    seconds: float = 0.0
+
+    @property
+    def objects_per_second(self) -> float:
+        seconds = self.seconds or time.perf_counter() - self.start
+        return self.imported / seconds if seconds else 0.0
+
+
+def object_errors(results) -> dict[str, str]:
+    """Maps object id to error message for the objects a batch response reports as failed."""
+    errors = {}
+    for result in results:
+        error_list = (result.get("result") or {}).get("errors", {}).get("error", [])
+        if error_list:
+            errors[result.get("id")] = "; ".join(e.get("message", "") for e in error_list)
+    return errors
+
+
+async def send_batch(client, batch, stats, sizer, retries):
+    """Sends a batch, retrying objects that fail individually up to retries times."""
+    pending = batch
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            response = await request(
+                client, "POST", "/v1/batch/objects", json={"objects": pending}, retries=retries, on_retry=sizer.shrink
+            )
+        except WeaviateRequestError as e:
+            stats.failed.extend((obj, str(e)) for obj in pending)
+            return
+        sizer.update(time.perf_counter() - start)
+        stats.batches += 1
+
+        errors = object_errors(response.json())
+        stats.imported += len(pending) - len(errors)
+        if not errors:
+            return
+        failed = [obj for obj in pending if obj["id"] in errors]
+        if attempt == retries:
+            stats.failed.extend((obj, errors[obj["id"]]) for obj in failed)
+            return
+        stats.retried += len(failed)
+        pending = failed
+        await asyncio.sleep(backoff_seconds(attempt))
+
+
+async def ingest_objects(objects, client, concurrency=4, sizer=None, rate=None, retries=3, on_progress=None):
+    """
+    Imports an iterable of batch objects with up to concurrency requests in flight.
+    Batches are formed as objects are read, so memory stays bounded by
+    concurrency x batch size. on_progress(stats) is called after each batch.
+    """
+    sizer = sizer or BatchSizer()
+    limiter = RateLimiter(rate) if rate else None
+    stats = IngestStats()
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def produce():
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            stats.read += 1
+            if len(batch) >= sizer.size:
+                await queue.put(batch)
+                batch = []
+        if batch:
+            await queue.put(batch)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work():
+        while (batch := await queue.get()) is not None:
+            if limiter:
+                await limiter.acquire(len(batch))
+            await send_batch(client, batch, stats, sizer, retries)
+            if on_progress:
+                on_progress(stats)
+
+    workers = [asyncio.create_task(work()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(produce(), *workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
+    stats.seconds = time.perf_counter() - stats.start
+    return stats
+
+
+def read_objects(path, collection, id_field=None, vector_field=None, named_vectors=None, vectors_path=None, tenant=None):
+    """
+    Batch objects for the records in path, paired with rows of vectors_path if
+    given. The .npy file is memory-mapped rather than loaded, and must have one
+    row per record.
+    """
+    vectors = None
+    if vectors_path:
+        vectors = np.load(vectors_path, mmap_mode="r")
+        records = count_records(path)
+        if len(vectors) != records:
+            raise ValueError(
+                f"{Path(vectors_path).name} has {len(vectors):,} vectors for {records:,} records in {Path(path).name}"
+            )
+
+    def objects():
+        for i, record in enumerate(iter_records(path)):
+            vector = vectors[i].tolist() if vectors is not None else None
+            yield to_object(record, collection, id_field, vector_field, named_vectors, tenant, vector)
+
+    return objects()
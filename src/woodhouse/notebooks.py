@@ -2,30 +2,423 @@
 # '# BEGIN_SOLUTION' & '# END_SOLUTION' and
 # replace it with '# ADD YOUR CODE HERE'
 # to produce student-friendly versions of Jupyter notebooks
+import base64
+import copy
+import hashlib
+import json
 import nbformat
 import re
+import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+SOLUTION_PATTERN = re.compile(r"# BEGIN_SOLUTION.*?# END_SOLUTION", flags=re.DOTALL)
+SOLUTION_PLACEHOLDER = "# ADD YOUR CODE HERE"
+SOLUTION_MARKER_PATTERN = re.compile(r"^[ \t]*# (BEGIN|END)_SOLUTION[ \t]*\n?", flags=re.MULTILINE)
+
+# Cell transforms by CLI name, applied in registration order
+TRANSFORMS = {}
+
+
+def register_transform(name):
+    """Registers a function that modifies a single notebook cell in place."""
+
+    def decorator(func):
+        TRANSFORMS[name] = func
+        return func
+
+    return decorator
+
+
+@register_transform("strip-solutions")
+def strip_solutions(cell):
+    """Replaces solution blocks in code cells with a placeholder."""
+    if cell.cell_type == "code":
+        cell.source = SOLUTION_PATTERN.sub(SOLUTION_PLACEHOLDER, cell.source)
+
+
+@register_transform("strip-solution-markers")
+def strip_solution_markers(cell):
+    """Removes the BEGIN/END_SOLUTION marker lines, keeping the solution code."""
+    if cell.cell_type == "code":
+        cell.source = SOLUTION_MARKER_PATTERN.sub("", cell.source)
+
+
+@register_transform("clear-outputs")
+def clear_outputs(cell):
+    """Removes all outputs from code cells."""
+    if cell.cell_type == "code":
+        cell.outputs = []
+
+
+@register_transform("reset-execution-count")
+def reset_execution_count(cell):
+    """Resets the execution count of code cells."""
+    if cell.cell_type == "code":
+        cell.execution_count = None
+
+
+@register_transform("clear-metadata")
+def clear_metadata(cell):
+    """Drops cell metadata such as execution timings and collapsed state, keeping tags."""
+    tags = cell.metadata.get("tags")
+    cell.metadata = nbformat.NotebookNode({"tags": tags} if tags else {})
+
+
+def apply_transforms(nb, names, timings=None):
+    """
+    Applies the named transforms to every cell in a single pass.
+    If a timings dict is given, the seconds spent in each transform are added to it.
+    """
+    transforms = [(name, TRANSFORMS[name]) for name in names]
+    if timings is not None:
+        for name, _ in transforms:
+            timings.setdefault(name, 0.0)
+    for cell in nb.cells:
+        for name, transform in transforms:
+            if timings is None:
+                transform(cell)
+                continue
+            start = time.perf_counter()
+            transform(cell)
+            timings[name] += time.perf_counter() - start
+    return nb
+
+
+def notebook_to_text(nb):
+    """Serializes a notebook exactly as nbformat.write would save it."""
+    content = nbformat.writes(nb)
+    if not content.endswith("\n"):
+        content += "\n"
+    return content
+
+
+def write_notebook_if_changed(nb, output_path):
+    """
+    Serializes the notebook in memory and writes it only if the result differs
+    from what is already at output_path, so unchanged files keep their mtime.
+    Returns True if the file was written.
+    """
+    data = notebook_to_text(nb).encode("utf-8")
+
+    output_path = Path(output_path)
+    try:
+        # Comparing sizes first avoids reading files that obviously changed
+        if output_path.stat().st_size == len(data) and output_path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    output_path.write_bytes(data)
+    return True
+
+
+def transform_notebook(input_path, output_path, names):
+    """
+    Reads a notebook once, applies the named transforms and writes it once,
+    if the result differs from output_path's current contents.
+    Returns (changed, timings), where timings holds the seconds spent loading,
+    in each transform, and saving.
+    """
+    timings = {}
+    start = time.perf_counter()
+    with open(input_path, "r") as f:
+        nb = nbformat.read(f, as_version=4)
+    timings["load"] = time.perf_counter() - start
+
+    apply_transforms(nb, names, timings)
+
+    start = time.perf_counter()
+    changed = write_notebook_if_changed(nb, output_path)
+    timings["save"] = time.perf_counter() - start
+    return changed, timings
+
+
+# Transforms that turn a complete notebook into the student version
+STUDENT_TRANSFORMS = ["strip-solutions", "clear-outputs", "reset-execution-count"]
+
+
 def strip_solutions_from_notebook(input_path, output_path):
     """
     Removes solution blocks from a Jupyter notebook and writes the result to output_path.
     Solution blocks are marked by '# BEGIN_SOLUTION' and '# END_SOLUTION'.
+    Returns False if output_path already had the same content and was left untouched.
+    """
+    changed, _ = transform_notebook(input_path, output_path, STUDENT_TRANSFORMS)
+    return changed
+
+
+# Other notebooks that can be produced from a complete notebook
+INSTRUCTOR_TRANSFORMS = ["clear-outputs", "reset-execution-count"]
+ANSWER_KEY_TRANSFORMS = ["strip-solution-markers", "clear-outputs", "reset-execution-count"]
+
+# Default output names for write_notebook_artifacts; {name} is the notebook
+# name without the '-complete' suffix
+ARTIFACT_NAMES = {
+    "student": "{name}.ipynb",
+    "answers": "{name}-answers.ipynb",
+    "instructor": "{name}-instructor.ipynb",
+}
+
+
+def make_answer_key(nb):
+    """Returns a copy of the notebook with only the code cells that contain solutions."""
+    answers = copy.deepcopy(nb)
+    answers.cells = [
+        cell
+        for cell in answers.cells
+        if cell.cell_type == "code" and SOLUTION_PATTERN.search(cell.source)
+    ]
+    return apply_transforms(answers, ANSWER_KEY_TRANSFORMS)
+
+
+def make_artifact(nb, name):
+    """Builds the 'student', 'answers' or 'instructor' notebook from a complete notebook."""
+    if name == "answers":
+        return make_answer_key(nb)
+    transforms = {"student": STUDENT_TRANSFORMS, "instructor": INSTRUCTOR_TRANSFORMS}[name]
+    return apply_transforms(copy.deepcopy(nb), transforms)
+
+
+def write_notebook_artifacts(input_path, output_paths):
+    """
+    Loads a complete notebook once and writes the derived notebooks.
+    output_paths maps artifact names ('student', 'answers', 'instructor') to paths;
+    each file is only written if its content changed.
+    Returns a dict of artifact name -> whether it was written.
     """
     with open(input_path, "r") as f:
         nb = nbformat.read(f, as_version=4)
+    return {
+        name: write_notebook_if_changed(make_artifact(nb, name), path)
+        for name, path in output_paths.items()
+    }
+
+
+def strip_solutions_from_text(text):
+    """Same as strip_solutions_from_notebook, for a notebook held in a string."""
+    nb = nbformat.reads(text, as_version=4)
+    apply_transforms(nb, STUDENT_TRANSFORMS)
+    return notebook_to_text(nb)
+
 
+def iter_embedded_pngs(nb):
+    """
+    Yields every mime bundle in the notebook that holds a base64 'image/png',
+    from code cell outputs and from cell attachments (e.g. pasted images).
+    """
     for cell in nb.cells:
-        if cell.cell_type == "code":
-            cell.source = re.sub(
-                r"# BEGIN_SOLUTION.*?# END_SOLUTION",
-                "# ADD YOUR CODE HERE",
-                cell.source,
-                flags=re.DOTALL,
-            )
-            cell.outputs = []
-            cell.execution_count = None
-
-    with open(output_path, "w") as f:
-        nbformat.write(nb, f)
+        for output in cell.get("outputs", []):
+            data = output.get("data", {})
+            if "image/png" in data:
+                yield data
+        for bundle in cell.get("attachments", {}).values():
+            if "image/png" in bundle:
+                yield bundle
+
+
+def crunch_notebook_images(input_path, output_path=None, optimize=None):
+    """
+    Optimizes the PNG images embedded in a notebook's outputs and attachments.
+    Each image is replaced only if the optimized version is smaller.
+    Writes to output_path (default: in place) and returns a dict of stats.
+    """
+    if optimize is None:
+        from woodhouse.images import crunch_png_bytes as optimize
+    output_path = output_path or input_path
+
+    start = time.perf_counter()
+    with open(input_path, "r") as f:
+        nb = nbformat.read(f, as_version=4)
+    load_seconds = time.perf_counter() - start
+
+    images = 0
+    replaced = 0
+    original_bytes = 0
+    crunched_bytes = 0
+    for bundle in iter_embedded_pngs(nb):
+        encoded = bundle["image/png"]
+        data = base64.b64decode(encoded)
+        optimized = optimize(data)
+        images += 1
+        original_bytes += len(data)
+        if len(optimized) < len(data):
+            suffix = "\n" if encoded.endswith("\n") else ""
+            bundle["image/png"] = base64.b64encode(optimized).decode("ascii") + suffix
+            crunched_bytes += len(optimized)
+            replaced += 1
+        else:
+            crunched_bytes += len(data)
+
+    start = time.perf_counter()
+    updated = False
+    if replaced or output_path != input_path:
+        updated = write_notebook_if_changed(nb, output_path)
+    save_seconds = time.perf_counter() - start
+
+    return {
+        "path": str(input_path),
+        "images": images,
+        "replaced": replaced,
+        "updated": updated,
+        "original_bytes": original_bytes,
+        "crunched_bytes": crunched_bytes,
+        "load_seconds": load_seconds,
+        "save_seconds": save_seconds,
+    }
+
+
+def crunch_notebooks(paths, workers=4, optimize=None):
+    """
+    Runs crunch_notebook_images over many notebooks in a thread pool. A notebook
+    that can't be processed (including a missing one) yields {"path", "error"}
+    and the rest carry on; a missing crunch command still stops the run.
+    """
+    from woodhouse.images import CrunchNotFoundError
+
+    def crunch(path):
+        try:
+            return crunch_notebook_images(path, optimize=optimize)
+        except CrunchNotFoundError:
+            raise
+        except Exception as e:
+            return {"path": str(path), "error": f"{type(e).__name__}: {e}"}
+
+    # crunch runs as a subprocess, so threads are enough to keep the CPUs busy
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(crunch, paths)
+
+
+# Preferred representation to keep when externalizing an output, with file extension
+EXTERNAL_OUTPUT_TYPES = [
+    ("image/png", ".png"),
+    ("image/jpeg", ".jpg"),
+    ("image/svg+xml", ".svg"),
+    ("text/html", ".html"),
+    ("application/json", ".json"),
+    ("text/plain", ".txt"),
+]
+
+
+def output_size(output):
+    """Size of an output as it is serialized in the notebook file."""
+    return len(json.dumps(output, separators=(",", ":")))
+
+
+def externalize_output(output, outputs_dir, link_base):
+    """
+    Writes the main content of an output to a content-addressed file in
+    outputs_dir and returns a small display_data output that links to it.
+    """
+    data = output.get("data", {})
+    for mime, extension in EXTERNAL_OUTPUT_TYPES:
+        if mime in data:
+            content = data[mime]
+            if mime.startswith("image/") and mime != "image/svg+xml":
+                content = base64.b64decode(content)
+            elif mime == "application/json":
+                content = json.dumps(content)
+            break
+    else:
+        mime, extension = "application/json", ".json"
+        if output.get("output_type") == "stream":
+            mime, extension, content = "text/plain", ".txt", output.get("text", "")
+        else:
+            content = json.dumps(output)
+
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    filename = hashlib.sha256(content).hexdigest()[:16] + extension
+    outputs_dir.mkdir(parents=True, exist_ok=True)
+    file_path = outputs_dir / filename
+    if not file_path.exists():
+        file_path.write_bytes(content)
+
+    link = f"{link_base}/{filename}"
+    label = f"{mime} output, {len(content):,} bytes"
+    markdown = f"![{label}]({link})" if mime.startswith("image/") else f"[{label}]({link})"
+    return nbformat.v4.new_output(
+        "display_data",
+        data={"text/markdown": markdown, "text/plain": f"{label}: {link}"},
+    )
+
+
+def prune_notebook_outputs(input_path, output_path=None, max_output_bytes=100_000, externalize=False):
+    """
+    Removes outputs larger than max_output_bytes from a notebook, keeping small ones.
+    With externalize, large outputs are instead written to content-addressed files
+    in a '<notebook>_outputs' folder next to the notebook and replaced by a link.
+    Returns a dict with the notebook size before and after.
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else input_path
+    before_bytes = input_path.stat().st_size
+    with open(input_path, "r") as f:
+        nb = nbformat.read(f, as_version=4)
+
+    outputs_dir_name = f"{output_path.stem}_outputs"
+    outputs_dir = output_path.parent / outputs_dir_name
+    pruned = 0
+    for cell in nb.cells:
+        if cell.cell_type != "code":
+            continue
+        kept = []
+        for output in cell.outputs:
+            if output_size(output) <= max_output_bytes:
+                kept.append(output)
+                continue
+            pruned += 1
+            if externalize:
+                kept.append(externalize_output(output, outputs_dir, outputs_dir_name))
+        cell.outputs = kept
+
+    updated = write_notebook_if_changed(nb, output_path)
+
+    return {
+        "path": str(output_path),
+        "pruned": pruned,
+        "updated": updated,
+        "before_bytes": before_bytes,
+        "after_bytes": output_path.stat().st_size,
+    }
+
+
+def watch_notebooks(directory, on_change, pattern="*-complete.ipynb", debounce=1.0, poll_interval=0.5, stop=None):
+    """
+    Watches a directory for changes to notebooks matching pattern and calls
+    on_change(path) once a file has stopped changing for `debounce` seconds,
+    so a burst of autosaves results in a single call.
+    Polls file mtimes and sizes; runs until stop() returns True (or forever).
+    """
+    directory = Path(directory)
+
+    def snapshot():
+        signatures = {}
+        for path in directory.glob(pattern):
+            # Skip editor/Jupyter temp files such as '.~name-complete.ipynb'
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    seen = snapshot()
+    pending = {}
+    while not (stop and stop()):
+        time.sleep(poll_interval)
+        current = snapshot()
+        now = time.monotonic()
+        for path, signature in current.items():
+            if seen.get(path) != signature:
+                pending[path] = now
+        seen = current
+
+        for path, changed_at in list(pending.items()):
+            if now - changed_at >= debounce:
+                del pending[path]
+                if path in current:
+                    on_change(path)
@@ -0,0 +1,218 @@
+# Replays a query workload against Weaviate over GraphQL and measures latency and
+# throughput per query type, so index settings and cluster sizes can be compared.
+import asyncio
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+
+from woodhouse.telemetry import percentile
+from woodhouse.weaviate_http import WeaviateRequestError, request
+
+QUERY_TYPES = {}
+
+# The queries from the search methods demo example, for its Article collection
+DEFAULT_WORKLOAD = [
+    {"type": "near_text", "query": "machine learning and artificial intelligence", "limit": 3},
+    {"type": "bm25", "query": "renewable energy solar wind", "properties": ["title", "content"], "limit": 3},
+    {"type": "hybrid", "query": "healthcare AI technology", "alpha": 0.5, "limit": 3},
+    {
+        "type": "near_text",
+        "query": "technology innovation",
+        "where": {
+            "operator": "And",
+            "operands": [
+                {"path": ["category"], "operator": "Equal", "valueText": "Technology"},
+                {"path": ["word_count"], "operator": "GreaterThan", "valueInt": 1000},
+                {"path": ["is_published"], "operator": "Equal", "valueBoolean": True},
+            ],
+        },
+        "limit": 5,
+    },
+    {
+        "type": "fetch",
+        "where": {
+            "operator": "Or",
+            "operands": [
+                {"path": ["category"], "operator": "ContainsAny", "valueText": ["Technology", "Science"]},
+                {
+                    "operator": "And",
+                    "operands": [
+                        {"path": ["word_count"], "operator": "GreaterThan", "valueInt": 2000},
+                        {"path": ["author"], "operator": "Like", "valueText": "Dr.*"},
+                    ],
+                },
+            ],
+        },
+        "limit": 10,
+    },
+]
+
+
+def register_query(name):
+    """Registers fn(spec) -> GraphQL search arguments for a query type."""
+
+    def decorator(fn):
+        QUERY_TYPES[name] = fn
+        return fn
+
+    return decorator
+
+
+def graphql_value(value, key=None) -> str:
+    """Formats a value as a GraphQL input literal; operators are enums, so unquoted."""
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{k}: {graphql_value(v, k)}" for k, v in value.items()) + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(graphql_value(v) for v in value) + "]"
+    if key == "operator":
+        return value
+    return json.dumps(value)
+
+
+@register_query("near_text")
+def near_text_arguments(spec):
+    return {"nearText": {"concepts": [spec["query"]]}}
+
+
+@register_query("bm25")
+def bm25_arguments(spec):
+    bm25 = {"query": spec["query"]}
+    if spec.get("properties"):
+        bm25["properties"] = spec["properties"]
+    return {"bm25": bm25}
+
+
+@register_query("hybrid")
+def hybrid_arguments(spec):
+    return {"hybrid": {"query": spec["query"], "alpha": spec.get("alpha", 0.5)}}
+
+
+@register_query("fetch")
+def fetch_arguments(spec):
+    return {}
+
+
+def build_query(collection: str, spec: dict) -> str:
+    """The GraphQL Get query for a workload entry."""
+    if spec["type"] not in QUERY_TYPES:
+        raise ValueError(f"Unknown query type {spec['type']!r}; use one of {', '.join(QUERY_TYPES)}")
+    arguments = QUERY_TYPES[spec["type"]](spec)
+    if spec.get("where"):
+        arguments["where"] = spec["where"]
+    arguments["limit"] = spec.get("limit", 10)
+    if spec.get("tenant"):
+        arguments["tenant"] = spec["tenant"]
+    formatted = ", ".join(f"{name}: {graphql_value(value)}" for name, value in arguments.items())
+    fields = " ".join(spec.get("return_properties", [])) + " _additional { id distance score }"
+    return f"{{ Get {{ {collection}({formatted}) {{ {fields.strip()} }} }} }}"
+
+
+def load_workload(path) -> list[dict]:
+    """Reads a JSON or YAML list of query specs."""
+    workload = yaml.safe_load(Path(path).read_text())
+    if not isinstance(workload, list) or not all(isinstance(spec, dict) and "type" in spec for spec in workload):
+        raise ValueError(f"{path} should be a list of queries, each with a 'type'")
+    return workload
+
+
+@dataclass
+class QueryStats:
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+    first_error: str | None = None
+
+    def record_error(self, message):
+        self.errors += 1
+        self.first_error = self.first_error or message
+
+
+def summarize_latencies(stats: QueryStats, seconds: float) -> dict:
+    latencies = stats.latencies
+    return {
+        "requests": len(latencies) + stats.errors,
+        "errors": stats.errors,
+        "first_error": stats.first_error,
+        "throughput_qps": len(latencies) / seconds if seconds else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else None,
+        **{
+            f"p{pct}_ms": None if not latencies else percentile(latencies, pct) * 1000
+            for pct in (50, 95, 99)
+        },
+    }
+
+
+async def run_query(client, query: str):
+    """Sends a GraphQL query; GraphQL errors come back with a 200, so check for them too."""
+    response = await request(client, "POST", "/v1/graphql", json={"query": query}, retries=0)
+    errors = response.json().get("errors")
+    if errors:
+        raise WeaviateRequestError(errors[0].get("message", str(errors[0])))
+
+
+async def run_workload(
+    client,
+    collection: str,
+    workload: list[dict],
+    concurrency: int = 8,
+    qps: float | None = None,
+    duration: float = 10.0,
+    requests: int | None = None,
+    warmup: int = 0,
+) -> dict:
+    """
+    Cycles through the workload for duration seconds (or requests queries) and
+    returns a summary per query type plus "all".
+
+    Without qps this is a closed loop: concurrency workers each send the next
+    query as soon as the last one returns. With qps, queries are scheduled at that
+    rate (at most concurrency in flight) and latency is measured from each query's
+    scheduled time, so a server that falls behind shows up as queueing delay.
+    """
+    queries = [(spec["type"], build_query(collection, spec)) for spec in workload]
+    # Warm up with warmup queries, cycling through the workload
+    for _, query in itertools.islice(itertools.cycle(queries), warmup):
+        await run_query(client, query)
+
+    stats = {}
+    schedule = itertools.count()
+    start = time.perf_counter()
+    deadline = None if requests else start + duration
+
+    def next_query():
+        i = next(schedule)
+        if requests is not None and i >= requests:
+            return None
+        scheduled = start + i / qps if qps else None
+        if deadline and (scheduled or time.perf_counter()) >= deadline:
+            return None
+        return queries[i % len(queries)], scheduled
+
+    async def work():
+        while (item := next_query()) is not None:
+            (query_type, query), scheduled = item
+            if scheduled:
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            sent = scheduled or time.perf_counter()
+            query_stats = stats.setdefault(query_type, QueryStats())
+            try:
+                await run_query(client, query)
+            except WeaviateRequestError as e:
+                query_stats.record_error(str(e))
+            else:
+                query_stats.latencies.append(time.perf_counter() - sent)
+
+    await asyncio.gather(*(work() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    overall = QueryStats(
+        [latency for s in stats.values() for latency in s.latencies],
+        sum(s.errors for s in stats.values()),
+        next((s.first_error for s in stats.values() if s.first_error), None),
+    )
+    results = {query_type: summarize_latencies(s, seconds) for query_type, s in stats.items()}
+    results["all"] = summarize_latencies(overall, seconds)
+    return {"seconds": seconds, "results": results}
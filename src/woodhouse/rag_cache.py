@@ -0,0 +1,189 @@
+# Caches Weaviate generative (RAG) query results, so repeated or near-duplicate
+# questions skip both retrieval and generation:
+#
+#   cache = GenerativeCache(client.collections.use("Article"), ttl=600)
+#   response = cache.near_text(query="...", single_prompt="...", limit=2)
+#   print(cache.stats.hit_rate)
+import datetime
+import json
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """Case, surrounding punctuation and runs of whitespace don't change the question."""
+    return re.sub(r"\s+", " ", query).strip().strip("?!. ").casefold()
+
+
+def canonical(value):
+    """
+    A JSON-serializable form of a query parameter that is the same in every
+    process. Objects such as Filter, MetadataQuery and GenerativeConfig values
+    are compared by type and attributes, never by repr, which can hold addresses.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Enum):
+        return {"__type__": type_name(value), "value": canonical(value.value)}
+    if isinstance(value, dict):
+        return {str(k): canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonical(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((canonical(v) for v in value), key=json.dumps)
+    if isinstance(value, (datetime.date, datetime.time, uuid.UUID)):
+        return {"__type__": type_name(value), "value": str(value)}
+    if hasattr(value, "__dict__") and not callable(value):
+        # Pydantic models keep their fields in __dict__ too
+        attributes = {k: v for k, v in vars(value).items() if not k.startswith("__")}
+        return {"__type__": type_name(value), **canonical(attributes)}
+    raise TypeError(f"Can't build a cache key from {type_name(value)} parameters")
+
+
+def type_name(value) -> str:
+    return f"{type(value).__module__}.{type(value).__qualname__}"
+
+
+def params_key(params: dict) -> str:
+    """Search and generation parameters as a stable string."""
+    return json.dumps(canonical(params), sort_keys=True)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    similar_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.similar_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.hits + self.similar_hits) / self.requests if self.requests else 0.0
+
+
+@dataclass
+class CacheEntry:
+    response: object
+    expires: float
+    # (collection, version, method, parameters): only entries that share this can match by similarity
+    scope: tuple
+    vector: np.ndarray | None = None
+
+
+class GenerativeCache:
+    """
+    Wraps a collection's generate queries with an LRU cache whose entries expire
+    after ttl seconds.
+
+    Results are keyed on the method, the normalized query text, the other
+    parameters and the collection version. version is a value or a callable
+    returning one (e.g. an import timestamp), so that changing the data misses the
+    old entries; bump_version() does the same by hand. With embed (text -> vector)
+    and similarity (a cosine threshold such as 0.95), a query that misses exactly
+    can still match a cached query with the same parameters whose vector is close.
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_entries: int = 256,
+        ttl: float | None = 3600,
+        embed=None,
+        similarity: float | None = None,
+        version=None,
+        clock=time.monotonic,
+    ):
+        if similarity is not None and embed is None:
+            raise ValueError("Similarity matching needs an embed function")
+        self.collection = collection
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed = embed
+        self.similarity = similarity
+        self.version = version
+        self.clock = clock
+        self.manual_version = 0
+        self.entries = OrderedDict()
+        self.stats = CacheStats()
+        self.lock = threading.Lock()
+
+    def near_text(self, query: str, **params):
+        return self.generate("near_text", query, **params)
+
+    def hybrid(self, query: str, **params):
+        return self.generate("hybrid", query, **params)
+
+    def bm25(self, query: str, **params):
+        return self.generate("bm25", query, **params)
+
+    def bump_version(self):
+        """Misses every existing entry, e.g. after importing new data."""
+        with self.lock:
+            self.manual_version += 1
+
+    def current_version(self):
+        version = self.version() if callable(self.version) else self.version
+        return (version, self.manual_version)
+
+    def generate(self, method: str, query: str, **params):
+        """Returns the cached response for collection.generate.<method>(query, **params), or runs it."""
+        scope = (self.collection.name, self.current_version(), method, params_key(params))
+        key = scope + (normalize_query(query),)
+        now = self.clock()
+        vector = None
+        with self.lock:
+            self.expire(now)
+            entry = self.entries.get(key)
+            if entry:
+                self.entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry.response
+        if self.similarity is not None:
+            vector = np.asarray(self.embed(query), dtype=float)
+            vector = vector / (np.linalg.norm(vector) or 1.0)
+            with self.lock:
+                similar = self.most_similar(scope, vector)
+                if similar is not None:
+                    self.entries.move_to_end(similar)
+                    self.stats.similar_hits += 1
+                    return self.entries[similar].response
+
+        response = getattr(self.collection.generate, method)(query=query, **params)
+        with self.lock:
+            self.stats.misses += 1
+            expires = now + self.ttl if self.ttl is not None else float("inf")
+            self.entries[key] = CacheEntry(response, expires, scope, vector)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats.evictions += 1
+        return response
+
+    def expire(self, now: float):
+        for key in [key for key, entry in self.entries.items() if entry.expires <= now]:
+            del self.entries[key]
+
+    def most_similar(self, scope, vector):
+        """The key of the closest entry in scope at or above the similarity threshold, if any."""
+        candidates = [(key, entry.vector) for key, entry in self.entries.items() if entry.scope == scope]
+        candidates = [(key, v) for key, v in candidates if v is not None]
+        if not candidates:
+            return None
+        similarities = np.stack([v for _, v in candidates]) @ vector
+        best = int(np.argmax(similarities))
+        return candidates[best][0] if similarities[best] >= self.similarity else None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
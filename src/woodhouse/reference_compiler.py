@@ -0,0 +1,183 @@
+# Compiles references/weaviate.py into a token-lean form for the system prompt:
+# banners and docstrings removed, doc links shortened, repeated comments dropped,
+# and statements without comments re-emitted compactly on as few lines as possible.
+#
+# Standard library only, so the wheel build hook (hatch_build.py) can load it by path.
+import ast
+import io
+import re
+import sys
+import tokenize
+
+BANNER_PATTERN = re.compile(r"^#\s*=+\s*$")
+SECTION_PATTERN = re.compile(r"^#\s*(\d+)\.\s+(.+)$")
+URL_PATTERN = re.compile(r"https?://\S+")
+# Statements longer than this (once compacted) keep their original layout
+MAX_COMPACT_WIDTH = 160
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: words, numbers and punctuation marks, plus runs of indentation."""
+    return len(re.findall(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]|\n[ \t]+", text))
+
+
+def comment_lines(source: str) -> dict[int, tuple[str, bool]]:
+    """Maps line number to (comment, whether the comment is the whole line)."""
+    comments = {}
+    for token in tokenize.generate_tokens(io.StringIO(source).readline):
+        if token.type == tokenize.COMMENT:
+            row, col = token.start
+            whole_line = not token.line[:col].strip()
+            comments[row] = (token.string, whole_line)
+    return comments
+
+
+def compile_comment(comment: str, seen: set[str]) -> str | None:
+    """The compiled form of a whole-line comment, or None to drop it."""
+    if BANNER_PATTERN.match(comment):
+        return None
+    section = SECTION_PATTERN.match(comment)
+    if section:
+        return f"# {section.group(1)}. {section.group(2).title()}"
+    urls = URL_PATTERN.findall(comment)
+    if urls:
+        # 'For more information, see the X page: <url>' -> the link alone
+        comment = "# Docs: " + " ".join(url.rstrip(".,)") for url in urls)
+    if comment in seen:
+        return None
+    seen.add(comment)
+    return comment
+
+
+def compile_statement(lines: list[str], node, comments: dict, seen: set[str]) -> list[str]:
+    """Compiled lines for one top-level statement."""
+    rows = range(node.lineno, node.end_lineno + 1)
+    # Compile the comments inside the statement first: if none are kept, it can be compacted
+    kept = {}
+    for row in rows:
+        if row in comments:
+            comment, whole_line = comments[row]
+            if whole_line:
+                kept[row] = compile_comment(comment.strip(), seen)
+            elif comment not in seen:
+                seen.add(comment)
+                kept[row] = comment
+            else:
+                kept[row] = None
+
+    if not any(kept.values()):
+        compact = ast.unparse(node)
+        if max(len(line) for line in compact.splitlines()) <= MAX_COMPACT_WIDTH:
+            return compact.splitlines()
+
+    # Keep the original layout, minus blank lines and dropped comments
+    compiled = []
+    for row in rows:
+        line = lines[row - 1]
+        if row in comments:
+            comment, whole_line = comments[row]
+            indent = line[: len(line) - len(line.lstrip())]
+            if whole_line:
+                line = indent + kept[row] if kept[row] else ""
+            elif not kept[row]:
+                line = line[: line.rindex(comment)]
+        if line.strip():
+            compiled.append(line.rstrip())
+    return compiled
+
+
+def is_redundant(node, state: dict) -> bool:
+    """
+    True for an import already made, or an assignment that repeats the current
+    value of its variable (e.g. 'collection = client.collections.use("Article")'
+    in every section). state tracks imports and the last assignment per variable.
+    """
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        key = ast.unparse(node)
+        redundant = key in state
+        state[key] = True
+        return redundant
+    if isinstance(node, ast.Assign) and all(isinstance(t, ast.Name) for t in node.targets):
+        value = ast.unparse(node.value)
+        names = [t.id for t in node.targets]
+        redundant = all(state.get(("var", name)) == value for name in names)
+        for name in names:
+            state[("var", name)] = value
+        return redundant
+    # Anything else may rebind variables (loops, with blocks), so forget them
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+            state.pop(("var", child.id), None)
+    return False
+
+
+def compile_reference(source: str) -> str:
+    """Returns a token-lean version of the reference source, which still parses."""
+    tree = ast.parse(source)
+    comments = comment_lines(source)
+    lines = source.splitlines()
+    seen = set()
+    state = {}
+    output = []
+    previous_was_code = False
+
+    def emit_comment(row):
+        nonlocal previous_was_code
+        kept = compile_comment(comments[row][0].strip(), seen)
+        if kept:
+            # One blank line between a block of code and the next comment heading
+            if previous_was_code:
+                output.append("")
+            output.append(kept)
+            previous_was_code = False
+
+    def is_section(block):
+        return any(SECTION_PATTERN.match(comments[r][0].strip()) for r in block)
+
+    # Comment blocks waiting for a statement to head. A block whose statements are
+    # all removed is dropped, and a section heading whose whole section is.
+    pending = []
+    removed = False
+    row = 1
+    for node in tree.body:
+        # Comments before this statement
+        block = [r for r in range(row, node.lineno) if r in comments and comments[r][1]]
+        if block:
+            if removed:
+                pending = [] if is_section(block) else [b for b in pending if is_section(b)]
+            pending.append(block)
+            removed = False
+        row = node.end_lineno + 1
+        is_docstring = isinstance(node, ast.Expr) and isinstance(getattr(node, "value", None), ast.Constant)
+        if is_docstring and isinstance(node.value.value, str):
+            continue
+        if is_redundant(node, state):
+            removed = True
+            continue
+        for kept_block in pending:
+            for comment_row in kept_block:
+                emit_comment(comment_row)
+        pending = []
+        output.extend(compile_statement(lines, node, comments, seen))
+        previous_was_code = True
+
+    for comment_row in range(row, len(lines) + 1):
+        if comment_row in comments and comments[comment_row][1]:
+            emit_comment(comment_row)
+    return "\n".join(output) + "\n"
+
+
+def main(argv=None):
+    """python -m woodhouse.reference_compiler SOURCE OUTPUT"""
+    argv = sys.argv[1:] if argv is None else argv
+    source_path, output_path = argv
+    with open(source_path) as f:
+        source = f.read()
+    compiled = compile_reference(source)
+    with open(output_path, "w") as f:
+        f.write(compiled)
+    print(f"{estimate_tokens(source)} -> {estimate_tokens(compiled)} tokens (estimated)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# Estimates the memory and disk a Weaviate collection needs, from the rules of thumb in
+# https://docs.weaviate.io/weaviate/concepts/resources. Inputs may be NumPy arrays,
+# so a whole grid of settings is estimated in one vectorized pass.
+import numpy as np
+
+INDEX_TYPES = ("hnsw", "flat", "dynamic")
+# Preferred index types, best first, for tenants below and above DYNAMIC_THRESHOLD
+SMALL_TENANT_INDEX_ORDER = ("dynamic", "flat", "hnsw")
+LARGE_TENANT_INDEX_ORDER = ("hnsw", "dynamic", "flat")
+# In order of expected recall, best first
+QUANTIZATIONS = ("none", "rq", "sq", "pq", "bq")
+# The flat index can only be combined with BQ
+FLAT_QUANTIZATIONS = ("none", "bq")
+MAX_CONNECTIONS = (16, 32, 64)
+DEFAULT_MAX_CONNECTIONS = 32
+# Objects per shard at which a dynamic index switches from flat to HNSW
+DYNAMIC_THRESHOLD = 10_000
+
+FLOAT_BYTES = 4
+# Memory per HNSW connection, per the resource planning docs
+CONNECTION_BYTES = 10
+# PQ segments per dimension; each segment is stored in one byte
+PQ_SEGMENTS_PER_DIMENSION = 0.25
+# Per-vector metadata stored with RQ codes (bounds, norm and code sum)
+RQ_OVERHEAD_BYTES = 16
+# Inverted indexes relative to the object data they index
+INVERTED_INDEX_SHARE = 0.5
+# Share of a node's memory Weaviate should plan to use (GOMEMLIMIT is set to 80%)
+USABLE_MEMORY_SHARE = 0.8
+
+COUNT_SUFFIXES = {"k": 10**3, "m": 10**6, "b": 10**9}
+
+
+def parse_count(value: str) -> int:
+    """'250k' / '10M' / '1.5B' / '1000000' -> int."""
+    value = value.strip().replace("_", "").replace(",", "")
+    suffix = value[-1:].lower()
+    if suffix in COUNT_SUFFIXES:
+        return int(float(value[:-1]) * COUNT_SUFFIXES[suffix])
+    return int(value)
+
+
+def compressed_bytes(dimensions, quantization):
+    """In-memory bytes per vector after quantization."""
+    d = np.asarray(dimensions, dtype=float)
+    q = np.asarray(quantization)
+    # BQ packs a bit per dimension and RQ a byte per dimension, both padded to 64 dimensions
+    padded = np.ceil(d / 64) * 64
+    return np.select(
+        [q == "rq", q == "sq", q == "pq", q == "bq"],
+        [padded + RQ_OVERHEAD_BYTES, d, np.maximum(1, np.floor(d * PQ_SEGMENTS_PER_DIMENSION)), padded / 8],
+        default=d * FLOAT_BYTES,
+    )
+
+
+def estimate(
+    objects,
+    dimensions,
+    named_vectors=1,
+    index="hnsw",
+    quantization="none",
+    max_connections=DEFAULT_MAX_CONNECTIONS,
+    tenants=1,
+    object_bytes=1024,
+    dynamic_threshold=DYNAMIC_THRESHOLD,
+) -> dict:
+    """
+    Memory and disk bytes for a collection, plus whether the index/quantization
+    combination is valid. Arguments broadcast like NumPy arrays.
+
+    HNSW keeps (compressed) vectors and the graph in memory; a flat index keeps
+    only BQ codes, if any. A dynamic index is flat while a tenant has fewer than
+    dynamic_threshold objects, with BQ on the flat part if quantization is used.
+    Full vectors are always kept on disk, for rescoring.
+    """
+    n = np.asarray(objects, dtype=float)
+    d = np.asarray(dimensions, dtype=float)
+    index = np.asarray(index)
+    q = np.asarray(quantization)
+
+    full = d * FLOAT_BYTES
+    compressed = compressed_bytes(d, q)
+    graph = np.asarray(max_connections, dtype=float) * CONNECTION_BYTES
+    use_hnsw = (index == "hnsw") | ((index == "dynamic") & (n / np.asarray(tenants) > dynamic_threshold))
+    flat_cache = np.where(q == "none", 0.0, compressed_bytes(d, "bq"))
+
+    vector_memory = np.where(use_hnsw, compressed + graph, flat_cache)
+    vector_disk = full + np.where(q == "none", 0.0, np.where(use_hnsw, compressed, flat_cache))
+    vector_disk = vector_disk + np.where(use_hnsw, graph, 0.0)
+    object_disk = np.asarray(object_bytes, dtype=float) * (1 + INVERTED_INDEX_SHARE)
+    return {
+        "memory": n * np.asarray(named_vectors) * vector_memory,
+        "disk": n * (object_disk + np.asarray(named_vectors) * vector_disk),
+        "valid": (index != "flat") | np.isin(q, FLAT_QUANTIZATIONS),
+    }
+
+
+def nodes_needed(memory, memory_budget: float, replication_factor: int = 1):
+    """Nodes with memory_budget bytes each needed to hold replication_factor copies."""
+    usable = memory_budget * USABLE_MEMORY_SHARE
+    return np.maximum(replication_factor, np.ceil(np.asarray(memory) * replication_factor / usable)).astype(int)
+
+
+def sweep(
+    objects,
+    dimensions,
+    memory_budget: float,
+    named_vectors=1,
+    nodes=1,
+    replication_factor=1,
+    tenants=1,
+    object_bytes=1024,
+) -> list[dict]:
+    """
+    Estimates every index type x quantization x maxConnections combination and
+    returns them best first: those that fit nodes x memory_budget, ranked by
+    expected recall (less compression first, then the index type suited to the
+    tenant size, then more connections), then the rest by the nodes they would need.
+    """
+    small_tenants = objects / tenants <= DYNAMIC_THRESHOLD
+    index_order = SMALL_TENANT_INDEX_ORDER if small_tenants else LARGE_TENANT_INDEX_ORDER
+    index_rank, quality, max_connections = (
+        grid.ravel() for grid in np.meshgrid(np.arange(len(INDEX_TYPES)), np.arange(len(QUANTIZATIONS)), MAX_CONNECTIONS)
+    )
+    index = np.array(index_order)[index_rank]
+    quantization = np.array(QUANTIZATIONS)[quality]
+    sizes = estimate(objects, dimensions, named_vectors, index, quantization, max_connections, tenants, object_bytes)
+    # maxConnections doesn't apply to a flat index, and a flat index is only worth
+    # suggesting for tenants small enough that searching them exhaustively is fast.
+    # Above that size a dynamic index is just HNSW.
+    flat_ok = (max_connections == DEFAULT_MAX_CONNECTIONS) & small_tenants
+    valid = sizes["valid"] & ((index != "flat") | flat_ok) & ((index != "dynamic") | small_tenants)
+    per_node_memory = sizes["memory"] * replication_factor / nodes
+    per_node_disk = sizes["disk"] * replication_factor / nodes
+    needed = nodes_needed(sizes["memory"], memory_budget, replication_factor)
+    fits = needed <= nodes
+    # np.lexsort sorts by the last key first
+    order = np.lexsort((-max_connections, index_rank, quality, np.where(fits, 0, needed), ~fits))
+    return [
+        {
+            "index": str(index[i]),
+            "quantization": str(quantization[i]),
+            "max_connections": int(max_connections[i]),
+            "memory_per_node": float(per_node_memory[i]),
+            "disk_per_node": float(per_node_disk[i]),
+            "nodes_needed": int(needed[i]),
+            "fits": bool(fits[i]),
+        }
+        for i in order
+        if valid[i]
+    ]
@@ -0,0 +1,193 @@
+# Local, append-only usage log for AI code generation, and a summary command.
+import json
+import math
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import click
+
+# USD per million tokens: (input, output, cache read, cache write)
+MODEL_PRICES = {
+    "claude-3-5-haiku": (0.80, 4.00, 0.08, 1.00),
+    "claude-3-5-sonnet": (3.00, 15.00, 0.30, 3.75),
+    "claude-3-7-sonnet": (3.00, 15.00, 0.30, 3.75),
+    "claude-sonnet-4": (3.00, 15.00, 0.30, 3.75),
+    "claude-opus-4": (15.00, 75.00, 1.50, 18.75),
+}
+
+
+def usage_log_path() -> Path:
+    """Where runs are logged; override with WOODHOUSE_USAGE_LOG."""
+    if "WOODHOUSE_USAGE_LOG" in os.environ:
+        return Path(os.environ["WOODHOUSE_USAGE_LOG"])
+    return Path.home() / ".woodhouse" / "usage.jsonl"
+
+
+def usage_counts(usage) -> dict:
+    """Token counts from a pydantic-ai usage object, across pydantic-ai versions."""
+    if callable(usage):
+        # A streamed result's usage is a method in older pydantic-ai
+        usage = usage()
+    details = getattr(usage, "details", None) or {}
+    input_tokens = getattr(usage, "input_tokens", None)
+    if input_tokens is None:
+        input_tokens = getattr(usage, "request_tokens", None) or 0
+    output_tokens = getattr(usage, "output_tokens", None)
+    if output_tokens is None:
+        output_tokens = getattr(usage, "response_tokens", None) or 0
+    cache_read = getattr(usage, "cache_read_tokens", None)
+    if cache_read is None:
+        cache_read = details.get("cache_read_input_tokens", 0)
+    cache_write = getattr(usage, "cache_write_tokens", None)
+    if cache_write is None:
+        cache_write = details.get("cache_creation_input_tokens", 0)
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cache_read_tokens": cache_read,
+        "cache_write_tokens": cache_write,
+    }
+
+
+def estimate_cost(model: str, counts: dict) -> float | None:
+    """Estimated USD cost of a run, or None for models without a known price."""
+    for prefix, prices in MODEL_PRICES.items():
+        if model.startswith(prefix):
+            input_price, output_price, read_price, write_price = prices
+            break
+    else:
+        return None
+    # pydantic-ai's input token count includes cache reads and writes
+    uncached = max(
+        0, counts["input_tokens"] - counts["cache_read_tokens"] - counts["cache_write_tokens"]
+    )
+    return (
+        uncached * input_price
+        + counts["output_tokens"] * output_price
+        + counts["cache_read_tokens"] * read_price
+        + counts["cache_write_tokens"] * write_price
+    ) / 1_000_000
+
+
+def record_run(
+    model: str,
+    usage,
+    ttft_seconds: float | None,
+    latency_seconds: float,
+    log_path=None,
+    **extra,
+) -> dict:
+    """Appends one generation run to the usage log and returns the record."""
+    counts = usage_counts(usage)
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "model": model,
+        **counts,
+        "ttft_seconds": ttft_seconds,
+        "latency_seconds": latency_seconds,
+        "cost_usd": estimate_cost(model, counts),
+        **extra,
+    }
+    log_path = Path(log_path) if log_path else usage_log_path()
+    try:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        # Telemetry must never break code generation
+        click.echo(f"Warning: could not write usage log {log_path}: {e}", err=True)
+    return record
+
+
+def read_runs(log_path=None) -> list[dict]:
+    log_path = Path(log_path) if log_path else usage_log_path()
+    if not log_path.exists():
+        return []
+    runs = []
+    with open(log_path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    runs.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # A partially written line from an interrupted run
+    return runs
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile; None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(runs: list[dict]) -> dict:
+    # A rejected run was replaced by an escalated one, so it is not a separate request
+    served = [r for r in runs if not r.get("rejected")]
+    escalated = [r for r in served if r.get("escalated")]
+    latencies = [r["latency_seconds"] for r in runs if r.get("latency_seconds") is not None]
+    ttfts = [r["ttft_seconds"] for r in runs if r.get("ttft_seconds") is not None]
+    return {
+        "runs": len(runs),
+        "escalation_rate": len(escalated) / len(served) if served else 0.0,
+        "p50_latency": percentile(latencies, 50),
+        "p95_latency": percentile(latencies, 95),
+        "p50_ttft": percentile(ttfts, 50),
+        "input_tokens": sum(r.get("input_tokens", 0) for r in runs),
+        "output_tokens": sum(r.get("output_tokens", 0) for r in runs),
+        "cache_read_tokens": sum(r.get("cache_read_tokens", 0) for r in runs),
+        "cost_usd": sum(r.get("cost_usd") or 0 for r in runs),
+    }
+
+
+def format_seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value:.2f} s"
+
+
+@click.command()
+@click.option("--by", type=click.Choice(["day", "week", "model"]), default="day", show_default=True)
+def stats(by):
+    """Shows latency, token and cost statistics for AI code generation."""
+    runs = read_runs()
+    if not runs:
+        click.echo(f"No runs logged yet in {usage_log_path()}")
+        return
+
+    groups = defaultdict(list)
+    for run in runs:
+        if by == "model":
+            key = run.get("model", "?")
+        else:
+            timestamp = datetime.fromisoformat(run["timestamp"])
+            if by == "week":
+                year, week, _ = timestamp.isocalendar()
+                key = f"{year}-W{week:02d}"
+            else:
+                key = timestamp.date().isoformat()
+        groups[key].append(run)
+
+    click.echo(
+        f"{by.capitalize():<28} {'Runs':>5} {'p50':>9} {'p95':>9} {'TTFT p50':>9} "
+        f"{'In tok':>9} {'Out tok':>8} {'Cached':>8} {'Escal.':>6} {'Cost':>9}"
+    )
+    for key in sorted(groups):
+        summary = summarize(groups[key])
+        click.echo(
+            f"{key:<28} {summary['runs']:>5} {format_seconds(summary['p50_latency']):>9} "
+            f"{format_seconds(summary['p95_latency']):>9} {format_seconds(summary['p50_ttft']):>9} "
+            f"{summary['input_tokens']:>9} {summary['output_tokens']:>8} "
+            f"{summary['cache_read_tokens']:>8} {summary['escalation_rate']:>6.0%} "
+            f"{'$' + format(summary['cost_usd'], '.4f'):>9}"
+        )
+
+    total = summarize(runs)
+    click.echo(
+        f"\nTotal: {total['runs']} runs, p50 {format_seconds(total['p50_latency'])}, "
+        f"p95 {format_seconds(total['p95_latency'])}, "
+        f"{total['escalation_rate']:.0%} escalated, ${total['cost_usd']:.4f}"
+    )
@@ -0,0 +1,286 @@
+# Renders the bundled Weaviate examples with different parameters, without an LLM.
+#
+# Examples stay runnable Python; they declare their parameters and defaults in
+# marker comments, which are removed when rendering:
+#
+#   # woodhouse:param collection = Article
+#   collection_name = "Article"  # woodhouse:value collection
+#   # woodhouse:begin connect
+#   client = weaviate.connect_to_local()
+#   # woodhouse:end
+#
+# A value marker replaces the value assigned on its line. A block is replaced by
+# the lines its renderer (see register_block) produces for the parameters, or kept
+# as written if the renderer returns None. Rendering is deterministic.
+import importlib.resources
+import json
+import re
+from dataclasses import dataclass
+
+PARAM_PATTERN = re.compile(r"^\s*# woodhouse:param (\w+) = (.*)$")
+VALUE_PATTERN = re.compile(r"^(?P<code>.*?)\s*# woodhouse:value (?P<name>\w+)\s*$")
+BEGIN_PATTERN = re.compile(r"^(?P<indent>\s*)# woodhouse:begin (?P<name>\w+)\s*$")
+END_PATTERN = re.compile(r"^\s*# woodhouse:end\s*$")
+
+# name -> (Configure expression, header name, environment variable for the API key)
+VECTORIZERS = {
+    "openai": ("Configure.Vectors.text2vec_openai()", "X-OpenAI-Api-Key", "OPENAI_API_KEY"),
+    "cohere": ("Configure.Vectors.text2vec_cohere()", "X-Cohere-Api-Key", "COHERE_API_KEY"),
+    "weaviate": ("Configure.Vectors.text2vec_weaviate()", None, None),
+    "ollama": (
+        'Configure.Vectors.text2vec_ollama(api_endpoint="http://host.docker.internal:11434", '
+        'model="nomic-embed-text")',
+        None,
+        None,
+    ),
+    "transformers": ("Configure.Vectors.text2vec_transformers()", None, None),
+}
+
+DATA_TYPES = {
+    "text": "TEXT",
+    "text[]": "TEXT_ARRAY",
+    "int": "INT",
+    "number": "NUMBER",
+    "bool": "BOOL",
+    "date": "DATE",
+    "uuid": "UUID",
+}
+
+BLOCKS = {}
+
+
+class TemplateError(Exception):
+    pass
+
+
+def register_block(name):
+    """
+    Registers fn(params, defaults, original_lines) -> lines (unindented), or None
+    to keep the original lines.
+    """
+
+    def decorator(fn):
+        BLOCKS[name] = fn
+        return fn
+
+    return decorator
+
+
+def parse_properties(value: str) -> list[tuple[str, str]]:
+    """'title:text,word_count:int' -> [('title', 'text'), ('word_count', 'int')]"""
+    properties = []
+    for item in value.split(","):
+        name, _, data_type = item.strip().partition(":")
+        data_type = data_type or "text"
+        if not name.isidentifier():
+            raise TemplateError(f"Invalid property name {name!r}")
+        if data_type not in DATA_TYPES:
+            raise TemplateError(
+                f"Unknown data type {data_type!r} for {name!r}; use one of {', '.join(DATA_TYPES)}"
+            )
+        properties.append((name, data_type))
+    return properties
+
+
+def parse_param(name: str, value: str):
+    """Parses a parameter value, from a template default or the command line."""
+    value = value.strip()
+    if name == "cloud":
+        return value.lower() in ("true", "yes", "1")
+    if name == "vectorizer":
+        if value not in VECTORIZERS:
+            raise TemplateError(f"Unknown vectorizer {value!r}; use one of {', '.join(VECTORIZERS)}")
+        return value
+    if name == "properties":
+        return parse_properties(value)
+    if name == "collection":
+        if not re.fullmatch(r"[A-Z][A-Za-z0-9_]*", value):
+            raise TemplateError(f"Collection names start with a capital letter, got {value!r}")
+    return value
+
+
+def render_value(name: str, value) -> str:
+    """The Python expression for a value marker."""
+    if name == "vectorizer":
+        return VECTORIZERS[value][0]
+    return json.dumps(value)
+
+
+@register_block("connect")
+def render_connect(params, defaults, original):
+    _, header, env_var = VECTORIZERS[params.get("vectorizer", "openai")]
+    headers = [
+        "headers={",
+        f'    "{header}": os.environ.get("{env_var}", "your-key-here")',
+        "}",
+    ] if header else []
+    if params.get("cloud"):
+        arguments = [
+            'cluster_url=os.environ["WEAVIATE_URL"],',
+            'auth_credentials=Auth.api_key(os.environ["WEAVIATE_API_KEY"]),',
+        ]
+        if headers:
+            arguments += headers[:-1] + ["},"]
+        return (
+            ["client = weaviate.connect_to_weaviate_cloud("]
+            + ["    " + line for line in arguments]
+            + [")"]
+        )
+    if not headers:
+        return ["client = weaviate.connect_to_local()"]
+    return ["client = weaviate.connect_to_local("] + ["    " + line for line in headers] + [")"]
+
+
+@register_block("properties")
+def render_properties(params, defaults, original):
+    lines = ["properties=["]
+    for name, data_type in params["properties"]:
+        lines.append(f'    Property(name="{name}", data_type=DataType.{DATA_TYPES[data_type]}),')
+    return lines + ["]"]
+
+
+def sample_value(name: str, data_type: str, i: int):
+    return {
+        "text": f"Sample {name.replace('_', ' ')} {i}",
+        "text[]": [f"{name} {i}a", f"{name} {i}b"],
+        "int": i * 100,
+        "number": i * 1.5,
+        "bool": i % 2 == 1,
+        "date": f"2024-01-{i:02d}T00:00:00Z",
+        "uuid": f"00000000-0000-0000-0000-{i:012d}",
+    }[data_type]
+
+
+@register_block("sample_data")
+def render_sample_data(params, defaults, original):
+    # The hand-written sample data only fits the default properties
+    if params["properties"] == defaults["properties"]:
+        return None
+    lines = ["sample_articles = ["]
+    for i in range(1, 4):
+        lines.append("    {")
+        for name, data_type in params["properties"]:
+            value = sample_value(name, data_type, i)
+            lines.append(f'        "{name}": {json.dumps(value) if data_type != "bool" else value},')
+        lines.append("    },")
+    return lines + ["]"]
+
+
+@register_block("sample_search")
+def render_sample_search(params, defaults, original):
+    if params["properties"] == defaults["properties"]:
+        return None
+    names = [name for name, _ in params["properties"]]
+    text_names = [name for name, data_type in params["properties"] if data_type == "text"]
+    query = sample_value(text_names[0], "text", 1) if text_names else "sample"
+    return [
+        "response = collection.query.near_text(",
+        f'    query="{query}",',
+        "    limit=2,",
+        f"    return_properties={json.dumps(names)}",
+        ")",
+        "",
+        f'print("\\n📝 Sample search results for \'{query}\':")',
+        "for obj in response.objects:",
+        '    print(f"  - {obj.properties}")',
+    ]
+
+
+@dataclass
+class Template:
+    name: str
+    text: str
+    defaults: dict
+
+    @property
+    def parameters(self) -> list[str]:
+        return list(self.defaults)
+
+    def render(self, **overrides) -> str:
+        unknown = {name for name, value in overrides.items() if value is not None} - set(self.defaults)
+        if unknown:
+            raise TemplateError(
+                f"{self.name} has no parameter {', '.join(sorted(unknown))}; "
+                f"it takes {', '.join(self.parameters) or 'none'}"
+            )
+        params = {
+            name: parse_param(name, value) if isinstance(value, str) else value
+            for name, value in overrides.items()
+            if value is not None
+        }
+        return render_text(self.text, params)
+
+
+def read_defaults(text: str) -> dict:
+    defaults = {}
+    for line in text.splitlines():
+        match = PARAM_PATTERN.match(line)
+        if match:
+            defaults[match.group(1)] = parse_param(match.group(1), match.group(2))
+    return defaults
+
+
+def render_text(text: str, params: dict | None = None) -> str:
+    """
+    Renders a template with (parsed) params over its defaults. With no params,
+    this just removes the markers.
+    """
+    defaults = read_defaults(text)
+    params = {**defaults, **(params or {})}
+    output = []
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if PARAM_PATTERN.match(line):
+            continue
+        value = VALUE_PATTERN.match(line)
+        if value:
+            name = value.group("name")
+            code = value.group("code")
+            # Replace what follows the first '=', keeping a trailing comma
+            prefix, _, assigned = code.partition("=")
+            comma = "," if assigned.rstrip().endswith(",") else ""
+            space = " " if assigned.startswith(" ") else ""
+            output.append(f"{prefix}={space}{render_value(name, params[name])}{comma}")
+            continue
+        begin = BEGIN_PATTERN.match(line)
+        if begin:
+            original = []
+            while i < len(lines) and not END_PATTERN.match(lines[i]):
+                original.append(lines[i])
+                i += 1
+            if i == len(lines):
+                raise TemplateError(f"Unclosed block {begin.group('name')!r}")
+            i += 1  # Skip the end marker
+            rendered = BLOCKS[begin.group("name")](params, defaults, original)
+            if rendered is None:
+                output.extend(original)
+            else:
+                indent = begin.group("indent")
+                output.extend(indent + line if line else "" for line in rendered)
+            continue
+        output.append(line)
+    return "\n".join(output) + ("\n" if text.endswith("\n") else "")
+
+
+def example_files():
+    examples_path = importlib.resources.files("woodhouse") / "weaviate_examples"
+    return sorted(list(examples_path.glob("*.py")) + list(examples_path.glob("*.yaml")))
+
+
+def load_template(name: str) -> Template:
+    """Finds an example by file name, stem, number ('10') or part of its name."""
+    files = example_files()
+    for matches in (
+        [f for f in files if name in (f.name, f.stem)],
+        [f for f in files if f.stem.split("_", 1)[0] == name],
+        [f for f in files if name.replace("-", "_") in f.stem],
+    ):
+        if len(matches) == 1:
+            text = matches[0].read_text()
+            return Template(matches[0].name, text, read_defaults(text))
+        if len(matches) > 1:
+            raise TemplateError(f"{name!r} matches {', '.join(f.name for f in matches)}")
+    raise TemplateError(f"No example {name!r}; choose from {', '.join(f.stem for f in files)}")
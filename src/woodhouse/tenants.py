@@ -0,0 +1,133 @@
+# Creates tenants and changes their activity status in bulk, through the REST tenants
+# endpoint, in chunks sent concurrently.
+import asyncio
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from woodhouse.weaviate_http import WeaviateRequestError, request
+
+# action -> (HTTP method, activity status it sets)
+ACTIONS = {
+    "create": ("POST", "ACTIVE"),
+    "activate": ("PUT", "ACTIVE"),
+    "deactivate": ("PUT", "INACTIVE"),
+    "offload": ("PUT", "OFFLOADED"),
+}
+# Older servers report the same states by their previous names
+STATUS_ALIASES = {"HOT": "ACTIVE", "COLD": "INACTIVE", "FROZEN": "OFFLOADED"}
+
+
+def tenant_name(item, where: str) -> str:
+    """The name from a JSON item: a string, or an object with a string "name"."""
+    name = item.get("name") if isinstance(item, dict) else item
+    if not isinstance(name, str):
+        raise ValueError(f'{where}: expected a tenant name or an object with a "name", got {json.dumps(item)}')
+    return name
+
+
+def read_tenant_names(path) -> list[str]:
+    """
+    Tenant names from a text file (one per line, # for comments), a CSV file (the
+    "name" column, or the first), a JSON list or JSONL (strings or objects with
+    "name"). Duplicates are dropped, keeping the first.
+    """
+    path = Path(path)
+    if path.suffix == ".csv":
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+        if rows and "name" in rows[0]:
+            column = rows[0].index("name")
+            rows = rows[1:]
+        else:
+            column = 0
+        names = [row[column] for row in rows if row]
+    elif path.suffix == ".json":
+        items = json.loads(path.read_text())
+        if not isinstance(items, list):
+            raise ValueError(f"{path.name} should hold a list of tenant names")
+        names = [tenant_name(item, f"{path.name} item {i}") for i, item in enumerate(items)]
+    elif path.suffix == ".jsonl":
+        names = []
+        for number, line in enumerate(path.read_text().splitlines(), 1):
+            if line.strip():
+                try:
+                    item = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path.name} line {number}: {e}")
+                names.append(tenant_name(item, f"{path.name} line {number}"))
+    else:
+        lines = (line.strip() for line in path.read_text().splitlines())
+        names = [line for line in lines if line and not line.startswith("#")]
+    return list(dict.fromkeys(name.strip() for name in names if name.strip()))
+
+
+@dataclass
+class TenantResult:
+    changed: int = 0
+    # Already in the requested state (or, for create, already existing)
+    skipped: int = 0
+    # Names that don't exist, for status changes
+    missing: list = field(default_factory=list)
+    # (names, error message) for chunks that failed every attempt
+    failed: list = field(default_factory=list)
+
+    @property
+    def failed_count(self) -> int:
+        return sum(len(names) for names, _ in self.failed)
+
+
+async def existing_tenants(client, collection: str) -> dict[str, str]:
+    """Tenant name -> activity status."""
+    tenants = (await request(client, "GET", f"/v1/schema/{collection}/tenants")).json()
+    return {t["name"]: STATUS_ALIASES.get(t.get("activityStatus"), t.get("activityStatus")) for t in tenants}
+
+
+async def apply_tenant_action(
+    client,
+    collection: str,
+    names,
+    action: str,
+    status: str | None = None,
+    chunk_size: int = 100,
+    concurrency: int = 4,
+    retries: int = 5,
+    on_progress=None,
+) -> TenantResult:
+    """
+    Applies action to the named tenants, chunk_size tenants per request and up to
+    concurrency requests at once, retrying failed requests. Tenants already in the
+    target state are skipped, so an interrupted run can simply be repeated.
+    status overrides the state new tenants are created in. on_progress(result) is
+    called after each chunk.
+    """
+    method, target = ACTIONS[action]
+    if action == "create" and status:
+        target = status
+    current = await existing_tenants(client, collection)
+    result = TenantResult()
+    if action == "create":
+        pending = [name for name in names if name not in current]
+    else:
+        result.missing = [name for name in names if name not in current]
+        pending = [name for name in names if name in current and current[name] != target]
+    result.skipped = len(names) - len(pending) - len(result.missing)
+
+    chunks = [pending[i : i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(chunk):
+        body = [{"name": name, "activityStatus": target} for name in chunk]
+        async with semaphore:
+            try:
+                await request(client, method, f"/v1/schema/{collection}/tenants", json=body, retries=retries)
+            except WeaviateRequestError as e:
+                result.failed.append((chunk, str(e)))
+            else:
+                result.changed += len(chunk)
+        if on_progress:
+            on_progress(result)
+
+    await asyncio.gather(*(send(chunk) for chunk in chunks))
+    return result
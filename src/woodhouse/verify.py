@@ -0,0 +1,179 @@
+# Executes notebooks against a pool of warm Jupyter kernels to check that they run.
+# Student notebooks are run up to the first '# ADD YOUR CODE HERE' placeholder;
+# other notebooks are run end to end.
+import asyncio
+import copy
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import nbformat
+from jupyter_client.manager import AsyncKernelManager
+from nbclient import NotebookClient
+from nbclient.exceptions import DeadKernelError
+
+from woodhouse.notebooks import SOLUTION_PLACEHOLDER
+
+
+@dataclass
+class CellFailure:
+    index: int
+    ename: str
+    evalue: str
+
+
+@dataclass
+class VerifyResult:
+    path: Path
+    seconds: float
+    cells_run: int
+    failures: list[CellFailure] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures and self.error is None
+
+
+def cells_to_run(nb):
+    """
+    Returns the code cells to execute as (index, cell) pairs: every code cell,
+    or for a student notebook, those before the first solution placeholder.
+    """
+    cells = []
+    for index, cell in enumerate(nb.cells):
+        if cell.cell_type != "code":
+            continue
+        if SOLUTION_PLACEHOLDER in cell.source:
+            break
+        cells.append((index, cell))
+    return cells
+
+
+def prepare_notebook(path):
+    """
+    Loads a notebook and builds the copy to execute, starting with a setup cell
+    that moves the (shared) kernel into the notebook's directory.
+    Returns (notebook, original cell indices of the executed cells).
+    """
+    with open(path, "r") as f:
+        nb = nbformat.read(f, as_version=4)
+    selected = cells_to_run(nb)
+    run_nb = copy.deepcopy(nb)
+    setup = nbformat.v4.new_code_cell(f"import os\nos.chdir({str(Path(path).parent.resolve())!r})")
+    run_nb.cells = [setup] + [copy.deepcopy(cell) for _, cell in selected]
+    return run_nb, [index for index, _ in selected]
+
+
+class KernelPool:
+    """A fixed set of started kernels, handed out one notebook at a time."""
+
+    def __init__(self, size, kernel_name="python3"):
+        self.size = size
+        self.kernel_name = kernel_name
+        self.managers = []
+        self.available = asyncio.Queue()
+
+    async def start(self):
+        for _ in range(self.size):
+            km = AsyncKernelManager(kernel_name=self.kernel_name)
+            self.managers.append(km)
+        await asyncio.gather(*(km.start_kernel() for km in self.managers))
+        for km in self.managers:
+            self.available.put_nowait(km)
+
+    async def acquire(self):
+        return await self.available.get()
+
+    async def release(self, km):
+        # Restart so the next notebook starts from a clean namespace
+        try:
+            await km.restart_kernel(now=True)
+        except Exception:
+            km = await self.replace(km)
+        finally:
+            # Always hand a kernel back, or later notebooks would wait forever
+            self.available.put_nowait(km)
+
+    async def replace(self, km):
+        """Swaps a kernel that can't be restarted for a newly started one."""
+        try:
+            await km.shutdown_kernel(now=True)
+        except Exception:
+            pass
+        new_km = AsyncKernelManager(kernel_name=self.kernel_name)
+        await new_km.start_kernel()
+        self.managers[self.managers.index(km)] = new_km
+        return new_km
+
+    async def shutdown(self):
+        await asyncio.gather(
+            *(km.shutdown_kernel(now=True) for km in self.managers),
+            return_exceptions=True,
+        )
+
+
+async def verify_notebook(pool, path, timeout=60):
+    """Executes one notebook on a pooled kernel and collects failing cells."""
+    try:
+        nb, indices = prepare_notebook(path)
+    except Exception as e:
+        return VerifyResult(Path(path), 0.0, 0, error=f"Could not read notebook: {type(e).__name__}: {e}")
+    km = await pool.acquire()
+    start = time.perf_counter()
+    error = None
+    client = NotebookClient(
+        nb,
+        km=km,
+        timeout=timeout,
+        allow_errors=True,
+        interrupt_on_timeout=True,
+        kernel_name=pool.kernel_name,
+    )
+    try:
+        await client.async_execute()
+    except DeadKernelError as e:
+        error = f"Kernel died: {e}"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        if client.kc is not None:
+            client.kc.stop_channels()
+        seconds = time.perf_counter() - start
+        await pool.release(km)
+
+    failures = []
+    # Skip the setup cell, and map the rest back to the original notebook
+    for index, cell in zip(indices, nb.cells[1:]):
+        for output in cell.get("outputs", []):
+            if output.output_type == "error":
+                failures.append(CellFailure(index, output.ename, output.evalue))
+    return VerifyResult(Path(path), seconds, len(indices), failures, error)
+
+
+async def verify_notebooks_async(paths, kernels=4, timeout=60, kernel_name="python3", on_result=None):
+    pool = KernelPool(min(kernels, len(paths)) or 1, kernel_name)
+    await pool.start()
+
+    async def run(path):
+        result = await verify_notebook(pool, path, timeout)
+        if on_result:
+            on_result(result)
+        return result
+
+    try:
+        return await asyncio.gather(*(run(path) for path in paths))
+    finally:
+        await pool.shutdown()
+
+
+def verify_notebooks(paths, kernels=4, timeout=60, kernel_name="python3", on_result=None):
+    """
+    Executes notebooks in parallel on a pool of pre-started kernels, restarting
+    each kernel between notebooks. timeout applies per cell.
+    on_result(result) is called as each notebook finishes.
+    Returns a list of VerifyResult in the order of paths.
+    """
+    return asyncio.run(
+        verify_notebooks_async(paths, kernels, timeout, kernel_name, on_result)
+    )
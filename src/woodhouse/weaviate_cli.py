@@ -0,0 +1,387 @@
+# Tools for running and tuning Weaviate itself (as opposed to generating client code).
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import click
+
+from woodhouse.compose import PROFILES, memory_bytes, render_compose, settings_for
+from woodhouse.export import FORMATS, export_collection
+from woodhouse.images import format_bytes
+from woodhouse.ingest import BatchSizer, ingest_objects, read_objects
+from woodhouse.query_bench import DEFAULT_WORKLOAD, load_workload, run_workload
+from woodhouse.sizing import (
+    DEFAULT_MAX_CONNECTIONS,
+    DYNAMIC_THRESHOLD,
+    FLAT_QUANTIZATIONS,
+    INDEX_TYPES,
+    QUANTIZATIONS,
+    USABLE_MEMORY_SHARE,
+    estimate,
+    nodes_needed,
+    parse_count,
+    sweep,
+)
+from woodhouse.tenants import ACTIONS, apply_tenant_action, read_tenant_names
+from woodhouse.weaviate_http import WeaviateRequestError, make_client, parse_headers
+
+
+@click.group()
+def weaviate():
+    """Weaviate deployment and data tools."""
+    pass
+
+
+@weaviate.command()
+@click.option("--profile", type=click.Choice(list(PROFILES)), help="Start from a tuned profile.")
+@click.option("--nodes", type=click.IntRange(min=1), help="Number of Weaviate nodes.  [default: 1]")
+@click.option("--replication-factor", type=click.IntRange(min=1), help="Minimum replication factor for new collections.")
+@click.option("--module", "modules", multiple=True, help="Module to enable, e.g. text2vec-ollama (repeatable).")
+@click.option("--image", help="Weaviate image.")
+@click.option("--gomaxprocs", type=click.IntRange(min=1), help="Threads Weaviate may use.")
+@click.option("--limit-resources/--no-limit-resources", default=None, help="Size caches to the container limits.")
+@click.option("--async-indexing/--no-async-indexing", default=None, help="Index vectors in the background.")
+@click.option("--memory", help="Container memory limit, e.g. 8G. Also sets GOMEMLIMIT.")
+@click.option("--cpus", type=float, help="Container CPU limit.")
+@click.option("--lsm-access-strategy", type=click.Choice(["mmap", "pread"]), help="How LSM segments are read.")
+@click.option("--hnsw-max-log-size", help="HNSW commit log size before condensing, e.g. 4GiB.")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), help="Write to this file instead of stdout.")
+def compose(profile, nodes, replication_factor, modules, output, **options):
+    """Generates a docker-compose file for local Weaviate."""
+    try:
+        settings = settings_for(
+            profile,
+            nodes=nodes,
+            replication_factor=replication_factor,
+            modules=list(modules) or None,
+            **options,
+        )
+        content = render_compose(settings)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    if output:
+        Path(output).write_text(content)
+        print(f"Compose file saved to {output}")
+    else:
+        click.echo(content, nl=False)
+
+
+def connection_options(fn):
+    """Options for reaching a Weaviate instance, shared by the data commands."""
+    fn = click.option(
+        "--header", "headers", multiple=True, help="Extra request header as name=value, e.g. for a vectorizer key."
+    )(fn)
+    fn = click.option("--api-key", envvar="WEAVIATE_API_KEY", help="Weaviate API key.  [env: WEAVIATE_API_KEY]")(fn)
+    fn = click.option("--url", default="http://localhost:8080", show_default=True, help="Weaviate REST endpoint.")(fn)
+    return fn
+
+
+def client_for(url, api_key, headers, connections):
+    try:
+        return make_client(url, api_key, parse_headers(headers), connections=connections)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+
+def parse_named_vectors(values) -> dict:
+    """['title_vector=title_embedding'] -> {'title_vector': 'title_embedding'}"""
+    named = {}
+    for value in values:
+        name, sep, column = value.partition("=")
+        if not sep:
+            raise click.UsageError(f"Named vectors are name=column, got {value!r}")
+        named[name] = column
+    return named
+
+
+@weaviate.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--collection", required=True, help="Collection to import into.")
+@connection_options
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, show_default=True, help="Batch requests in flight.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=100, show_default=True, help="Initial objects per batch.")
+@click.option("--max-batch-size", type=click.IntRange(min=1), default=1000, show_default=True, help="Largest batch to grow to.")
+@click.option(
+    "--target-latency", type=float, default=1.0, show_default=True, help="Seconds per batch request to size batches for."
+)
+@click.option("--rate", type=float, help="Maximum objects per second.")
+@click.option("--retries", type=click.IntRange(min=0), default=3, show_default=True, help="Retries for failed requests and objects.")
+@click.option("--id-field", help="Field holding each object's UUID. Otherwise IDs are derived from the properties.")
+@click.option("--vector-field", help="Field holding each object's vector.")
+@click.option("--named-vector", "named_vectors", multiple=True, help="Named vector from a field, as name=field (repeatable).")
+@click.option("--vectors", "vectors_path", type=click.Path(exists=True, dir_okay=False), help=".npy file with one vector per row.")
+@click.option("--tenant", help="Tenant to import into.")
+@click.option("--failed-output", type=click.Path(dir_okay=False), help="Write objects that failed to this JSONL file.")
+def ingest(
+    path, collection, url, api_key, headers, concurrency, batch_size, max_batch_size, target_latency, rate, retries,
+    id_field, vector_field, named_vectors, vectors_path, tenant, failed_output,
+):
+    """Imports a .jsonl or .parquet file into a collection with concurrent, adaptive batches."""
+    try:
+        objects = read_objects(
+            path, collection, id_field, vector_field, parse_named_vectors(named_vectors), vectors_path, tenant
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    sizer = BatchSizer(
+        initial=min(batch_size, max_batch_size),
+        minimum=min(10, batch_size),
+        maximum=max_batch_size,
+        target_seconds=target_latency,
+    )
+
+    def on_progress(stats):
+        click.echo(
+            f"\r{stats.imported:,} imported, {len(stats.failed):,} failed, "
+            f"{stats.objects_per_second:,.0f} objects/s, batch size {sizer.size}",
+            nl=False,
+            err=True,
+        )
+
+    async def run():
+        async with client_for(url, api_key, headers, concurrency) as client:
+            return await ingest_objects(objects, client, concurrency, sizer, rate, retries, on_progress)
+
+    try:
+        stats = asyncio.run(run())
+    except (ValueError, RuntimeError, KeyError) as e:
+        raise click.ClickException(str(e))
+    click.echo("", err=True)
+    print(
+        f"Imported {stats.imported:,} of {stats.read:,} objects in {stats.seconds:.1f}s "
+        f"({stats.objects_per_second:,.0f} objects/s, {stats.batches} batches, {stats.retried} objects retried)"
+    )
+    if stats.failed:
+        print(f"{len(stats.failed):,} objects failed; first error: {stats.failed[0][1]}")
+        if failed_output:
+            with open(failed_output, "w") as f:
+                for obj, error in stats.failed:
+                    f.write(json.dumps({"object": obj, "error": error}) + "\n")
+            print(f"Failed objects saved to {failed_output}")
+        sys.exit(1)
+
+
+def format_ms(value: float | None) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+@weaviate.command()
+@click.option("--collection", default="Article", show_default=True, help="Collection to query.")
+@connection_options
+@click.option(
+    "--workload",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON/YAML list of queries. Default: the queries from the search methods demo.",
+)
+@click.option("--concurrency", type=click.IntRange(min=1), default=8, show_default=True, help="Queries in flight.")
+@click.option("--qps", type=click.FloatRange(min=0, min_open=True), help="Target queries per second (open loop).")
+@click.option("--duration", type=float, default=10.0, show_default=True, help="Seconds to run for.")
+@click.option("--requests", type=click.IntRange(min=1), help="Run this many queries instead of for --duration.")
+@click.option("--warmup", type=click.IntRange(min=0), default=0, show_default=True, help="Queries to send before measuring.")
+@click.option("--label", help="Name for this run in the results, e.g. the index settings being tried.")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), help="Write the results as JSON to this file.")
+def bench(collection, url, api_key, headers, workload, concurrency, qps, duration, requests, warmup, label, output):
+    """Replays a query workload and reports latency percentiles and throughput per query type."""
+    try:
+        queries = load_workload(workload) if workload else DEFAULT_WORKLOAD
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    async def run():
+        async with client_for(url, api_key, headers, concurrency) as client:
+            return await run_workload(client, collection, queries, concurrency, qps, duration, requests, warmup)
+
+    try:
+        summary = asyncio.run(run())
+    except (ValueError, WeaviateRequestError) as e:
+        raise click.ClickException(str(e))
+
+    print(f"{'query':<12} {'requests':>8} {'errors':>6} {'qps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for query_type, result in summary["results"].items():
+        print(
+            f"{query_type:<12} {result['requests']:>8} {result['errors']:>6} {result['throughput_qps']:>8.1f} "
+            f"{format_ms(result['p50_ms']):>8} {format_ms(result['p95_ms']):>8} {format_ms(result['p99_ms']):>8}"
+        )
+    if summary["results"]["all"]["first_error"]:
+        print(f"First error: {summary['results']['all']['first_error']}")
+    if output:
+        report = {
+            "label": label,
+            "url": url,
+            "collection": collection,
+            "concurrency": concurrency,
+            "target_qps": qps,
+            "workload": queries,
+            **summary,
+        }
+        Path(output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results saved to {output}")
+
+
+@weaviate.command()
+@click.option("--collection", required=True, help="Collection to export.")
+@connection_options
+@click.option("--format", "format_", type=click.Choice(FORMATS), default="jsonl", show_default=True)
+@click.option(
+    "-o", "--output", type=click.Path(file_okay=False), help="Directory to write to.  [default: <collection>-export]"
+)
+@click.option("--include-vector", is_flag=True, help="Export vectors too.")
+@click.option("--tenant", "tenants", multiple=True, help="Tenant to export (repeatable). Default: all active tenants.")
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, show_default=True, help="Tenants exported at once.")
+@click.option("--page-size", type=click.IntRange(min=1), default=1000, show_default=True, help="Objects per request.")
+@click.option("--restart", is_flag=True, help="Start over instead of resuming an interrupted export.")
+def export(collection, url, api_key, headers, format_, output, include_vector, tenants, concurrency, page_size, restart):
+    """Streams a collection to JSONL or Parquet files, resuming where a previous run stopped."""
+    output = output or f"{collection}-export"
+    exported = 0
+
+    def on_page(tenant, count):
+        nonlocal exported
+        exported += count
+        click.echo(f"\r{exported:,} objects exported", nl=False, err=True)
+
+    async def run():
+        async with client_for(url, api_key, headers, concurrency) as client:
+            return await export_collection(
+                client, collection, output, format_, include_vector, list(tenants), concurrency, page_size, restart, on_page
+            )
+
+    try:
+        counts = asyncio.run(run())
+    except WeaviateRequestError as e:
+        raise click.ClickException(f"{e}\nRun the same command again to resume.")
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    click.echo("", err=True)
+    if len(counts) > 1 or "" not in counts:
+        for tenant, count in counts.items():
+            print(f"  {tenant}: {count:,} objects")
+    print(f"Exported {sum(counts.values()):,} objects from {collection} to {output}/")
+
+
+class CountType(click.ParamType):
+    name = "count"
+
+    def convert(self, value, param, ctx):
+        try:
+            return parse_count(str(value))
+        except ValueError:
+            self.fail(f"{value!r} is not a count like 250k, 10M or 1.5B", param, ctx)
+
+
+class SizeType(click.ParamType):
+    name = "size"
+
+    def convert(self, value, param, ctx):
+        try:
+            return memory_bytes(str(value))
+        except ValueError:
+            self.fail(f"{value!r} is not a size like 512M or 16G", param, ctx)
+
+
+@weaviate.command()
+@click.option("--objects", type=CountType(), required=True, help="Number of objects, e.g. 10M.")
+@click.option("--dimensions", type=click.IntRange(min=1), required=True, help="Vector dimensions.")
+@click.option("--named-vectors", type=click.IntRange(min=1), default=1, show_default=True, help="Vectors per object.")
+@click.option("--index", type=click.Choice(INDEX_TYPES), default="hnsw", show_default=True)
+@click.option("--quantization", type=click.Choice(QUANTIZATIONS), default="none", show_default=True)
+@click.option("--max-connections", type=click.IntRange(min=1), default=DEFAULT_MAX_CONNECTIONS, show_default=True)
+@click.option("--tenants", type=CountType(), default=1, show_default=True, help="Tenants the objects are spread over.")
+@click.option("--object-size", type=SizeType(), default="1K", show_default=True, help="Average size of an object's properties.")
+@click.option("--memory-budget", type=SizeType(), help="Memory per node, e.g. 16G. Suggests settings that fit.")
+@click.option("--nodes", type=click.IntRange(min=1), default=1, show_default=True)
+@click.option("--replication-factor", type=click.IntRange(min=1), default=1, show_default=True)
+@click.option("--top", type=click.IntRange(min=1), default=5, show_default=True, help="Suggestions to show.")
+def size(
+    objects, dimensions, named_vectors, index, quantization, max_connections, tenants, object_size, memory_budget,
+    nodes, replication_factor, top,
+):
+    """Estimates the memory and disk a collection needs, and settings that fit a memory budget."""
+    if index == "flat" and quantization not in FLAT_QUANTIZATIONS:
+        raise click.UsageError("The flat index only supports BQ quantization")
+    sizes = estimate(objects, dimensions, named_vectors, index, quantization, max_connections, tenants, object_size)
+    memory, disk = float(sizes["memory"]), float(sizes["disk"])
+    copies = replication_factor / nodes
+    print(
+        f"{objects:,} objects x {named_vectors} vector(s) of {dimensions} dimensions, "
+        f"{index} index, {quantization} quantization, maxConnections {max_connections}"
+    )
+    print(f"  Memory: {format_bytes(memory)} in total, {format_bytes(memory * copies)} per node")
+    print(f"  Disk:   {format_bytes(disk)} in total, {format_bytes(disk * copies)} per node")
+    if index == "flat" and objects / tenants > DYNAMIC_THRESHOLD:
+        print(f"  Flat indexes search exhaustively; consider dynamic or hnsw above {DYNAMIC_THRESHOLD:,} objects per tenant")
+    if not memory_budget:
+        return
+
+    needed = int(nodes_needed(memory, memory_budget, replication_factor))
+    usable = format_bytes(memory_budget * USABLE_MEMORY_SHARE)
+    if needed <= nodes:
+        print(f"This fits {nodes} node(s) with {format_bytes(memory_budget)} ({usable} usable) each.")
+    else:
+        print(f"This needs {needed} nodes with {format_bytes(memory_budget)} ({usable} usable) each.")
+
+    options = sweep(objects, dimensions, memory_budget, named_vectors, nodes, replication_factor, tenants, object_size)
+    fitting = [option for option in options if option["fits"]]
+    if fitting:
+        print(f"\nSettings that fit on {nodes} node(s), best recall first:")
+    else:
+        print(f"\nNothing fits on {nodes} node(s); these need the fewest nodes:")
+    print(f"  {'index':<8} {'quantization':<12} {'maxConn':>7} {'memory/node':>12} {'disk/node':>12} {'nodes':>5}")
+    for option in (fitting or options)[:top]:
+        print(
+            f"  {option['index']:<8} {option['quantization']:<12} {option['max_connections']:>7} "
+            f"{format_bytes(option['memory_per_node']):>12} {format_bytes(option['disk_per_node']):>12} "
+            f"{option['nodes_needed']:>5}"
+        )
+
+
+@weaviate.command()
+@click.argument("action", type=click.Choice(list(ACTIONS)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--collection", required=True, help="Multi-tenant collection.")
+@connection_options
+@click.option(
+    "--status",
+    type=click.Choice(["ACTIVE", "INACTIVE"]),
+    help="State to create tenants in (create only).  [default: ACTIVE]",
+)
+@click.option("--chunk-size", type=click.IntRange(min=1), default=100, show_default=True, help="Tenants per request.")
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, show_default=True, help="Requests in flight.")
+@click.option("--retries", type=click.IntRange(min=0), default=5, show_default=True, help="Retries per request.")
+def tenants(action, path, collection, url, api_key, headers, status, chunk_size, concurrency, retries):
+    """
+    Creates, activates, deactivates or offloads the tenants listed in PATH.
+
+    PATH is a text file with a tenant per line, a CSV file with a "name" column,
+    or a JSON/JSONL list of names.
+    """
+    if status and action != "create":
+        raise click.UsageError("--status only applies to create")
+    try:
+        names = read_tenant_names(path)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    def on_progress(result):
+        click.echo(f"\r{result.changed:,} done, {result.failed_count:,} failed", nl=False, err=True)
+
+    async def run():
+        async with client_for(url, api_key, headers, concurrency) as client:
+            return await apply_tenant_action(
+                client, collection, names, action, status, chunk_size, concurrency, retries, on_progress
+            )
+
+    try:
+        result = asyncio.run(run())
+    except WeaviateRequestError as e:
+        raise click.ClickException(str(e))
+    click.echo("", err=True)
+    print(f"{action}: {result.changed:,} changed, {result.skipped:,} already done, of {len(names):,} tenants")
+    if result.missing:
+        print(f"{len(result.missing):,} tenants don't exist, e.g. {', '.join(result.missing[:5])}")
+    if result.failed:
+        print(f"{result.failed_count:,} tenants failed; first error: {result.failed[0][1]}")
+        print("Run the same command again to retry them.")
+    if result.missing or result.failed:
+        sys.exit(1)
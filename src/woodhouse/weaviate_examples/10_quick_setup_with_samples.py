@@ -10,18 +10,24 @@ import weaviate
 from weaviate.classes.init import Auth
 from weaviate.classes.config import Configure, Property, DataType
 import os
+# woodhouse:param collection = Article
+# woodhouse:param vectorizer = openai
+# woodhouse:param cloud = false
+# woodhouse:param properties = title:text,body:text,category:text,author:text,publication_date:date,word_count:int,is_published:bool
 
 def main():
     # Connect to Weaviate (modify connection as needed)
+    # woodhouse:begin connect
     client = weaviate.connect_to_local(
         headers={
             "X-OpenAI-Api-Key": os.environ.get("OPENAI_API_KEY", "your-key-here")
         }
     )
+    # woodhouse:end
 
     try:
         # Create a simple Article collection
-        collection_name = "Article"
+        collection_name = "Article"  # woodhouse:value collection
 
         # Delete if exists (for clean demos)
         if client.collections.exists(collection_name):
@@ -30,7 +36,8 @@ def main():
         # Create collection with vectorizer
         client.collections.create(
             collection_name,
-            vector_config=Configure.Vectors.text2vec_openai(),
+            vector_config=Configure.Vectors.text2vec_openai(),  # woodhouse:value vectorizer
+            # woodhouse:begin properties
             properties=[
                 Property(name="title", data_type=DataType.TEXT),
                 Property(name="body", data_type=DataType.TEXT),
@@ -40,11 +47,13 @@ def main():
                 Property(name="word_count", data_type=DataType.INT),
                 Property(name="is_published", data_type=DataType.BOOL),
             ]
+            # woodhouse:end
         )
 
         collection = client.collections.use(collection_name)
 
         # Sample articles for demonstration
+        # woodhouse:begin sample_data
         sample_articles = [
             {
                 "title": "Introduction to Artificial Intelligence",
@@ -92,6 +101,7 @@ def main():
                 "is_published": True
             }
         ]
+        # woodhouse:end
 
         # Insert sample data using batch
         with collection.batch.fixed_size(batch_size=10) as batch:
@@ -102,6 +112,7 @@ def main():
         print("🔍 Ready for search demonstrations!")
 
         # Quick test search
+        # woodhouse:begin sample_search
         response = collection.query.near_text(
             query="artificial intelligence",
             limit=2,
@@ -111,6 +122,7 @@ def main():
         print("\n📝 Sample search results for 'artificial intelligence':")
         for obj in response.objects:
             print(f"  - {obj.properties['title']} by {obj.properties['author']}")
+        # woodhouse:end
 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -7,16 +7,20 @@ and filtered searches. Perfect for demonstrating search capabilities.
 """
 
 import weaviate
+from weaviate.classes.init import Auth
 from weaviate.classes.query import Filter, MetadataQuery, HybridFusion
 import os
+# woodhouse:param cloud = false
 
 def demonstrate_searches():
     # Connect to Weaviate
+    # woodhouse:begin connect
     client = weaviate.connect_to_local(
         headers={
             "X-OpenAI-Api-Key": os.environ.get("OPENAI_API_KEY", "your-key-here")
         }
     )
+    # woodhouse:end
 
     try:
         collection = client.collections.use("Article")
@@ -8,17 +8,50 @@ content generation based on retrieved context.
 """
 
 import weaviate
+from weaviate.classes.init import Auth
 from weaviate.classes.generate import GenerativeConfig
 from weaviate.classes.config import Configure
 import os
+# woodhouse:param cloud = false
+
+
+class QuestionCache:
+    """
+    Reuses generate.near_text responses for questions asked again with the same
+    arguments. woodhouse.rag_cache.GenerativeCache adds expiry, LRU eviction and
+    matching of reworded questions.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.responses = {}
+        self.hits = 0
+        self.misses = 0
+
+    def near_text(self, query, **kwargs):
+        key = (query, tuple(sorted(kwargs.items())))
+        if key in self.responses:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.responses[key] = self.collection.generate.near_text(query=query, **kwargs)
+        return self.responses[key]
+
+    @property
+    def hit_rate(self):
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
 
 def demonstrate_rag():
     # Connect to Weaviate
+    # woodhouse:begin connect
     client = weaviate.connect_to_local(
         headers={
             "X-OpenAI-Api-Key": os.environ.get("OPENAI_API_KEY", "your-key-here")
         }
     )
+    # woodhouse:end
 
     try:
         collection = client.collections.use("Article")
@@ -132,20 +165,23 @@ def demonstrate_rag():
         print(response.generative.text)
         print()
 
-        # 6. QUESTION ANSWERING
-        print("\n6️⃣ QUESTION ANSWERING")
-        print("Answer specific questions based on retrieved content")
+        # 6. QUESTION ANSWERING WITH A CACHE
+        print("\n6️⃣ QUESTION ANSWERING WITH A CACHE")
+        print("Answer questions, reusing answers to repeated questions")
         print("-" * 40)
 
+        cache = QuestionCache(collection)
         questions = [
             "What are the main benefits of AI in healthcare?",
             "How is renewable energy technology evolving?",
-            "What challenges does climate change present?"
+            "What challenges does climate change present?",
+            "What are the main benefits of AI in healthcare?",
+            "How is renewable energy technology evolving?",
         ]
 
         for question in questions:
-            response = collection.generate.near_text(
-                query=question,
+            response = cache.near_text(
+                question,
                 single_prompt=f"Answer this question based on the article content: '{question}'. Use information from: {{title}} - {{body}}",
                 limit=1
             )
@@ -158,6 +194,8 @@ def demonstrate_rag():
                 print("🤖 A: No relevant articles found.")
             print()
 
+        print(f"🗄️ Cache: {cache.hits} of {len(questions)} questions answered from cache ({cache.hit_rate:.0%} hit rate)")
+
         # 7. CREATIVE GENERATION
         print("\n7️⃣ CREATIVE GENERATION")
         print("Create engaging content based on technical articles")
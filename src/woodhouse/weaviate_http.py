@@ -0,0 +1,78 @@
+# Async HTTP helpers shared by the `woodhouse weaviate` data tools, which talk to
+# the Weaviate REST and GraphQL APIs directly with httpx.
+import asyncio
+import random
+
+import httpx
+
+# Statuses worth retrying: rate limiting, overload and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_BACKOFF = 30.0
+
+
+class WeaviateRequestError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_headers(values) -> dict:
+    """['X-OpenAI-Api-Key=sk-...'] -> {'X-OpenAI-Api-Key': 'sk-...'}"""
+    headers = {}
+    for value in values:
+        name, sep, header_value = value.partition("=")
+        if not sep:
+            raise ValueError(f"Headers are name=value, got {value!r}")
+        headers[name.strip()] = header_value.strip()
+    return headers
+
+
+def make_client(url: str, api_key: str | None = None, headers=None, timeout: float = 60.0, connections: int = 16):
+    """An httpx.AsyncClient for a Weaviate instance, with one pooled connection per concurrent request."""
+    headers = dict(headers or {})
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    return httpx.AsyncClient(
+        base_url=url.rstrip("/"),
+        headers=headers,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+    )
+
+
+def backoff_seconds(attempt: int, base: float = 0.5, retry_after: str | None = None) -> float:
+    """Exponential backoff with jitter, or the server's Retry-After if it sent one."""
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_BACKOFF)
+        except ValueError:
+            pass
+    return min(base * 2**attempt, MAX_BACKOFF) * random.uniform(0.5, 1.0)
+
+
+async def request(client, method: str, path: str, retries: int = 5, backoff: float = 0.5, on_retry=None, **kwargs):
+    """
+    Sends a request, retrying connection errors and RETRY_STATUSES with backoff.
+    on_retry(status or None) is called before each retry. Returns the response, or
+    raises WeaviateRequestError for other errors or when retries run out.
+    """
+    for attempt in range(retries + 1):
+        status = None
+        retry_after = None
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.TransportError as e:
+            message = f"{method} {path}: {type(e).__name__}: {e}"
+        else:
+            if response.status_code < 400:
+                return response
+            status = response.status_code
+            message = f"{method} {path}: HTTP {status}: {response.text[:500]}"
+            if status not in RETRY_STATUSES:
+                raise WeaviateRequestError(message, status)
+            retry_after = response.headers.get("retry-after")
+        if attempt == retries:
+            raise WeaviateRequestError(message, status)
+        if on_retry:
+            on_retry(status)
+        await asyncio.sleep(backoff_seconds(attempt, backoff, retry_after))
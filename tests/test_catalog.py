@@ -0,0 +1,55 @@
+import time
+
+from woodhouse.catalog import Catalog, CatalogEntry, load_catalog, reference_entries, tokenize
+
+REFERENCE = """
+# ========================
+# 1. CLIENT INSTANTIATION
+# ========================
+# For more information, see the docs
+
+import weaviate
+
+# Connect to local instance
+client = weaviate.connect_to_local()
+
+# Connect to Weaviate Cloud
+client = weaviate.connect_to_weaviate_cloud(cluster_url=url)
+"""
+
+
+def test_tokenize():
+    assert tokenize("Show me how to create Collections with connect_to_local") == [
+        "create", "collection", "connect", "local",
+    ]
+
+
+def test_reference_entries():
+    entries = reference_entries(REFERENCE)
+    assert [(e.title, e.description) for e in entries] == [
+        ("Connect to local instance", "Client Instantiation"),
+        ("Connect to Weaviate Cloud", "Client Instantiation"),
+    ]
+    assert entries[0].text == "# Connect to local instance\nclient = weaviate.connect_to_local()"
+
+
+def test_search_ranks_title_matches_first():
+    catalog = Catalog(reference_entries(REFERENCE) + [CatalogEntry("Batch import", "x.py", "batch")])
+    matches = catalog.search("connect to weaviate cloud")
+    assert [m.entry.title for m in matches] == ["Connect to Weaviate Cloud", "Connect to local instance"]
+    assert matches[0].coverage == 1.0
+    assert matches[1].coverage == 0.5
+    assert catalog.best_match("set up role based access control") is None
+
+
+def test_bundled_catalog():
+    catalog = load_catalog()
+    assert catalog.best_match("quick setup with sample data").entry.source == (
+        "10_quick_setup_with_samples.py"
+    )
+    assert catalog.best_match("RAG example").entry.source == "25_rag_and_generation.py"
+
+    start = time.perf_counter()
+    for _ in range(100):
+        catalog.search("create a collection with named vectors")
+    assert (time.perf_counter() - start) / 100 < 0.01
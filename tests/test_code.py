@@ -0,0 +1,152 @@
+import asyncio
+import json
+import time
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import UserPromptPart
+from pydantic_ai.models.function import FunctionModel
+
+from woodhouse.code import (
+    RoutedCodeSession,
+    WeaviateCodeSession,
+    check_generated_code,
+    example_filename,
+    is_complex_prompt,
+    load_reference,
+)
+
+
+def user_prompts(messages):
+    return [
+        part.content
+        for message in messages
+        for part in message.parts
+        if isinstance(part, UserPromptPart)
+    ]
+
+
+def streaming_model(respond, model_name=None):
+    """A FunctionModel that streams respond(messages) in two chunks."""
+
+    async def stream(messages, info):
+        text = respond(messages)
+        yield text[:3]
+        yield text[3:]
+
+    return FunctionModel(stream_function=stream, model_name=model_name)
+
+
+def test_load_reference_is_cached():
+    reference = load_reference()
+    assert "connect_to_local" in reference
+    assert load_reference() is reference
+
+
+def test_session_keeps_history(tmp_path):
+    seen = []
+
+    def respond(messages):
+        prompts = user_prompts(messages)
+        seen.append(prompts)
+        return f"answer {len(prompts)}"
+
+    agent = Agent(streaming_model(respond), system_prompt="reference")
+    session = WeaviateCodeSession(agent, log_path=tmp_path / "usage.jsonl")
+
+    assert asyncio.run(session.ask("connect to weaviate")) == "answer 1"
+    assert asyncio.run(session.ask("now use the cloud")) == "answer 2"
+    # The follow-up is sent with the earlier turn, so the model can refine it
+    assert seen[-1] == ["connect to weaviate", "now use the cloud"]
+
+
+def test_session_records_usage(tmp_path):
+    log_path = tmp_path / "usage.jsonl"
+    agent = Agent(streaming_model(lambda messages: "print('hi')"))
+    session = WeaviateCodeSession(agent, log_path=log_path)
+
+    asyncio.run(session.ask("say hi"))
+
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert len(records) == 1
+    record = records[0]
+    assert record["model"] == agent.model.model_name
+    assert record["input_tokens"] > 0
+    assert record["output_tokens"] > 0
+    assert 0 <= record["ttft_seconds"] <= record["latency_seconds"]
+    assert record["cost_usd"] is None  # No price for the test model
+
+
+GOOD_ANSWER = """```python
+import weaviate
+
+client = weaviate.connect_to_local()
+client.close()
+```"""
+
+
+def test_check_generated_code():
+    assert check_generated_code(GOOD_ANSWER) == []
+    assert check_generated_code("No code here") == ["no Python code block in the answer"]
+    assert check_generated_code("```python\nclient = (\n```")[0].startswith("code does not parse")
+    made_up = "```python\nimport weaviate\nclient = weaviate.connect_to_moon()\n```"
+    assert check_generated_code(made_up) == ["unknown API weaviate.connect_to_moon"]
+
+
+def test_is_complex_prompt():
+    assert not is_complex_prompt("connect to local Weaviate")
+    assert is_complex_prompt("set up multi-tenancy with replication and a backup")
+
+
+def test_routed_session_escalates(tmp_path):
+    def routed_session(fast_answer):
+        fast = Agent(streaming_model(lambda messages: fast_answer, "fast"))
+        strong = Agent(streaming_model(lambda messages: GOOD_ANSWER, "strong"))
+        return RoutedCodeSession(fast, strong, log_path=tmp_path / "usage.jsonl")
+
+    session = routed_session(GOOD_ANSWER)
+    asyncio.run(session.ask("connect to local Weaviate"))
+    assert session.last_route == ("fast", None)
+    # Complex prompts skip the fast model
+    asyncio.run(session.ask("add multi-tenancy and replication"))
+    assert session.last_route == ("strong", "complex prompt")
+    assert session.escalation_rate == 0.5
+
+    session = routed_session("```python\nclient = (\n```")
+    assert asyncio.run(session.ask("connect to local Weaviate")) == GOOD_ANSWER
+    assert session.last_route[0] == "strong"
+    assert session.last_route[1].startswith("code does not parse")
+
+    records = [json.loads(line) for line in (tmp_path / "usage.jsonl").read_text().splitlines()]
+    assert [(r["model"], "rejected" in r, "escalated" in r) for r in records] == [
+        ("fast", False, False),
+        ("strong", False, True),
+        ("fast", True, False),
+        ("strong", False, True),
+    ]
+
+
+def test_first_valid_candidate_wins(tmp_path):
+    # Candidates differ by temperature: a quick broken answer, a valid one, and a slow one
+    behaviour = {0.0: (0.01, "```python\nclient = (\n```"), 0.5: (0.05, GOOD_ANSWER), 1.0: (5, "late")}
+    finished = []
+
+    async def stream(messages, info):
+        delay, answer = behaviour[info.model_settings["temperature"]]
+        await asyncio.sleep(delay)
+        finished.append(answer)
+        yield answer
+
+    agent = Agent(FunctionModel(stream_function=stream))
+    session = WeaviateCodeSession(agent, log_path=tmp_path / "usage.jsonl", candidates=3)
+
+    start = time.perf_counter()
+    assert asyncio.run(session.ask("connect to local Weaviate")) == GOOD_ANSWER
+    # The slow candidate was cancelled rather than awaited
+    assert time.perf_counter() - start < 2
+    assert "late" not in finished
+    assert user_prompts(session.history) == ["connect to local Weaviate"]
+
+
+def test_example_filename_never_shadows_a_package():
+    assert example_filename("references/weaviate.py") == "weaviate.example.py"
+    assert example_filename("25_rag_and_generation.py") == "25_rag_and_generation.example.py"
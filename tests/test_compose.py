@@ -0,0 +1,118 @@
+import jsonschema
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from woodhouse.compose import PROFILES, build_compose, render_compose, settings_for
+from woodhouse.weaviate_cli import weaviate
+
+# The parts of the compose specification (https://github.com/compose-spec/compose-spec)
+# that the generator uses, with the same types and patterns
+COMPOSE_SCHEMA = {
+    "type": "object",
+    "required": ["services"],
+    "additionalProperties": False,
+    "properties": {
+        "services": {
+            "type": "object",
+            "patternProperties": {"^[a-zA-Z0-9._-]+$": {"$ref": "#/definitions/service"}},
+            "additionalProperties": False,
+        },
+        "volumes": {
+            "type": "object",
+            "patternProperties": {"^[a-zA-Z0-9._-]+$": {"type": ["object", "null"]}},
+            "additionalProperties": False,
+        },
+    },
+    "definitions": {
+        "service": {
+            "type": "object",
+            "required": ["image"],
+            "additionalProperties": False,
+            "properties": {
+                "command": {"type": "array", "items": {"type": "string"}},
+                "image": {"type": "string"},
+                "hostname": {"type": "string"},
+                "ports": {"type": "array", "items": {"type": "string", "pattern": r"^\d+:\d+$"}},
+                "volumes": {"type": "array", "items": {"type": "string"}},
+                "restart": {"type": "string"},
+                "depends_on": {"type": "array", "items": {"type": "string"}, "uniqueItems": True},
+                "environment": {
+                    "type": "object",
+                    "patternProperties": {"^[A-Z][A-Z0-9_]*$": {"type": "string"}},
+                    "additionalProperties": False,
+                },
+                "deploy": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "properties": {
+                        "resources": {
+                            "type": "object",
+                            "properties": {
+                                "limits": {
+                                    "type": "object",
+                                    "additionalProperties": False,
+                                    "properties": {
+                                        "cpus": {"type": "string"},
+                                        "memory": {"type": "string", "pattern": r"^\d+[KMGT]?$"},
+                                    },
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+@pytest.mark.parametrize("profile", [None, *PROFILES])
+@pytest.mark.parametrize("nodes", [1, 3])
+def test_compose_matches_schema(profile, nodes):
+    settings = settings_for(profile, nodes=nodes, replication_factor=nodes, modules=["text2vec-ollama"])
+    compose = yaml.safe_load(render_compose(settings))
+
+    jsonschema.validate(compose, COMPOSE_SCHEMA)
+    assert len(compose["services"]) == nodes
+    # Every node's volume is declared
+    for service in compose["services"].values():
+        assert service["volumes"][0].split(":")[0] in compose["volumes"]
+
+
+def test_compose_memory_limit_in_binary_units():
+    compose = build_compose(settings_for(memory="4GiB"))
+
+    jsonschema.validate(compose, COMPOSE_SCHEMA)
+    service = compose["services"]["weaviate"]
+    assert service["deploy"]["resources"]["limits"]["memory"] == "4096M"
+    assert service["environment"]["GOMEMLIMIT"] == "3276MiB"
+
+
+def test_compose_cluster():
+    compose = build_compose(settings_for("query-heavy", nodes=3, replication_factor=3))
+    node3 = compose["services"]["weaviate-node3"]
+    assert node3["ports"] == ["8082:8080", "50053:50051"]
+    assert node3["depends_on"] == ["weaviate-node1"]
+    env = node3["environment"]
+    assert env["CLUSTER_JOIN"] == "node1:7100"
+    assert env["RAFT_JOIN"] == "node1,node2,node3"
+    assert env["REPLICATION_MINIMUM_FACTOR"] == "3"
+    assert env["GOMEMLIMIT"] == "13107MiB"  # 80% of the 16G limit
+
+
+def test_compose_command_overrides_profile(tmp_path):
+    output = tmp_path / "docker-compose.yml"
+    result = CliRunner().invoke(
+        weaviate, ["compose", "--profile", "laptop", "--gomaxprocs", "4", "--async-indexing", "-o", str(output)]
+    )
+    assert result.exit_code == 0, result.output
+
+    env = yaml.safe_load(output.read_text())["services"]["weaviate"]["environment"]
+    assert env["GOMAXPROCS"] == "4"
+    assert env["ASYNC_INDEXING"] == "true"
+    assert env["LIMIT_RESOURCES"] == "true"
+
+    result = CliRunner().invoke(weaviate, ["compose", "--nodes", "2", "--replication-factor", "3"])
+    assert result.exit_code == 2
+    assert "needs at least as many nodes" in result.output
@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from woodhouse.export import export_collection
+from woodhouse.fake_weaviate import FakeWeaviateServer
+from woodhouse.weaviate_cli import weaviate
+from woodhouse.weaviate_http import WeaviateRequestError, make_client
+
+
+def add_objects(server, count, tenant=None):
+    collection = server.collection("Article")
+    for i in range(count):
+        obj = {
+            "class": "Article",
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "properties": {"title": f"Article {i}", "word_count": i},
+            "vector": [float(i), 0.5],
+        }
+        if tenant:
+            obj["tenant"] = tenant
+            collection["multi_tenancy"] = True
+            collection["tenants"].setdefault(tenant, "ACTIVE")
+        collection["objects"][tenant, obj["id"]] = obj
+
+
+def run_export(server, output, **kwargs):
+    async def run():
+        async with make_client(server.url) as client:
+            return await export_collection(client, "Article", output, page_size=7, **kwargs)
+
+    return asyncio.run(run())
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_export_jsonl_with_vectors(tmp_path):
+    with FakeWeaviateServer() as server:
+        add_objects(server, 30)
+        counts = run_export(server, tmp_path, include_vector=True)
+    rows = read_jsonl(tmp_path / "Article.jsonl")
+    assert counts == {"": 30}
+    assert len(rows) == 30
+    assert rows[3] == {
+        "id": "00000000-0000-0000-0000-000000000003",
+        "title": "Article 3",
+        "word_count": 3,
+        "vector": [3.0, 0.5],
+    }
+
+
+def test_export_resumes_after_an_error(tmp_path, monkeypatch):
+    monkeypatch.setattr("woodhouse.weaviate_http.backoff_seconds", lambda *args: 0)
+    with FakeWeaviateServer() as server:
+        add_objects(server, 30)
+        # After the schema lookup and three pages, fail every retry of the fourth page
+        server.errors = [None] * 4 + [500] * 6
+        with pytest.raises(WeaviateRequestError):
+            run_export(server, tmp_path)
+        assert len(read_jsonl(tmp_path / "Article.jsonl")) == 21
+        server.requests.clear()
+        counts = run_export(server, tmp_path)
+        resumed_requests = len(server.requests)
+    rows = read_jsonl(tmp_path / "Article.jsonl")
+    assert counts == {"": 30}
+    assert [row["word_count"] for row in rows] == list(range(30))
+    # The schema lookup, the two pages left and the empty page that ends the export
+    assert resumed_requests == 4
+
+
+def test_export_tenants_in_parallel(tmp_path):
+    with FakeWeaviateServer() as server:
+        add_objects(server, 10, tenant="tenantA")
+        add_objects(server, 5, tenant="tenantB")
+        server.collection("Article")["tenants"]["tenantC"] = "INACTIVE"
+        counts = run_export(server, tmp_path)
+    assert counts == {"tenantA": 10, "tenantB": 5}
+    assert len(read_jsonl(tmp_path / "Article.tenantA.jsonl")) == 10
+    assert len(read_jsonl(tmp_path / "Article.tenantB.jsonl")) == 5
+
+
+def test_export_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    with FakeWeaviateServer() as server:
+        add_objects(server, 20)
+        run_export(server, tmp_path, format="parquet", include_vector=True)
+    table = pq.read_table(sorted(tmp_path.glob("Article.part-*.parquet")))
+    assert table.num_rows == 20
+    assert table.column("vector").to_pylist()[2] == [2.0, 0.5]
+
+
+def test_export_command(tmp_path):
+    output = tmp_path / "out"
+    with FakeWeaviateServer() as server:
+        add_objects(server, 12)
+        result = CliRunner().invoke(weaviate, ["export", "--collection", "Article", "--url", server.url, "-o", str(output)])
+        again = CliRunner().invoke(
+            weaviate, ["export", "--collection", "Article", "--url", server.url, "-o", str(output), "--format", "parquet"]
+        )
+    assert result.exit_code == 0, result.output
+    assert "Exported 12 objects from Article" in result.output
+    assert len(read_jsonl(output / "Article.jsonl")) == 12
+    assert again.exit_code == 1
+    assert "different settings" in again.output
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import urllib.request
+
+import pytest
+from click.testing import CliRunner
+from pydantic_ai import Agent
+from pydantic_ai.models.anthropic import AnthropicModel
+from pydantic_ai.providers.anthropic import AnthropicProvider
+
+from woodhouse.code import CACHE_SETTINGS, WeaviateCodeSession, code, get_agent
+from woodhouse.fake_anthropic import Cassette, FakeAnthropicServer
+
+
+def fake_agent(server):
+    provider = AnthropicProvider(api_key="test", base_url=server.url)
+    model = AnthropicModel("claude-fake", provider=provider)
+    return Agent(model, system_prompt="reference " * 200, model_settings=CACHE_SETTINGS)
+
+
+def ask(server, prompts, tmp_path):
+    async def run():
+        session = WeaviateCodeSession(fake_agent(server), log_path=tmp_path / "usage.jsonl")
+        return [await session.ask(prompt) for prompt in prompts], session
+
+    return asyncio.run(run())
+
+
+def post_message(server, prompt):
+    body = json.dumps({
+        "model": "claude-fake",
+        "max_tokens": 100,
+        "messages": [{"role": "user", "content": prompt}],
+    }).encode()
+    request = urllib.request.Request(f"{server.url}/v1/messages", body, {"content-type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def test_streamed_session_with_retries(tmp_path):
+    with FakeAnthropicServer(lambda request: "```python\nprint('hi')\n```", errors=[529]) as server:
+        answers, session = ask(server, ["say hi", "say it again"], tmp_path)
+
+    assert answers == ["```python\nprint('hi')\n```"] * 2
+    # The injected overload error was retried by the client
+    assert len(server.requests) == 3
+    assert all(request["stream"] for request in server.requests)
+    # The second turn reads the system prompt from the simulated cache
+    assert session.last_run["cache_read_tokens"] > 0
+
+
+def test_record_and_replay(tmp_path):
+    cassette_path = tmp_path / "cassette.json"
+    with FakeAnthropicServer(lambda request: "recorded answer") as upstream:
+        with FakeAnthropicServer(cassette=Cassette(cassette_path), mode="record", upstream=upstream.url) as recorder:
+            assert post_message(recorder, "hello")["content"][0]["text"] == "recorded answer"
+    assert len(json.loads(cassette_path.read_text())) == 1
+
+    with FakeAnthropicServer(cassette=Cassette(cassette_path), mode="replay") as replay:
+        assert post_message(replay, "hello")["content"][0]["text"] == "recorded answer"
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post_message(replay, "something else")
+        assert error.value.code == 500
+
+
+def test_bench_counts_failed_runs(monkeypatch):
+    # bench points the client at its fake API through the environment
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", "")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "fake-key")
+    get_agent.cache_clear()
+    try:
+        result = CliRunner().invoke(
+            code, ["bench", "--runs", "10", "--error-rate", "0.6", "--model", "claude-fake", "--prompt", "say hi"]
+        )
+    finally:
+        get_agent.cache_clear()
+
+    assert result.exit_code == 0, result.output
+    failed = int(result.output.split("Failed runs: ")[1].split()[0])
+    assert 0 < failed < 10
+    assert "ModelHTTPError" in result.output
+    assert "End to end: p50" in result.output
@@ -0,0 +1,79 @@
+import io
+
+import nbformat
+from nbformat.v4 import new_code_cell, new_notebook, new_output
+
+from woodhouse.git_filter import (
+    FLUSH,
+    read_content,
+    read_packet,
+    read_text_list,
+    run_filter_process,
+    run_single_file,
+    write_content,
+    write_flush,
+    write_text_list,
+)
+
+
+def make_notebook_bytes():
+    cell = new_code_cell(
+        "# BEGIN_SOLUTION\nanswer = 42\n# END_SOLUTION",
+        execution_count=1,
+        outputs=[new_output("stream", text="42")],
+    )
+    return nbformat.writes(new_notebook(cells=[cell])).encode("utf-8")
+
+
+def git_requests(*files):
+    """Builds what git writes to the filter: handshake, then one clean request per file."""
+    stream = io.BytesIO()
+    write_text_list(stream, ["git-filter-client", "version=2"])
+    write_text_list(stream, ["capability=clean", "capability=smudge", "capability=delay"])
+    for pathname, content in files:
+        write_text_list(stream, ["command=clean", f"pathname={pathname}"])
+        write_content(stream, content)
+    stream.seek(0)
+    return stream
+
+
+def test_pkt_line_roundtrip():
+    stream = io.BytesIO()
+    write_text_list(stream, ["hello", "world"])
+    write_content(stream, b"x" * 70000)
+    write_flush(stream)
+    stream.seek(0)
+
+    assert stream.getvalue().startswith(b"000ahello\n")
+    assert read_text_list(stream) == ["hello", "world"]
+    assert read_content(stream) == b"x" * 70000
+    assert read_packet(stream) is FLUSH
+
+
+def test_filter_process_cleans_each_file():
+    notebook = make_notebook_bytes()
+    stdin = git_requests(("a.ipynb", notebook), ("b.ipynb", b"not a notebook"))
+    stdout = io.BytesIO()
+
+    run_filter_process(stdin, stdout)
+
+    stdout.seek(0)
+    assert read_text_list(stdout) == ["git-filter-server", "version=2"]
+    assert read_text_list(stdout) == ["capability=clean"]
+
+    assert read_text_list(stdout) == ["status=success"]
+    cleaned = nbformat.reads(read_content(stdout).decode("utf-8"), as_version=4)
+    assert read_text_list(stdout) == []
+    assert cleaned.cells[0].source == "# ADD YOUR CODE HERE"
+    assert cleaned.cells[0].outputs == []
+
+    # A broken file fails on its own without stopping the process
+    assert read_text_list(stdout) == ["status=error"]
+    assert stdout.read() == b""
+
+
+def test_single_file_mode():
+    stdout = io.BytesIO()
+    run_single_file(io.BytesIO(make_notebook_bytes()), stdout)
+    cleaned = nbformat.reads(stdout.getvalue().decode("utf-8"), as_version=4)
+    assert cleaned.cells[0].source == "# ADD YOUR CODE HERE"
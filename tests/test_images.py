@@ -5,12 +5,13 @@ from pathlib import Path
 from click.testing import CliRunner
 
 import pytest
-from woodhouse.__main__ import crunch
+from woodhouse.__main__ import crunch, audit
+from woodhouse.images import audit_png, fit_dimensions, read_png_chunks, resize_image
 
-# Skip all tests in this file if crunch is not installed
+# Skip the compression tests if crunch is not installed
 crunch_installed = shutil.which("crunch") is not None
 
-pytestmark = pytest.mark.skipif(
+requires_crunch = pytest.mark.skipif(
     not crunch_installed,
     reason="crunch command not found, skipping image compression tests",
 )
@@ -38,6 +39,7 @@ def temp_image():
         crunched_path.unlink()
 
 
+@requires_crunch
 def test_crunch_single_image(temp_image):
     """Test crunching a single image."""
     original_size = temp_image.stat().st_size
@@ -58,3 +60,84 @@ def test_crunch_single_image(temp_image):
 
     # Cleanup is handled by the fixture, but let's double check it's clean for next test
     precrunch_path.unlink()
+
+
+@requires_crunch
+def test_crunch_with_max_width(temp_image):
+    """Oversized images are downscaled before crunching."""
+    runner = CliRunner()
+    result = runner.invoke(crunch, [str(temp_image), "--max-width", "320"])
+
+    assert result.exit_code == 0, f"CLI runner failed with output: {result.output}"
+    assert "resized from 640x402 to 320x201" in result.output
+
+    ihdr, _ = read_png_chunks(temp_image)
+    assert ihdr[:2] == (320, 201)
+    assert not temp_image.with_stem(f"{temp_image.stem}-resized").exists()
+
+
+def test_crunch_leaves_other_files_alone(tmp_path):
+    image = tmp_path / "cat.png"
+    shutil.copy(EXAMPLE_PNG, image)
+    # The user's own file, with the name the downscaled copy used to get
+    resized = tmp_path / "cat-resized.png"
+    resized.write_bytes(b"mine")
+    truncated = tmp_path / "broken.png"
+    truncated.write_bytes(EXAMPLE_PNG.read_bytes()[:20])
+
+    result = CliRunner().invoke(crunch, [str(image), "--max-width", "320"])
+    assert result.exit_code == 0, result.output
+    assert resized.read_bytes() == b"mine"
+    assert not list(tmp_path.glob(".cat-*"))
+
+    result = CliRunner().invoke(crunch, [str(truncated)])
+    assert result.exit_code == 0, result.output
+    assert f"Skipping invalid PNG file: {truncated}" in result.output
+
+
+def test_read_png_chunks():
+    """The chunk table is read without decoding the image."""
+    ihdr, chunks = read_png_chunks(EXAMPLE_PNG)
+    width, height, bit_depth, color_type = ihdr[:4]
+    assert width > 0 and height > 0
+    assert bit_depth == 8
+    assert chunks[0][0] == "IHDR"
+    assert chunks[-1][0] == "IEND"
+    assert any(chunk_type == "IDAT" for chunk_type, _ in chunks)
+
+
+def test_audit_png():
+    """Audit estimates include ancillary chunks and stay below the file size."""
+    result = audit_png(EXAMPLE_PNG)
+    assert result is not None
+    assert result.ancillary_bytes > 0
+    assert result.ancillary_bytes < result.estimated_savings < result.size
+    assert not result.already_optimized
+
+
+def test_audit_png_rejects_non_png(tmp_path):
+    not_png = tmp_path / "fake.png"
+    not_png.write_text("not a png")
+    assert audit_png(not_png) is None
+
+
+def test_fit_dimensions():
+    assert fit_dimensions(3000, 2000, 1500, None) == (1500, 1000)
+    assert fit_dimensions(3000, 2000, 1500, 500) == (750, 500)
+    assert fit_dimensions(800, 600, 1500, 1500) == (800, 600)
+    assert fit_dimensions(800, 600, None, None) == (800, 600)
+
+
+def test_resize_image(tmp_path):
+    target = tmp_path / "small.png"
+    resize_image(EXAMPLE_PNG, target, (160, 100))
+    ihdr, _ = read_png_chunks(target)
+    assert ihdr[:2] == (160, 100)
+
+
+def test_audit_cli(temp_image):
+    runner = CliRunner()
+    result = runner.invoke(audit, [str(temp_image)])
+    assert result.exit_code == 0, result.output
+    assert str(temp_image) in result.output
+    assert "Estimated savings" in result.output
@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from woodhouse.fake_weaviate import FakeWeaviateServer
+from woodhouse.ingest import BatchSizer, ingest_objects, read_objects, to_object
+from woodhouse.weaviate_cli import weaviate
+from woodhouse.weaviate_http import make_client
+
+
+def write_jsonl(path, count):
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(json.dumps({"title": f"Article {i}", "word_count": i, "embedding": [i, 0.5]}) + "\n")
+    return path
+
+
+def run_ingest(server, objects, **kwargs):
+    async def run():
+        async with make_client(server.url) as client:
+            return await ingest_objects(objects, client, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_to_object_takes_out_id_and_vectors():
+    obj = to_object(
+        {"id": "00000000-0000-0000-0000-000000000001", "title": "A", "emb": [1, 2], "title_emb": [3]},
+        "Article",
+        id_field="id",
+        vector_field="emb",
+        named_vectors={"title": "title_emb"},
+        tenant="tenantA",
+    )
+    assert obj == {
+        "class": "Article",
+        "id": "00000000-0000-0000-0000-000000000001",
+        "vector": [1.0, 2.0],
+        "vectors": {"title": [3.0]},
+        "properties": {"title": "A"},
+        "tenant": "tenantA",
+    }
+    # Without an id field, IDs are stable so re-importing upserts
+    assert to_object({"title": "A"}, "Article")["id"] == to_object({"title": "A"}, "Article")["id"]
+
+
+def test_batch_sizer_tracks_target_latency():
+    sizer = BatchSizer(initial=100, minimum=10, maximum=200, target_seconds=1.0)
+    sizer.update(0.1)
+    assert sizer.size == 151
+    sizer.update(0.1)
+    assert sizer.size == 200
+    sizer.update(0.8)
+    assert sizer.size == 200
+    sizer.update(2.0)
+    assert sizer.size == 100
+    for _ in range(5):
+        sizer.shrink(429)
+    assert sizer.size == 10
+
+
+def test_ingest_jsonl_with_vectors(tmp_path):
+    path = write_jsonl(tmp_path / "articles.jsonl", 250)
+    with FakeWeaviateServer() as server:
+        objects = read_objects(path, "Article", vector_field="embedding")
+        stats = run_ingest(server, objects, concurrency=3, sizer=BatchSizer(initial=20, minimum=5))
+        stored = server.objects("Article")
+    assert stats.imported == stats.read == 250
+    assert not stats.failed
+    assert stats.objects_per_second > 0
+    assert len(stored) == 250
+    assert all(len(obj["vector"]) == 2 and "embedding" not in obj["properties"] for obj in stored)
+
+
+def test_ingest_retries_requests_and_objects(tmp_path, monkeypatch):
+    monkeypatch.setattr("woodhouse.weaviate_http.backoff_seconds", lambda *args: 0)
+    monkeypatch.setattr("woodhouse.ingest.backoff_seconds", lambda *args: 0)
+    path = write_jsonl(tmp_path / "articles.jsonl", 100)
+    with FakeWeaviateServer(errors=[503, 429], object_error_rate=0.2) as server:
+        sizer = BatchSizer(initial=40, minimum=5)
+        stats = run_ingest(server, read_objects(path, "Article"), concurrency=2, sizer=sizer, retries=10)
+        stored = server.objects("Article")
+    assert stats.imported == 100
+    assert stats.retried > 0
+    assert len(stored) == 100
+
+
+def test_ingest_reports_objects_that_keep_failing(tmp_path, monkeypatch):
+    monkeypatch.setattr("woodhouse.ingest.backoff_seconds", lambda *args: 0)
+    path = write_jsonl(tmp_path / "articles.jsonl", 10)
+    with FakeWeaviateServer(object_error_rate=1.0) as server:
+        stats = run_ingest(server, read_objects(path, "Article"), retries=1)
+    assert stats.imported == 0
+    assert len(stats.failed) == 10
+    assert stats.failed[0][1] == "injected object error"
+
+
+def test_ingest_parquet_with_npy_vectors(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    pq.write_table(pa.table({"title": [f"Article {i}" for i in range(30)]}), tmp_path / "articles.parquet")
+    np.save(tmp_path / "vectors.npy", np.arange(90, dtype="float32").reshape(30, 3))
+    with FakeWeaviateServer() as server:
+        objects = read_objects(tmp_path / "articles.parquet", "Article", vectors_path=tmp_path / "vectors.npy")
+        stats = run_ingest(server, objects)
+        stored = {obj["properties"]["title"]: obj["vector"] for obj in server.objects("Article")}
+    assert stats.imported == 30
+    assert stored["Article 2"] == [6.0, 7.0, 8.0]
+
+
+def test_ingest_rejects_vectors_that_dont_match_records(tmp_path):
+    path = write_jsonl(tmp_path / "articles.jsonl", 5)
+    np.save(tmp_path / "vectors.npy", np.zeros((4, 3), dtype="float32"))
+    result = CliRunner().invoke(
+        weaviate,
+        ["ingest", str(path), "--collection", "Article", "--vectors", str(tmp_path / "vectors.npy")],
+    )
+    assert result.exit_code == 2
+    assert "vectors.npy has 4 vectors for 5 records in articles.jsonl" in result.output
+
+
+def test_ingest_command(tmp_path):
+    path = write_jsonl(tmp_path / "articles.jsonl", 50)
+    with FakeWeaviateServer() as server:
+        result = CliRunner().invoke(
+            weaviate,
+            ["ingest", str(path), "--collection", "Article", "--url", server.url, "--vector-field", "embedding"],
+        )
+        assert len(server.objects("Article")) == 50
+    assert result.exit_code == 0, result.output
+    assert "Imported 50 of 50 objects" in result.output
@@ -0,0 +1,258 @@
+import base64
+import os
+from pathlib import Path
+
+import nbformat
+import pytest
+from click.testing import CliRunner
+from nbformat.v4 import new_code_cell, new_markdown_cell, new_notebook, new_output
+
+from woodhouse.__main__ import cli
+from woodhouse.images import CrunchNotFoundError
+from woodhouse.notebooks import (
+    crunch_notebook_images,
+    crunch_notebooks,
+    prune_notebook_outputs,
+    strip_solutions_from_notebook,
+    transform_notebook,
+    watch_notebooks,
+    write_notebook_artifacts,
+)
+
+CWD = Path(__file__).parent
+EXAMPLE_PNG = CWD / "catexample.png"
+
+
+def write_notebook(path, cells):
+    nb = new_notebook(cells=cells)
+    with open(path, "w") as f:
+        nbformat.write(nb, f)
+    return path
+
+
+def read_notebook(path):
+    with open(path) as f:
+        return nbformat.read(f, as_version=4)
+
+
+def test_strip_solutions(tmp_path):
+    source = "x = 1\n# BEGIN_SOLUTION\ny = x + 1\n# END_SOLUTION\nprint(y)"
+    cell = new_code_cell(source, execution_count=3, outputs=[new_output("stream", text="2")])
+    input_path = write_notebook(tmp_path / "lesson-complete.ipynb", [cell])
+    output_path = tmp_path / "lesson.ipynb"
+
+    assert strip_solutions_from_notebook(str(input_path), str(output_path))
+
+    stripped = read_notebook(output_path).cells[0]
+    assert stripped.source == "x = 1\n# ADD YOUR CODE HERE\nprint(y)"
+    assert stripped.outputs == []
+    assert stripped.execution_count is None
+
+
+def test_strip_solutions_skips_unchanged_output(tmp_path):
+    cell = new_code_cell("# BEGIN_SOLUTION\ny = 2\n# END_SOLUTION")
+    input_path = write_notebook(tmp_path / "lesson-complete.ipynb", [cell])
+    output_path = tmp_path / "lesson.ipynb"
+
+    assert strip_solutions_from_notebook(str(input_path), str(output_path))
+    os.utime(output_path, ns=(0, 0))
+
+    assert not strip_solutions_from_notebook(str(input_path), str(output_path))
+    assert output_path.stat().st_mtime_ns == 0
+
+
+def test_crunch_notebook_images(tmp_path):
+    png = EXAMPLE_PNG.read_bytes()
+    encoded = base64.b64encode(png).decode("ascii") + "\n"
+    output = new_output("display_data", data={"image/png": encoded, "text/plain": "<Figure>"})
+    markdown = new_markdown_cell("![cat](attachment:cat.png)")
+    markdown.attachments = {"cat.png": {"image/png": encoded}}
+    input_path = write_notebook(
+        tmp_path / "images.ipynb", [new_code_cell("plot()", outputs=[output]), markdown]
+    )
+
+    # Shrink only the first image; the second "optimization" makes it bigger
+    calls = []
+
+    def fake_optimize(data):
+        calls.append(data)
+        return data[:100] if len(calls) == 1 else data + b"padding"
+
+    stats = crunch_notebook_images(input_path, optimize=fake_optimize)
+
+    assert stats["images"] == 2
+    assert stats["replaced"] == 1
+    assert stats["original_bytes"] == 2 * len(png)
+    assert stats["crunched_bytes"] == len(png) + 100
+
+    nb = read_notebook(input_path)
+    output_data = nb.cells[0].outputs[0].data["image/png"]
+    assert base64.b64decode(output_data) == png[:100]
+    assert output_data.endswith("\n")
+    assert nb.cells[1].attachments["cat.png"]["image/png"] == encoded
+
+
+def test_crunch_notebooks_reports_failures_and_carries_on(tmp_path):
+    png = base64.b64encode(EXAMPLE_PNG.read_bytes()).decode("ascii")
+    paths = []
+    for name, encoded in (("bad", "not base64!"), ("good", png)):
+        output = new_output("display_data", data={"image/png": encoded})
+        paths.append(write_notebook(tmp_path / f"{name}.ipynb", [new_code_cell("plot()", outputs=[output])]))
+
+    missing = tmp_path / "missing.ipynb"
+    results = list(crunch_notebooks([*paths, missing], workers=2, optimize=lambda data: data[:100]))
+
+    assert results[0]["path"] == str(paths[0])
+    assert results[0]["error"].startswith("Error: ")
+    assert results[1]["replaced"] == 1
+    assert results[2]["error"].startswith("FileNotFoundError: ")
+
+
+def test_crunch_notebooks_stops_when_crunch_is_missing(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    encoded = base64.b64encode(EXAMPLE_PNG.read_bytes()).decode("ascii")
+    output = new_output("display_data", data={"image/png": encoded})
+    path = write_notebook(tmp_path / "images.ipynb", [new_code_cell("plot()", outputs=[output])])
+
+    with pytest.raises(CrunchNotFoundError):
+        list(crunch_notebooks([path]))
+
+
+def make_heavy_notebook(path):
+    png = base64.b64encode(EXAMPLE_PNG.read_bytes()).decode("ascii")
+    small = new_output("stream", text="small output\n")
+    large = new_output("display_data", data={"image/png": png, "text/plain": "<Figure>"})
+    return write_notebook(path, [new_code_cell("plot()", outputs=[small, large])])
+
+
+def test_prune_notebook_outputs(tmp_path):
+    input_path = make_heavy_notebook(tmp_path / "heavy.ipynb")
+
+    stats = prune_notebook_outputs(input_path, max_output_bytes=10_000)
+
+    assert stats["pruned"] == 1
+    assert stats["after_bytes"] < stats["before_bytes"]
+    outputs = read_notebook(input_path).cells[0].outputs
+    assert len(outputs) == 1
+    assert outputs[0].text == "small output\n"
+    assert not (tmp_path / "heavy_outputs").exists()
+
+
+def test_prune_notebook_outputs_externalize(tmp_path):
+    input_path = make_heavy_notebook(tmp_path / "heavy.ipynb")
+
+    prune_notebook_outputs(input_path, max_output_bytes=10_000, externalize=True)
+
+    outputs = read_notebook(input_path).cells[0].outputs
+    assert len(outputs) == 2
+    external_files = list((tmp_path / "heavy_outputs").glob("*.png"))
+    assert len(external_files) == 1
+    assert external_files[0].read_bytes() == EXAMPLE_PNG.read_bytes()
+    assert f"heavy_outputs/{external_files[0].name}" in outputs[1].data["text/markdown"]
+
+
+def test_watch_notebooks_debounces(tmp_path):
+    source = write_notebook(tmp_path / "lesson-complete.ipynb", [new_code_cell("x = 1")])
+    write_notebook(tmp_path / "other.ipynb", [new_code_cell("y = 2")])
+    changes = []
+    polls = []
+
+    def stop():
+        polls.append(None)
+        if len(polls) == 3:
+            # A burst of saves, as Jupyter autosave would do
+            for i in range(3):
+                write_notebook(source, [new_code_cell(f"x = {i * 100}")])
+            write_notebook(tmp_path / "other.ipynb", [new_code_cell("y = 3")])
+        return len(polls) > 30
+
+    watch_notebooks(tmp_path, changes.append, debounce=0.05, poll_interval=0.01, stop=stop)
+
+    assert changes == [source]
+
+
+def test_transform_notebook(tmp_path):
+    cell = new_code_cell(
+        "# BEGIN_SOLUTION\nx = 1\n# END_SOLUTION",
+        execution_count=1,
+        outputs=[new_output("stream", text="1")],
+        metadata={"tags": ["exercise"], "execution": {"iopub.status.idle": "2024-01-01"}},
+    )
+    input_path = write_notebook(tmp_path / "in.ipynb", [cell])
+    output_path = tmp_path / "out.ipynb"
+
+    changed, timings = transform_notebook(
+        input_path, output_path, ["strip-solutions", "clear-metadata"]
+    )
+
+    assert changed
+    assert set(timings) == {"load", "strip-solutions", "clear-metadata", "save"}
+    result = read_notebook(output_path).cells[0]
+    assert result.source == "# ADD YOUR CODE HERE"
+    assert result.metadata == {"tags": ["exercise"]}
+    # Transforms that were not selected leave the cell alone
+    assert result.execution_count == 1
+    assert len(result.outputs) == 1
+
+
+def test_write_notebook_artifacts(tmp_path):
+    cells = [
+        new_markdown_cell("# Exercise"),
+        new_code_cell("import math"),
+        new_code_cell(
+            "x = 2\n# BEGIN_SOLUTION\ny = math.sqrt(x)\n# END_SOLUTION\nprint(y)",
+            execution_count=2,
+            outputs=[new_output("stream", text="1.41")],
+        ),
+    ]
+    input_path = write_notebook(tmp_path / "lesson-complete.ipynb", cells)
+    paths = {
+        "student": tmp_path / "lesson.ipynb",
+        "answers": tmp_path / "lesson-answers.ipynb",
+        "instructor": tmp_path / "lesson-instructor.ipynb",
+    }
+
+    written = write_notebook_artifacts(input_path, paths)
+    assert written == {"student": True, "answers": True, "instructor": True}
+
+    student = read_notebook(paths["student"])
+    assert student.cells[2].source == "x = 2\n# ADD YOUR CODE HERE\nprint(y)"
+
+    answers = read_notebook(paths["answers"])
+    assert [cell.source for cell in answers.cells] == ["x = 2\ny = math.sqrt(x)\nprint(y)"]
+    assert answers.cells[0].outputs == []
+
+    instructor = read_notebook(paths["instructor"])
+    assert instructor.cells[2].source == cells[2].source
+    assert instructor.cells[2].outputs == []
+    assert instructor.cells[2].execution_count is None
+
+    # Nothing changed, so nothing is rewritten
+    assert not any(write_notebook_artifacts(input_path, paths).values())
+
+
+def test_transform_command_only_overwrites_with_in_place(tmp_path):
+    solution = new_code_cell("# BEGIN_SOLUTION\nx = 1\n# END_SOLUTION")
+    source = write_notebook(tmp_path / "lesson-complete.ipynb", [solution])
+    write_notebook(tmp_path / "lesson.ipynb", [new_code_cell("old")])
+    notes = write_notebook(tmp_path / "notes.ipynb", [solution])
+
+    def transform(*args):
+        return CliRunner().invoke(cli, ["notebook", "transform", str(tmp_path), *args])
+
+    # By default only the student notebook is written, next to its source
+    result = transform("--strip-solutions")
+    assert result.exit_code == 0, result.output
+    assert read_notebook(source).cells[0].source == solution.source
+    assert read_notebook(tmp_path / "lesson.ipynb").cells[0].source == "# ADD YOUR CODE HERE"
+    assert read_notebook(notes).cells[0].source == solution.source
+    assert "Updated 1 of 1 notebooks" in result.output
+
+    result = transform("--clear-outputs")
+    assert "--in-place" in result.output
+
+    result = transform("--strip-solutions", "--in-place")
+    assert result.exit_code == 0, result.output
+    assert read_notebook(notes).cells[0].source == "# ADD YOUR CODE HERE"
+    # '-complete' sources are still never stripped
+    assert read_notebook(source).cells[0].source == solution.source
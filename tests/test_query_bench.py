@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from woodhouse.fake_weaviate import FakeWeaviateServer
+from woodhouse.query_bench import DEFAULT_WORKLOAD, build_query, graphql_value, run_workload
+from woodhouse.weaviate_cli import weaviate
+from woodhouse.weaviate_http import make_client
+
+
+def test_build_query_formats_filters_as_graphql():
+    query = build_query("Article", DEFAULT_WORKLOAD[3])
+    assert query.startswith('{ Get { Article(nearText: {concepts: ["technology innovation"]}, where: {operator: And')
+    assert '{path: ["word_count"], operator: GreaterThan, valueInt: 1000}' in query
+    assert "valueBoolean: true" in query
+    assert "limit: 5" in query
+    assert graphql_value({"query": 'say "hi"', "alpha": 0.5}) == '{query: "say \\"hi\\"", alpha: 0.5}'
+    with pytest.raises(ValueError, match="Unknown query type"):
+        build_query("Article", {"type": "near_image"})
+
+
+def test_run_workload_reports_each_query_type():
+    with FakeWeaviateServer() as server:
+        async def run():
+            async with make_client(server.url) as client:
+                return await run_workload(client, "Article", DEFAULT_WORKLOAD, concurrency=4, requests=50)
+
+        summary = asyncio.run(run())
+    results = summary["results"]
+    assert set(results) == {"near_text", "bm25", "hybrid", "fetch", "all"}
+    assert results["all"]["requests"] == 50
+    assert results["near_text"]["requests"] == 20
+    assert results["all"]["errors"] == 0
+    assert results["all"]["p50_ms"] <= results["all"]["p95_ms"] <= results["all"]["p99_ms"]
+
+
+def test_warmup_cycles_through_the_workload():
+    with FakeWeaviateServer() as server:
+        async def run():
+            async with make_client(server.url) as client:
+                return await run_workload(client, "Article", DEFAULT_WORKLOAD, requests=10, warmup=12)
+
+        summary = asyncio.run(run())
+        graphql_requests = server.requests.count(("POST", "/v1/graphql"))
+    # Warmup queries aren't part of the results
+    assert summary["results"]["all"]["requests"] == 10
+    assert graphql_requests == 12 + 10
+
+
+def test_target_qps_paces_queries():
+    with FakeWeaviateServer() as server:
+        async def run():
+            async with make_client(server.url) as client:
+                return await run_workload(client, "Article", DEFAULT_WORKLOAD, qps=50, requests=20)
+
+        summary = asyncio.run(run())
+    # 20 queries at 50/s are scheduled over 0.38 s
+    assert summary["seconds"] >= 0.38
+    assert summary["results"]["all"]["requests"] == 20
+
+
+def test_bench_command_writes_json(tmp_path):
+    output = tmp_path / "results.json"
+    with FakeWeaviateServer(errors=[503]) as server:
+        result = CliRunner().invoke(
+            weaviate,
+            ["bench", "--url", server.url, "--requests", "10", "--label", "ef-64", "-o", str(output)],
+        )
+    assert result.exit_code == 0, result.output
+    assert "hybrid" in result.output
+    report = json.loads(output.read_text())
+    assert report["label"] == "ef-64"
+    assert report["results"]["all"]["requests"] == 10
+    # Errors are counted, not retried, so they show in the results
+    assert report["results"]["all"]["errors"] == 1
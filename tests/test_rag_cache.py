@@ -0,0 +1,144 @@
+import pytest
+from pydantic import BaseModel
+
+from woodhouse.rag_cache import GenerativeCache, normalize_query, params_key
+
+
+class FakeGenerate:
+    def __init__(self):
+        self.calls = []
+
+    def near_text(self, query, **params):
+        self.calls.append((query, params))
+        return f"answer {len(self.calls)}"
+
+
+class FakeCollection:
+    name = "Article"
+
+    def __init__(self):
+        self.generate = FakeGenerate()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_query():
+    assert normalize_query("  What is  RAG? ") == normalize_query("what is rag") == "what is rag"
+
+
+def test_exact_hits_share_query_and_parameters():
+    collection = FakeCollection()
+    cache = GenerativeCache(collection)
+    first = cache.near_text("What is RAG?", single_prompt="{title}", limit=2)
+    assert cache.near_text("what is rag", single_prompt="{title}", limit=2) == first
+    assert cache.near_text("What is RAG?", single_prompt="{title}", limit=3) != first
+    assert len(collection.generate.calls) == 2
+    assert cache.stats.hits == 1
+    assert cache.stats.hit_rate == pytest.approx(1 / 3)
+
+
+# Stand-ins shaped like weaviate-client's query arguments: GenerativeConfig.openai()
+# returns a pydantic model, and Filter values are combined into plain objects
+class OpenAIConfig(BaseModel):
+    model: str
+    temperature: float | None = None
+
+
+class GenerativeConfig(BaseModel):
+    generative: OpenAIConfig
+
+
+class FilterValue:
+    def __init__(self, target, operator, value):
+        self.target = target
+        self.operator = operator
+        self.value = value
+
+
+class FilterAnd:
+    def __init__(self, filters):
+        self.filters = filters
+
+
+def make_params(category="Technology", temperature=0.2):
+    return {
+        "filters": FilterAnd([FilterValue("category", "Equal", category), FilterValue("word_count", "GreaterThan", 1000)]),
+        "generative_provider": GenerativeConfig(generative=OpenAIConfig(model="gpt-4o-mini", temperature=temperature)),
+        "limit": 2,
+    }
+
+
+def test_filters_and_provider_configs_are_part_of_the_key():
+    collection = FakeCollection()
+    cache = GenerativeCache(collection)
+    first = cache.near_text("What is RAG?", **make_params())
+    # Equal objects built separately share an entry
+    assert cache.near_text("What is RAG?", **make_params()) == first
+    assert cache.near_text("What is RAG?", **make_params(category="Science")) != first
+    assert cache.near_text("What is RAG?", **make_params(temperature=0.9)) != first
+    assert len(collection.generate.calls) == 3
+    assert params_key(make_params()) == params_key(make_params())
+
+
+def test_parameters_without_a_stable_form_are_rejected():
+    collection = FakeCollection()
+    cache = GenerativeCache(collection)
+    with pytest.raises(TypeError, match="cache key"):
+        cache.near_text("What is RAG?", filters=object())
+    assert not collection.generate.calls
+
+
+def test_entries_expire_and_are_evicted_least_recently_used_first():
+    collection = FakeCollection()
+    clock = Clock()
+    cache = GenerativeCache(collection, max_entries=2, ttl=60, clock=clock)
+    cache.near_text("a")
+    cache.near_text("b")
+    cache.near_text("a")  # a is now the most recently used
+    cache.near_text("c")  # evicts b
+    assert cache.stats.evictions == 1
+    cache.near_text("a")
+    assert cache.stats.hits == 2
+    cache.near_text("b")
+    assert cache.stats.misses == 4
+
+    clock.now = 61
+    cache.near_text("a")
+    assert cache.stats.misses == 5
+
+
+def test_collection_version_is_part_of_the_key():
+    collection = FakeCollection()
+    version = {"value": 1}
+    cache = GenerativeCache(collection, version=lambda: version["value"])
+    cache.near_text("a")
+    version["value"] = 2
+    cache.near_text("a")
+    cache.bump_version()
+    cache.near_text("a")
+    assert cache.stats.misses == 3
+
+
+def test_similar_queries_hit_within_the_same_parameters():
+    vectors = {
+        "benefits of ai in healthcare": [1.0, 0.0, 0.1],
+        "how does ai help healthcare": [0.98, 0.0, 0.2],
+        "solar power": [0.0, 1.0, 0.0],
+    }
+    collection = FakeCollection()
+    cache = GenerativeCache(collection, embed=vectors.__getitem__, similarity=0.95)
+    first = cache.near_text("benefits of ai in healthcare", limit=1)
+    assert cache.near_text("how does ai help healthcare", limit=1) == first
+    assert cache.near_text("solar power", limit=1) != first
+    assert cache.near_text("how does ai help healthcare", limit=2) != first
+    assert cache.stats.similar_hits == 1
+    assert len(collection.generate.calls) == 3
+
+    with pytest.raises(ValueError, match="embed"):
+        GenerativeCache(collection, similarity=0.9)
@@ -0,0 +1,70 @@
+import ast
+import importlib.resources
+
+from woodhouse.code import load_reference
+from woodhouse.reference_compiler import compile_reference, estimate_tokens
+
+SOURCE = '''"""
+Module docstring that the model doesn't need
+"""
+
+# ========================
+# 1. CLIENT INSTANTIATION
+# ========================
+# For more information, see the client page: https://docs.weaviate.io/client
+
+import weaviate
+
+# Connect to local instance
+client = weaviate.connect_to_local(
+    headers={"X-Key": "key"}  # Add keys as needed
+)
+
+# Connect again
+import weaviate
+client = weaviate.connect_to_local(
+    headers={"X-Key": "key"}  # Add keys as needed
+)
+
+# ========================
+# 2. COLLECTIONS
+# ========================
+
+import weaviate
+
+# Get a collection
+collection = client.collections.use("Article")
+'''
+
+
+def test_compile_reference():
+    assert compile_reference(SOURCE) == (
+        "# 1. Client Instantiation\n"
+        "# Docs: https://docs.weaviate.io/client\n"
+        "import weaviate\n"
+        "\n"
+        "# Connect to local instance\n"
+        "client = weaviate.connect_to_local(\n"
+        '    headers={"X-Key": "key"}  # Add keys as needed\n'
+        ")\n"
+        "\n"
+        "# 2. Collections\n"
+        "# Get a collection\n"
+        "collection = client.collections.use('Article')\n"
+    )
+
+
+def test_compiled_reference(record_property):
+    source = (importlib.resources.files("woodhouse") / "references" / "weaviate.py").read_text()
+    compiled = load_reference()
+    before, after = estimate_tokens(source), estimate_tokens(compiled)
+    reduction = 1 - after / before
+    record_property("token_reduction", f"{before} -> {after} ({reduction:.0%})")
+    print(f"Reference tokens (estimated): {before} -> {after} ({reduction:.0%} fewer)")
+    assert reduction > 0.1
+
+    # Every snippet of the compiled reference still parses on its own
+    blocks = compiled.split("\n\n")
+    assert len(blocks) > 50
+    for block in blocks:
+        ast.parse(block)
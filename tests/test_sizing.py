@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from woodhouse.sizing import compressed_bytes, estimate, nodes_needed, parse_count, sweep
+from woodhouse.weaviate_cli import weaviate
+
+GiB = 1024**3
+
+
+def test_parse_count():
+    assert parse_count("250k") == 250_000
+    assert parse_count("10M") == 10_000_000
+    assert parse_count("1.5B") == 1_500_000_000
+    assert parse_count("1,000") == 1000
+    with pytest.raises(ValueError):
+        parse_count("lots")
+
+
+def test_quantization_compresses_vectors():
+    sizes = compressed_bytes(1536, np.array(["none", "rq", "sq", "pq", "bq"]))
+    assert sizes.tolist() == [6144, 1552, 1536, 384, 192]
+
+
+def test_uncompressed_hnsw_matches_the_docs_rule_of_thumb():
+    # 1M 1536-dim vectors with maxConnections 64: 1e6 x (1536 x 4 B + 64 x 10 B) = 6.8 GB
+    sizes = estimate(1_000_000, 1536, max_connections=64, object_bytes=0)
+    assert sizes["memory"] == pytest.approx(6.784e9)
+    assert sizes["valid"]
+
+
+def test_estimate_broadcasts_over_settings():
+    sizes = estimate(
+        1_000_000,
+        768,
+        named_vectors=2,
+        index=np.array(["hnsw", "flat", "flat", "dynamic", "dynamic"]),
+        quantization=np.array(["rq", "none", "pq", "bq", "bq"]),
+        tenants=np.array([1, 1, 1, 1000, 10]),
+    )
+    memory = sizes["memory"]
+    assert sizes["valid"].tolist() == [True, True, False, True, True]
+    # Flat keeps nothing in memory without BQ; a dynamic index over small tenants stays flat
+    assert memory[1] == 0
+    assert memory[3] == 1_000_000 * 2 * 96
+    assert memory[4] > memory[3]
+    assert (sizes["disk"] > memory).all()
+
+
+def test_sweep_prefers_the_best_recall_that_fits():
+    options = sweep(10_000_000, 1536, memory_budget=16 * GiB)
+    best = options[0]
+    assert best["fits"]
+    assert best["memory_per_node"] <= 16 * GiB * 0.8
+    # Uncompressed vectors alone are 57 GiB, so the best fit is compressed
+    assert best["quantization"] != "none"
+    assert not any(option["index"] == "flat" for option in options)
+    assert all(option["fits"] for option in options[: sum(o["fits"] for o in options)])
+
+
+def test_sweep_reports_nodes_needed_when_nothing_fits():
+    options = sweep(1_000_000_000, 1536, memory_budget=64 * GiB, nodes=3, replication_factor=3)
+    assert not any(option["fits"] for option in options)
+    assert options[0]["nodes_needed"] == min(option["nodes_needed"] for option in options)
+    assert nodes_needed(100 * GiB, 64 * GiB, replication_factor=3) == 6
+
+
+def test_size_command():
+    result = CliRunner().invoke(
+        weaviate, ["size", "--objects", "10M", "--dimensions", "1536", "--memory-budget", "16G"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Memory: 60.2 GB in total" in result.output
+    assert "This needs 5 nodes" in result.output
+    assert "Settings that fit on 1 node(s)" in result.output
+
+    result = CliRunner().invoke(
+        weaviate, ["size", "--objects", "1M", "--dimensions", "768", "--index", "flat", "--quantization", "pq"]
+    )
+    assert result.exit_code == 2
+    assert "only supports BQ" in result.output
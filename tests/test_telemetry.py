@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+from click.testing import CliRunner
+
+from woodhouse.telemetry import estimate_cost, percentile, read_runs, record_run, stats
+
+
+def test_percentile():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 5
+    assert percentile([], 50) is None
+
+
+def test_estimate_cost_separates_cached_tokens():
+    counts = {
+        "input_tokens": 11_000,
+        "output_tokens": 1_000,
+        "cache_read_tokens": 10_000,
+        "cache_write_tokens": 0,
+    }
+    # 1k uncached input at $3/M, 10k cached at $0.30/M, 1k output at $15/M
+    assert estimate_cost("claude-3-5-sonnet-latest", counts) == (3_000 + 3_000 + 15_000) / 1e6
+    assert estimate_cost("some-other-model", counts) is None
+
+
+def test_stats_command(tmp_path, monkeypatch):
+    log_path = tmp_path / "usage.jsonl"
+    monkeypatch.setenv("WOODHOUSE_USAGE_LOG", str(log_path))
+    usage = SimpleNamespace(input_tokens=1000, output_tokens=200, cache_read_tokens=0, cache_write_tokens=0)
+    for latency in (1.0, 2.0, 3.0):
+        record_run("claude-3-5-haiku-latest", usage, 0.5, latency)
+
+    assert len(read_runs()) == 3
+
+    result = CliRunner().invoke(stats, ["--by", "model"])
+    assert result.exit_code == 0, result.output
+    assert "claude-3-5-haiku-latest" in result.output
+    assert "p50 2.00 s" in result.output
+    assert "p95 3.00 s" in result.output
@@ -0,0 +1,48 @@
+import ast
+
+import pytest
+
+from woodhouse.templates import TemplateError, example_files, load_template, render_text
+
+
+def test_default_render_only_removes_markers():
+    for path in example_files():
+        text = path.read_text()
+        rendered = render_text(text)
+        assert "woodhouse:" not in rendered
+        kept = [line for line in text.splitlines() if "woodhouse:" not in line]
+        # Value markers keep their line, minus the marker comment
+        assert len(rendered.splitlines()) == len(kept) + text.count("# woodhouse:value")
+        if path.suffix == ".py":
+            ast.parse(rendered)
+
+
+def test_render_quick_setup():
+    template = load_template("10")
+    assert set(template.parameters) == {"collection", "vectorizer", "cloud", "properties"}
+
+    code = template.render(
+        collection="Movie", vectorizer="ollama", cloud=True, properties="title:text,year:int"
+    )
+
+    ast.parse(code)
+    assert 'collection_name = "Movie"' in code
+    assert "Configure.Vectors.text2vec_ollama(" in code
+    assert "connect_to_weaviate_cloud(" in code
+    assert "X-OpenAI-Api-Key" not in code
+    assert 'Property(name="year", data_type=DataType.INT)' in code
+    # Generated sample data replaces the hand-written articles
+    assert '"year": 100' in code
+    assert "Dr. Sarah Johnson" not in code
+    assert code == template.render(
+        collection="Movie", vectorizer="ollama", cloud=True, properties="title:text,year:int"
+    )
+
+
+def test_render_errors():
+    with pytest.raises(TemplateError, match="no parameter collection"):
+        load_template("20").render(collection="Movie")
+    with pytest.raises(TemplateError, match="Unknown data type"):
+        load_template("quick-setup").render(properties="title:varchar")
+    with pytest.raises(TemplateError, match="No example"):
+        load_template("99")
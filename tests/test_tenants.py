@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from woodhouse.fake_weaviate import FakeWeaviateServer
+from woodhouse.tenants import apply_tenant_action, read_tenant_names
+from woodhouse.weaviate_cli import weaviate
+from woodhouse.weaviate_http import make_client
+
+
+def run_action(server, names, action, **kwargs):
+    async def run():
+        async with make_client(server.url) as client:
+            return await apply_tenant_action(client, "Article", names, action, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_read_tenant_names(tmp_path):
+    (tmp_path / "tenants.txt").write_text("# customers\ntenantA\n\ntenantB\ntenantA\n")
+    (tmp_path / "tenants.csv").write_text("region,name\neu,tenantA\nus,tenantB\n")
+    (tmp_path / "tenants.json").write_text(json.dumps(["tenantA", {"name": "tenantB"}]))
+    (tmp_path / "tenants.jsonl").write_text('{"name": "tenantA"}\n"tenantB"\n')
+    for name in ("tenants.txt", "tenants.csv", "tenants.json", "tenants.jsonl"):
+        assert read_tenant_names(tmp_path / name) == ["tenantA", "tenantB"]
+
+
+def test_read_tenant_names_rejects_bad_items(tmp_path):
+    (tmp_path / "tenants.jsonl").write_text('"tenantA"\n{"id": "tenantB"}\n')
+    (tmp_path / "tenants.json").write_text(json.dumps(["tenantA", 42]))
+    for name, where in (("tenants.jsonl", "tenants.jsonl line 2"), ("tenants.json", "tenants.json item 1")):
+        with pytest.raises(ValueError, match=where):
+            read_tenant_names(tmp_path / name)
+
+    result = CliRunner().invoke(weaviate, ["tenants", "create", str(tmp_path / "tenants.jsonl"), "--collection", "Article"])
+    assert result.exit_code == 2
+    assert 'tenants.jsonl line 2: expected a tenant name or an object with a "name"' in result.output
+
+
+def test_bulk_create_and_change_status():
+    names = [f"tenant{i:04d}" for i in range(250)]
+    with FakeWeaviateServer() as server:
+        result = run_action(server, names, "create", chunk_size=40, concurrency=3)
+        assert result.changed == 250
+        # 250 tenants in chunks of 40
+        assert server.requests.count(("POST", "/v1/schema/Article/tenants")) == 7
+
+        result = run_action(server, names[:100], "deactivate", chunk_size=40)
+        assert result.changed == 100
+        result = run_action(server, names[:50], "offload")
+        tenants = server.collection("Article")["tenants"]
+        # Creating again skips the existing ones
+        again = run_action(server, names[:10] + ["tenantNew"], "create")
+    assert result.changed == 50
+    assert tenants["tenant0000"] == "OFFLOADED"
+    assert tenants["tenant0099"] == "INACTIVE"
+    assert tenants["tenant0100"] == "ACTIVE"
+    assert (again.changed, again.skipped) == (1, 10)
+
+
+def test_retries_and_reports_failures(monkeypatch):
+    monkeypatch.setattr("woodhouse.weaviate_http.backoff_seconds", lambda *args: 0)
+    names = [f"tenant{i}" for i in range(30)]
+    with FakeWeaviateServer(errors=[None, 503, 429]) as server:
+        result = run_action(server, names, "create", chunk_size=10)
+    assert result.changed == 30
+    assert not result.failed
+
+    with FakeWeaviateServer(errors=[None] + [503] * 3) as server:
+        result = run_action(server, names, "create", chunk_size=10, concurrency=1, retries=2)
+    assert result.changed == 20
+    assert result.failed_count == 10
+
+
+def test_tenants_command(tmp_path):
+    path = tmp_path / "tenants.txt"
+    path.write_text("\n".join(f"tenant{i}" for i in range(20)))
+    with FakeWeaviateServer() as server:
+        create = CliRunner().invoke(
+            weaviate, ["tenants", "create", str(path), "--collection", "Article", "--url", server.url, "--status", "INACTIVE"]
+        )
+        activate = CliRunner().invoke(
+            weaviate, ["tenants", "activate", str(path), "--collection", "Article", "--url", server.url]
+        )
+        tenants = dict(server.collection("Article")["tenants"])
+        path.write_text("tenant1\nunknown\n")
+        offload = CliRunner().invoke(
+            weaviate, ["tenants", "offload", str(path), "--collection", "Article", "--url", server.url]
+        )
+    assert create.exit_code == 0, create.output
+    assert "create: 20 changed, 0 already done, of 20 tenants" in create.output
+    assert activate.exit_code == 0, activate.output
+    assert set(tenants.values()) == {"ACTIVE"}
+    assert offload.exit_code == 1
+    assert "1 tenants don't exist, e.g. unknown" in offload.output
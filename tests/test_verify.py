@@ -0,0 +1,83 @@
+import asyncio
+
+import nbformat
+from nbformat.v4 import new_code_cell, new_markdown_cell, new_notebook
+
+from woodhouse.verify import KernelPool, cells_to_run, verify_notebooks
+
+
+def write_notebook(path, cells):
+    with open(path, "w") as f:
+        nbformat.write(new_notebook(cells=cells), f)
+    return path
+
+
+def test_cells_to_run_stops_at_placeholder():
+    nb = new_notebook(
+        cells=[
+            new_code_cell("x = 1"),
+            new_markdown_cell("Now you try"),
+            new_code_cell("# ADD YOUR CODE HERE"),
+            new_code_cell("print(y)"),
+        ]
+    )
+    assert [index for index, _ in cells_to_run(nb)] == [0]
+
+
+def test_verify_notebooks(tmp_path):
+    (tmp_path / "data.txt").write_text("hello")
+    passing = write_notebook(
+        tmp_path / "a.ipynb",
+        [new_code_cell("leaked = 1"), new_code_cell("print(open('data.txt').read())")],
+    )
+    # Runs on the same kernel after a restart, so 'leaked' must be gone
+    failing = write_notebook(
+        tmp_path / "b.ipynb",
+        [
+            new_markdown_cell("# Title"),
+            new_code_cell("leaked"),
+            new_code_cell("# ADD YOUR CODE HERE"),
+        ],
+    )
+
+    results = verify_notebooks([passing, failing], kernels=1, timeout=30)
+
+    assert results[0].ok
+    assert results[0].cells_run == 2
+    assert not results[1].ok
+    assert results[1].cells_run == 1
+    assert [(f.index, f.ename) for f in results[1].failures] == [(1, "NameError")]
+
+
+def test_verify_notebooks_reports_unreadable_notebooks(tmp_path):
+    broken = tmp_path / "broken.ipynb"
+    broken.write_text("{not json")
+    passing = write_notebook(tmp_path / "a.ipynb", [new_code_cell("x = 1")])
+
+    results = verify_notebooks([broken, passing], kernels=1, timeout=30)
+
+    assert not results[0].ok
+    assert results[0].error.startswith("Could not read notebook")
+    assert results[1].ok
+
+
+def test_kernel_pool_replaces_kernels_that_fail_to_restart(monkeypatch):
+    async def run():
+        pool = KernelPool(1)
+        await pool.start()
+        try:
+            km = await pool.acquire()
+
+            async def fail(**kwargs):
+                raise RuntimeError("restart failed")
+
+            monkeypatch.setattr(km, "restart_kernel", fail)
+            await pool.release(km)
+            replacement = await asyncio.wait_for(pool.acquire(), timeout=30)
+            return km, replacement, await replacement.is_alive()
+        finally:
+            await pool.shutdown()
+
+    km, replacement, alive = asyncio.run(run())
+    assert replacement is not km
+    assert alive